@@ -0,0 +1,250 @@
+'''
+Drives LDP app in-process through WSGI, no network, with concurrent
+clients sending mix of GET/PUT/POST requests::
+
+    python -m benchmarks.load --requests 2000 --concurrency 1 4 16 \\
+        --methods GET=80,PUT=15,POST=5 \\
+        --accept text/turtle=80,text/html=20 --conditional 0.3
+
+Conditional requests send `If-Match` (PUT) or `If-None-Match` (GET)
+with last ETag seen by the client, so concurrent writes show up as 412.
+POSTs create children of one container only, PUT bodies carry no
+containment triples, so PUTs go to the other resources. Reports
+throughput, p50/p99 latency, status counts per method and exceptions
+per type at each concurrency level as JSON, error rate counts
+exceptions, 409 and 5xx responses. Accepted RDF formats need serializer plugin
+installed (`rdflib-jsonld` for application/ld+json).
+'''
+import argparse
+import json
+import random
+import sys
+import threading
+import time
+
+from rdflib import Namespace, plugin
+from rdflib.plugin import PluginException
+from rdflib.serializer import Serializer
+from werkzeug.test import EnvironBuilder, run_wsgi_app
+
+from ldp import LDP, NS as LDP_NS
+from ldp.resource import MIME_FORMAT
+
+CONTINENTS = Namespace('http://www.telegraphis.net/data/continents/')
+GN = Namespace('http://www.geonames.org/ontology#')
+
+# resources sent GET and PUT
+IDENTIFIERS = ('AF', 'AS', 'EU', 'NA', 'OC', 'SA')
+# container sent GET and POST
+CONTAINER = 'AN'
+
+PUT = '''@prefix gn: <http://www.geonames.org/ontology#> .
+@prefix geographis: <http://www.telegraphis.net/ontology/geography/geography#> .
+
+<http://www.telegraphis.net/data/continents/{0}#{0}> a geographis:Continent;
+    gn:population "{1}" .
+'''
+
+
+def build_app(source):
+    app = LDP(__name__)
+    app.config.update(DATASET_DESCRIPTORS={
+        'continents': {'source': source, 'publicID': CONTINENTS}})
+
+    @app.route('/x/<c>')
+    @app.bind('c', CONTINENTS['<c>#<c>'],
+              types=(LDP_NS.BasicContainer,))
+    def population(c):
+        return c.value(GN.population) or ''
+
+    # errors are counted, not logged
+    app.logger.disabled = True
+    # parse dataset before clients start
+    call(app, 'GET', '/x/AF')
+    return app
+
+
+def weights(spec):
+    '''
+    Parses ``name=weight,...`` into ([names], [weights])
+    '''
+    pairs = [item.rsplit('=', 1) for item in spec.split(',') if item]
+    return [name for name, _ in pairs], [float(w) for _, w in pairs]
+
+
+def missing_serializers(mimetypes):
+    '''
+    Returns `mimetypes` whose rdflib serializer is not installed
+    '''
+    missing = []
+    for mimetype in mimetypes:
+        if mimetype not in MIME_FORMAT:
+            continue
+        try:
+            plugin.get(MIME_FORMAT[mimetype], Serializer)
+        except (PluginException, ImportError):
+            missing.append(mimetype)
+    return missing
+
+
+def call(app, method, path, headers=None, data=None):
+    environ = EnvironBuilder(path=path, method=method, headers=headers,
+                             data=data).get_environ()
+    app_iter, status, headers = run_wsgi_app(app, environ)
+    try:
+        for _ in app_iter:
+            pass
+    finally:
+        if hasattr(app_iter, 'close'):
+            app_iter.close()
+    return int(status.split(' ', 1)[0]), headers
+
+
+class Client(object):
+    def __init__(self, app, options, index):
+        self.app = app
+        self.options = options
+        self.index = index
+        self.rnd = random.Random(options.seed + index)
+        self.methods = weights(options.methods)
+        self.accept = weights(options.accept)
+        self.etags = {}
+        self.latencies = []
+        self.statuses = {}
+        self.exceptions = {}
+
+    def request(self, n):
+        rnd = self.rnd
+        method = rnd.choices(*self.methods)[0]
+        if method == 'POST':
+            name = CONTAINER
+        elif method == 'GET':
+            name = rnd.choice(IDENTIFIERS + (CONTAINER, ))
+        else:
+            name = rnd.choice(IDENTIFIERS)
+        path = '/x/%s' % name
+        headers = {}
+        data = None
+        conditional = rnd.random() < self.options.conditional
+        if method == 'GET':
+            headers['Accept'] = rnd.choices(*self.accept)[0]
+            if conditional and path in self.etags:
+                headers['If-None-Match'] = self.etags[path]
+        elif method == 'PUT':
+            headers['Content-Type'] = 'text/turtle'
+            data = PUT.format(name, rnd.randrange(10 ** 9))
+            if conditional and path in self.etags:
+                headers['If-Match'] = self.etags[path]
+        else:
+            headers['Content-Type'] = 'text/turtle'
+            created = 'N%sx%s' % (self.index, n)
+            data = PUT.format(created, 0)
+        return method, path, headers, data
+
+    def run(self, count):
+        for n in range(count):
+            method, path, headers, data = self.request(n)
+            started = time.perf_counter()
+            try:
+                status, response_headers = call(self.app, method, path,
+                                                headers, data)
+            except Exception as e:
+                name = type(e).__name__
+                self.exceptions[name] = self.exceptions.get(name, 0) + 1
+                status = None
+            self.latencies.append(time.perf_counter() - started)
+            if status is None:
+                continue
+            key = (method, status)
+            self.statuses[key] = self.statuses.get(key, 0) + 1
+            etag = response_headers.get('ETag')
+            if etag is not None:
+                self.etags[path] = etag
+
+
+def percentile(ordered, q):
+    if not ordered:
+        return None
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+def run_level(options, concurrency):
+    app = build_app(options.source)
+    clients = [Client(app, options, i) for i in range(concurrency)]
+    # remainder goes to first clients, each gets at most one more
+    per_client, remainder = divmod(options.requests, concurrency)
+    threads = [threading.Thread(target=client.run,
+                                args=(per_client + (i < remainder),))
+               for i, client in enumerate(clients)]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+
+    latencies = sorted(l for c in clients for l in c.latencies)
+    statuses = {}
+    by_method = {}
+    exceptions = {}
+    for client in clients:
+        for (method, status), count in client.statuses.items():
+            statuses[status] = statuses.get(status, 0) + count
+            counts = by_method.setdefault(method, {})
+            counts[str(status)] = counts.get(str(status), 0) + count
+        for name, count in client.exceptions.items():
+            exceptions[name] = exceptions.get(name, 0) + count
+    total = len(latencies)
+    errors = sum(exceptions.values()) + \
+        sum(count for status, count in statuses.items()
+            if status == 409 or status >= 500)
+    p50, p99 = percentile(latencies, 0.5), percentile(latencies, 0.99)
+    return {'requests': total,
+            'seconds': elapsed,
+            'requests_per_second': total / elapsed if elapsed else None,
+            'p50_ms': p50 * 1e3 if p50 is not None else None,
+            'p99_ms': p99 * 1e3 if p99 is not None else None,
+            'statuses': dict((str(s), c) for s, c in sorted(statuses.items())),
+            'statuses_by_method': dict(
+                (method, dict(sorted(counts.items())))
+                for method, counts in sorted(by_method.items())),
+            'exceptions': exceptions,
+            'error_rate': errors / total if total else None,
+            'precondition_failed_rate':
+                statuses.get(412, 0) / total if total else None}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description=__doc__.strip(),
+        formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--source', default='test/continents.rdf')
+    parser.add_argument('--requests', type=int, default=2000)
+    parser.add_argument('--concurrency', type=int, nargs='+',
+                        default=[1, 4, 16])
+    parser.add_argument('--methods', default='GET=80,PUT=15,POST=5')
+    parser.add_argument('--accept',
+                        default='text/turtle=80,text/html=20')
+    parser.add_argument('--conditional', type=float, default=0.3,
+                        help='fraction of GET and PUT sent with '
+                             'last seen ETag')
+    parser.add_argument('--seed', type=int, default=0)
+    options = parser.parse_args(argv)
+    missing = missing_serializers(weights(options.accept)[0])
+    if missing:
+        parser.error('no rdflib serializer for %s' % ', '.join(missing))
+
+    json.dump({'benchmark': 'load',
+               'methods': options.methods,
+               'accept': options.accept,
+               'conditional': options.conditional,
+               'seed': options.seed,
+               'results': dict((str(concurrency),
+                                run_level(options, concurrency))
+                               for concurrency in options.concurrency)},
+              sys.stdout, indent=2)
+    sys.stdout.write('\n')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,103 @@
+'''
+Measures transitive property path queries on aggregation of many graphs::
+
+    python -m benchmarks.paths --graphs 200 --depth 20
+'''
+import argparse
+import json
+import random
+import sys
+import time
+
+from rdflib import URIRef
+from rdflib.namespace import SKOS
+from rdflib.paths import OneOrMore, ZeroOrMore
+
+from ldp.dataset import NamedContextDataset
+
+
+def hierarchy(graphs, depth, seed):
+    '''
+    Builds `graphs` named graphs, each holding one chain of `depth`
+    broader links, chains are joined at random nodes of other graphs
+    '''
+    rnd = random.Random(seed)
+    ds = NamedContextDataset()
+    leaves = []
+    for i in range(graphs):
+        ds.g['g%s' % i] = URIRef('http://example.com/g%s' % i)
+        g = ds.g['g%s' % i]
+        nodes = [URIRef('http://example.com/g%s/n%s' % (i, j))
+                 for j in range(depth)]
+        for narrower, broader in zip(nodes, nodes[1:]):
+            g.add((narrower, SKOS.broader, broader))
+        if i:
+            parent = rnd.randrange(i)
+            g.add((nodes[-1], SKOS.broader,
+                   URIRef('http://example.com/g%s/n%s' %
+                          (parent, rnd.randrange(depth)))))
+        leaves.append(nodes[0])
+    return ds, leaves
+
+
+def per_graph(aggregation, s, path, o):
+    '''
+    Evaluation as it was done before, once per member graph
+    '''
+    for graph in aggregation.graphs:
+        for pair in path.eval(aggregation, s, o):
+            yield pair
+
+
+def timed(queries, run):
+    started = time.perf_counter()
+    for query in queries:
+        list(run(*query))
+    return (time.perf_counter() - started) / len(queries) * 1e3
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip())
+    parser.add_argument('--graphs', type=int, default=200)
+    parser.add_argument('--depth', type=int, default=20)
+    parser.add_argument('--queries', type=int, default=20)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--skip-per-graph', action='store_true',
+                        help='do not run per graph evaluation, '
+                             'it is quadratic in number of graphs')
+    args = parser.parse_args(argv)
+
+    ds, leaves = hierarchy(args.graphs, args.depth, args.seed)
+    aggregation = ds.g.aggregation
+    rnd = random.Random(args.seed)
+    results = {}
+    for name, path in (('one_or_more', SKOS.broader * OneOrMore),
+                       ('zero_or_more', SKOS.broader * ZeroOrMore)):
+        queries = [(rnd.choice(leaves), path, None)
+                   for _ in range(args.queries)]
+
+        def single_pass(s, path, o):
+            aggregation.clear_path_cache()
+            return aggregation.triples((s, path, o))
+
+        def cached(s, path, o):
+            return aggregation.triples((s, path, o))
+
+        result = results[name] = {
+            'single_pass_ms': timed(queries, single_pass)}
+        timed(queries, cached)
+        result['cached_ms'] = timed(queries, cached)
+        if not args.skip_per_graph:
+            result['per_graph_ms'] = timed(queries[:1], lambda *q:
+                                           per_graph(aggregation, *q))
+
+    json.dump({'benchmark': 'paths',
+               'graphs': args.graphs,
+               'depth': args.depth,
+               'triples': len(ds),
+               'results': results}, sys.stdout, indent=2)
+    sys.stdout.write('\n')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,116 @@
+'''
+Compares pool stores on generated resources::
+
+    python -m benchmarks.pool_store --resources 10000 default compact sqlite
+'''
+import argparse
+import json
+import os
+import random
+import shutil
+import sys
+import time
+import tracemalloc
+from tempfile import mkdtemp
+
+from rdflib import Literal, Namespace
+
+from ldp.dataset import PoolDataset
+from ldp.store import pool_store
+
+EX = Namespace('http://example.com/')
+
+
+def resource_quads(pool, count, triples_per_resource, seed):
+    rnd = random.Random(seed)
+    for i in range(count):
+        identifier = EX['r%s' % i]
+        g = pool.graph(identifier)
+        for j in range(triples_per_resource):
+            if j % 3:
+                o = Literal('value %s' % rnd.randint(0, count))
+            else:
+                o = EX['r%s' % rnd.randrange(count)]
+            yield identifier, EX['p%s' % (j % 7)], o, g
+
+
+def store_options(name, directory):
+    if name == 'sqlite':
+        return {'path': os.path.join(directory, 'pool.db')}
+    return {}
+
+
+def run(name, resources, triples_per_resource, lookups, seed, directory):
+    result = {'store': name}
+    tracemalloc.start()
+    started = time.perf_counter()
+    pool = PoolDataset(store=pool_store(name, **store_options(name,
+                                                              directory)))
+    pool.addN(resource_quads(pool, resources, triples_per_resource, seed))
+    elapsed = time.perf_counter() - started
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    total = resources * triples_per_resource
+    result['bulk_load_triples_per_second'] = total / elapsed
+    result['traced_memory_bytes'] = current
+    result['traced_bytes_per_triple'] = current / total
+
+    rnd = random.Random(seed)
+    identifiers = [EX['r%s' % rnd.randrange(resources)]
+                   for _ in range(lookups)]
+
+    started = time.perf_counter()
+    for identifier in identifiers:
+        list(pool.graph(identifier).triples((None, None, None)))
+    result['graph_read_us'] = \
+        (time.perf_counter() - started) / lookups * 1e6
+
+    started = time.perf_counter()
+    for identifier in identifiers:
+        list(pool.quads((identifier, None, None, None)))
+    result['subject_lookup_us'] = \
+        (time.perf_counter() - started) / lookups * 1e6
+
+    started = time.perf_counter()
+    for identifier in identifiers:
+        identifier in pool.identifiers
+    result['identifier_lookup_us'] = \
+        (time.perf_counter() - started) / lookups * 1e6
+
+    started = time.perf_counter()
+    for i, identifier in enumerate(identifiers[:lookups // 10 or 1]):
+        pool.graph(identifier).add((identifier, EX.updated, Literal(i)))
+    result['single_add_us'] = \
+        (time.perf_counter() - started) / (lookups // 10 or 1) * 1e6
+    return result
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip())
+    parser.add_argument('stores', nargs='*',
+                        default=['default', 'compact', 'sqlite'])
+    parser.add_argument('--resources', type=int, default=10000)
+    parser.add_argument('--triples-per-resource', type=int, default=10)
+    parser.add_argument('--lookups', type=int, default=1000)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args(argv)
+
+    results = []
+    for name in args.stores:
+        directory = mkdtemp()
+        try:
+            results.append(run(name, args.resources,
+                               args.triples_per_resource,
+                               args.lookups, args.seed, directory))
+        finally:
+            shutil.rmtree(directory)
+
+    json.dump({'benchmark': 'pool_store',
+               'resources': args.resources,
+               'triples_per_resource': args.triples_per_resource,
+               'results': results}, sys.stdout, indent=2)
+    sys.stdout.write('\n')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,163 @@
+'''
+Measures routing of LDP apps with many resource bound rules::
+
+    python -m benchmarks.routing --rules 10 1000 10000
+
+Every third rule is bound through `B64Converter`, every third is a
+`match_headers` rule, so apps hold plain, converter and header rules
+next to generated `.ldp.get`/`.ldp.put`/`.ldp.post` rules.
+'''
+import argparse
+import gc
+import json
+import logging
+import random
+import sys
+import time
+import tracemalloc
+from base64 import b64encode
+
+from rdflib import Namespace
+from werkzeug.test import EnvironBuilder
+
+from flask import url_for
+
+from ldp import LDP
+from ldp.rule import match_headers, ResourceContextAdapter
+
+from test.base import B64Converter
+
+EX = Namespace('http://example.com/')
+
+KINDS = ('plain', 'b64', 'headers')
+
+
+def build(rules):
+    app = LDP(__name__)
+    app.url_map.converters['b64'] = B64Converter
+    for i in range(rules):
+        kind = KINDS[i % len(KINDS)]
+        if kind == 'plain':
+            path, template = '/r%s/<c>' % i, EX['r%s/<c>' % i]
+        elif kind == 'b64':
+            path, template = '/b%s/<b64:c>' % i, EX['b%s/<c>' % i]
+        else:
+            path = match_headers('/h%s/<c>' % i,
+                                 **{'X-Version': '<int:version>'})
+            template = EX['h%s/<c>' % i]
+
+        def view(c, **kwargs):
+            return ''
+
+        app.route(path, endpoint='e%s' % i)(
+            app.bind('c', template)(view))
+    return app
+
+
+def constructed(rules):
+    gc.collect()
+    started = time.perf_counter()
+    app = build(rules)
+    elapsed = time.perf_counter() - started
+
+    gc.collect()
+    tracemalloc.start()
+    build(rules)
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return app, {'construct_s': elapsed,
+                 'memory_bytes': current,
+                 'peak_memory_bytes': peak}
+
+
+def request_for(app, i, accept=None):
+    kind = KINDS[i % len(KINDS)]
+    headers = {}
+    if kind == 'plain':
+        path = '/r%s/AF' % i
+    elif kind == 'b64':
+        path = '/b%s/%s' % (i, b64encode(b'AF').decode())
+    else:
+        path = '/h%s/AF' % i
+        headers['X-Version'] = '2'
+    if accept is not None:
+        headers['Accept'] = accept
+    return app.request_class(
+        EnvironBuilder(path=path, headers=headers).get_environ())
+
+
+def url_values(i):
+    kind = KINDS[i % len(KINDS)]
+    if kind == 'b64':
+        return {'c': b'AF'}
+    if kind == 'headers':
+        return {'c': 'AF', 'version': 2}
+    return {'c': 'AF'}
+
+
+def per_call_us(calls, run):
+    run(*calls[0])
+    started = time.perf_counter()
+    for call in calls:
+        run(*call)
+    return (time.perf_counter() - started) / len(calls) * 1e6
+
+
+def measure(rules, queries, seed):
+    app, result = constructed(rules)
+    result['url_rules'] = len(app.url_map._rules)
+    rnd = random.Random(seed)
+    picked = [rnd.randrange(rules) for _ in range(queries)]
+
+    def match(request):
+        app.create_url_adapter(request).match(return_rule=True)
+
+    result['match_us'] = per_call_us(
+        [(request_for(app, i),) for i in picked], match)
+    result['match_ldp_get_us'] = per_call_us(
+        [(request_for(app, i, 'text/turtle'),) for i in picked], match)
+
+    with app.test_request_context():
+        result['url_for_us'] = per_call_us(
+            [('e%s' % i, url_values(i)) for i in picked],
+            lambda endpoint, values: url_for(endpoint, **values))
+        result['url_for_ldp_get_us'] = per_call_us(
+            [('e%s.ldp.get' % i, dict(url_values(i), mimetype='text/turtle'))
+             for i in picked],
+            lambda endpoint, values: url_for(endpoint, **values))
+
+    def resource_url_for(request, uriref):
+        ResourceContextAdapter(request, app, uriref,
+                               None, None, []).url_for(uriref)
+
+    resource_queries = [i for i in picked
+                        if KINDS[i % len(KINDS)] == 'plain'][:20]
+    if resource_queries:
+        result['resource_url_for_us'] = per_call_us(
+            [(request_for(app, i), EX['r%s/AF' % i])
+             for i in resource_queries], resource_url_for)
+    return result
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip())
+    parser.add_argument('--rules', type=int, nargs='+',
+                        default=[10, 1000, 10000])
+    parser.add_argument('--queries', type=int, default=200)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args(argv)
+    # rule templates are not valid URIs
+    logging.getLogger('rdflib.term').setLevel(logging.ERROR)
+
+    json.dump({'benchmark': 'routing',
+               'queries': args.queries,
+               'seed': args.seed,
+               'results': dict((str(rules),
+                                measure(rules, args.queries, args.seed))
+                               for rules in args.rules)},
+              sys.stdout, indent=2)
+    sys.stdout.write('\n')
+
+
+if __name__ == '__main__':
+    main()
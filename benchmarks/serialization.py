@@ -0,0 +1,161 @@
+'''
+Measures serialization, ETags and resource replacement of pool
+resources from 10 to 1M triples::
+
+    python -m benchmarks.serialization --sizes 10 1000 100000
+
+Resources are generated offline, seeded, in the style of
+`test/alice.turtle`: one typed subject with titles, language tagged
+comments, dates, links and blank node work histories.
+'''
+import argparse
+import gc
+import json
+import random
+import sys
+import time
+import tracemalloc
+from types import SimpleNamespace
+
+from rdflib import Graph, BNode, Literal, Namespace, RDF, RDFS
+from rdflib.namespace import FOAF, XSD, DCTERMS
+
+from ldp import NS as LDP
+from ldp.dataset import PoolDataset
+from ldp.resource import LDP_RDFResource, replace_resource, identified_graph
+
+EX = Namespace('http://example.org/')
+CV = Namespace('http://purl.org/captsolo/resume-rdf/0.2/cv#')
+
+RULE = SimpleNamespace(bound_to=SimpleNamespace(
+    resource_types=[LDP.RDFSource]))
+
+
+def resource_triples(identifier, size, seed):
+    rnd = random.Random(seed)
+    triples = [(identifier, RDF.type, FOAF.Person)]
+    i = 0
+    while len(triples) < size:
+        i += 1
+        kind = rnd.randrange(5)
+        if kind == 0:
+            triples.append((identifier, DCTERMS.title,
+                            Literal('Data storage %s on the Web' % i)))
+        elif kind == 1:
+            triples.append((identifier, RDFS.comment,
+                            Literal('Just a Python & RDF hacker %s' % i,
+                                    lang=rnd.choice(('en', 'de', 'uk')))))
+        elif kind == 2:
+            triples.append((identifier, FOAF.depiction,
+                            EX['images/person/some%s.jpg' % i]))
+        elif kind == 3:
+            triples.append((identifier, FOAF.knows,
+                            EX['person%s' % rnd.randrange(size)]))
+        else:
+            history = BNode('h%s' % i)
+            triples.append((identifier, CV.hasWorkHistory, history))
+            triples.append((history, CV.employedIn,
+                            EX['company%s' % rnd.randrange(100)]))
+            triples.append((history, CV.startDate,
+                            Literal('20%02d-09-04' % rnd.randrange(20),
+                                    datatype=XSD.date)))
+    return triples[:size]
+
+
+def turtle(identifier, triples):
+    g = Graph(identifier=identifier)
+    g.bind('foaf', FOAF)
+    g.bind('dcterms', DCTERMS)
+    g.bind('cv', CV)
+    for triple in triples:
+        g.add(triple)
+    return g.serialize(format='turtle')
+
+
+def fresh_resource(pool, identifier):
+    pool.representations.clear()
+    resource = LDP_RDFResource(pool.graph(identifier), identifier)
+    resource.pool = pool
+    return resource
+
+
+def operations(pool, identifier, replacement, document):
+    '''
+    Yields (name, run) of measured operations, every run builds
+    representations from scratch
+    '''
+    yield ('turtle_serialization',
+           lambda: fresh_resource(pool, identifier).turtle_serialization)
+    yield ('ldjson_serialization',
+           lambda: fresh_resource(pool, identifier).ldjson_serialization)
+    yield ('etag', lambda: fresh_resource(pool, identifier).etag)
+    yield ('replace_resource',
+           lambda: replace_resource(RULE, fresh_resource(pool, identifier),
+                                    data=replacement, format='turtle'))
+    yield ('identified_graph',
+           lambda: identified_graph(data=document, format='turtle'))
+
+
+def measure(size, seed, memory):
+    identifier = EX['alice%s' % size]
+    triples = resource_triples(identifier, size, seed)
+    document = turtle(identifier, triples)
+    changed = resource_triples(identifier, size, seed + 1)
+    replacement = turtle(identifier, changed)
+
+    pool = PoolDataset()
+    pool.commit(identifier, triples, bump=False)
+
+    results = {'triples': size, 'turtle_bytes': len(document)}
+    for name, run in operations(pool, identifier, replacement, document):
+        if name == 'replace_resource':
+            # start every replacement from original triples
+            pool.commit(identifier, triples,
+                        set(pool.graph(identifier)[::]))
+        gc.collect()
+        started = time.perf_counter()
+        try:
+            value = run()
+        except Exception as e:
+            # serializer plugin missing, for example
+            results[name] = {'error': repr(e)}
+            continue
+        elapsed = time.perf_counter() - started
+        result = results[name] = {
+            'seconds': elapsed,
+            'triples_per_second': size / elapsed if elapsed else None}
+        if isinstance(value, bytes):
+            result['bytes'] = len(value)
+
+        if memory:
+            if name == 'replace_resource':
+                pool.commit(identifier, triples,
+                            set(pool.graph(identifier)[::]))
+            gc.collect()
+            tracemalloc.start()
+            run()
+            result['peak_memory_bytes'] = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip())
+    parser.add_argument('--sizes', type=int, nargs='+',
+                        default=[10, 100, 1000, 10000, 100000, 1000000])
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--no-memory', dest='memory', action='store_false',
+                        help='skip traced runs measuring peak memory')
+    args = parser.parse_args(argv)
+
+    json.dump({'benchmark': 'serialization',
+               'seed': args.seed,
+               'results': dict((str(size),
+                                measure(size, args.seed, args.memory))
+                               for size in args.sizes)},
+              sys.stdout, indent=2)
+    sys.stdout.write('\n')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,59 @@
+'''
+Compares cold parse of dataset descriptors with snapshot load::
+
+    python -m benchmarks.snapshot test/capitals.rdf test/countries.rdf
+'''
+import argparse
+import json
+import shutil
+import sys
+import time
+from tempfile import mkdtemp
+
+from rdflib.util import guess_format
+
+from ldp.dataset import context as dataset
+
+
+def timed(descriptors, repeat):
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        with dataset(**descriptors):
+            pass
+        timings.append(time.perf_counter() - started)
+    return min(timings)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip())
+    parser.add_argument('sources', nargs='+')
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args(argv)
+
+    snapshot_dir = mkdtemp()
+    try:
+        descriptors = dict(('g%s' % i, {'source': source,
+                                        'format': guess_format(source)})
+                           for i, source in enumerate(args.sources))
+        cached = dict((name, dict(descriptor, snapshot_dir=snapshot_dir))
+                      for name, descriptor in descriptors.items())
+
+        cold = timed(descriptors, args.repeat)
+        with dataset(**cached):
+            pass
+        warm = timed(cached, args.repeat)
+    finally:
+        shutil.rmtree(snapshot_dir)
+
+    json.dump({'benchmark': 'snapshot',
+               'sources': args.sources,
+               'cold_parse_seconds': cold,
+               'snapshot_load_seconds': warm,
+               'speedup': cold / warm if warm else None},
+              sys.stdout, indent=2)
+    sys.stdout.write('\n')
+
+
+if __name__ == '__main__':
+    main()
@@ -12,13 +12,26 @@ from flask import Flask, request, current_app, g
 from flask.globals import _request_ctx_stack
 from flask import template_rendered
 
-from ldp.globals import _dataset_ctx_stack
-from ldp.dataset import (_push_dataset_ctx,
-                         _pop_dataset_ctx)
+from ldp.globals import _dataset_ctx_stack, current_object
+from ldp.dataset import build_dataset
 from ldp.rule import (header_rule_mixin,
                       BindableRule,
                       ResourceContextAdapter)
 from ldp.binding import URIRefBinding
+from ldp.reload import SourceWatcher
+from ldp.locks import LockManager, WRITE_METHODS
+from ldp.timing import (timed,
+                        timed_hook,
+                        server_timing,
+                        TimedRequestContext,
+                        PhaseHistogram)
+from ldp.metrics import Metrics, CONTENT_TYPE as METRICS_CONTENT_TYPE
+from ldp.asgi import ASGIAdapter
+from ldp.profiling import (RequestProfiler,
+                           configure_profiler,
+                           start_profile,
+                           stop_profile)
+from ldp.offload import Offloader, configure_offloader
 
 from ldp.resource import (implied_types,
                           LDP_BUILDERS_ORDER,
@@ -53,13 +66,39 @@ def parse_dataset(*args, **kwargs):
         return
     descriptors = app.config.get('DATASET_DESCRIPTORS', None)
     if descriptors is not None:
-        app.config['DATASET'] = _push_dataset_ctx(**descriptors)
-        _pop_dataset_ctx()
+        defaults = {}
+        if app.config.get('DATASET_SNAPSHOT_DIR', None) is not None:
+            defaults['snapshot_dir'] = app.config['DATASET_SNAPSHOT_DIR']
+        if app.config.get('DATASET_LAZY', False):
+            defaults['lazy'] = True
+        if app.config.get('DATASET_EVICT_AFTER', None) is not None:
+            defaults['evict_after'] = app.config['DATASET_EVICT_AFTER']
+        if defaults:
+            descriptors = dict(
+                (name, dict(defaults, **descriptor)
+                 if set(descriptor).intersection(('data', 'file', 'source'))
+                 else descriptor)
+                for name, descriptor in descriptors.items())
+        app.config['DATASET'] = build_dataset(
+            descriptors,
+            workers=app.config.get('DATASET_PARSE_WORKERS', None),
+            start_method=app.config.get('DATASET_PARSE_START_METHOD',
+                                        'spawn'))
+
+        interval = app.config.get('DATASET_RELOAD_INTERVAL', None)
+        if interval is not None:
+            app.config['DATASET_WATCHER'] = SourceWatcher(
+                app.config['DATASET'], descriptors, interval,
+                locks=app.locks if app.config['RESOURCE_LOCKS'] else None)\
+                .start()
 
 
 def push_default_dataset(*args, **kwargs):
     app = current_app._get_current_object()
     if 'DATASET' in app.config:
+        app.config['DATASET'].g.clear_path_cache()
+        app.config['DATASET'].g.enter()
+        request.named_graphs = app.config['DATASET'].g
         _dataset_ctx_stack.push(app.config['DATASET'])
 
 
@@ -70,6 +109,19 @@ def pop_default_dataset(response):
     return response
 
 
+def release_named_graphs(exc=None):
+    named_graphs = getattr(request, 'named_graphs', None)
+    if named_graphs is not None:
+        del request.named_graphs
+        named_graphs.exit()
+
+
+def release_resource_locks(exc=None):
+    locks = getattr(request, 'resource_locks', None)
+    if locks is not None:
+        locks.release()
+
+
 def aggregated_etag(request):
     if request.url_rule is None:
         return
@@ -77,10 +129,12 @@ def aggregated_etag(request):
     if not hasattr(request, 'resource_adapters'):
         return
     
-    resources = [a.resource \
-                    for a 
-                    in sorted(set(request.resource_adapters.values()),
-                              key=lambda a:a.resource.identifier)]
+    resources = sorted((a.resource
+                        for a in set(request.resource_adapters.values())
+                        if a.resource is not None),
+                       key=lambda r: r.identifier)
+    if not resources:
+        return
     return generate_etag(''.join(r.etag for r in resources).encode('ascii'))
 
 
@@ -96,17 +150,59 @@ def set_etag(response):
 class LDP(header_rule_mixin(Flask), Flask):
     url_rule_class = BindableRule
     resource_adapter_class = ResourceContextAdapter
+    lock_manager_class = LockManager
+    request_context_class = TimedRequestContext
+    phase_histogram_class = PhaseHistogram
+    metrics_class = Metrics
+    profiler_class = RequestProfiler
+    asgi_adapter_class = ASGIAdapter
+    offloader_class = Offloader
 
     def __init__(self, *args, **kwargs):
         super(LDP, self).__init__(*args, **kwargs)
+        self.config.setdefault('RESOURCE_LOCKS', True)
+        self.config.setdefault('SERVER_TIMING', False)
+        self.locks = self.lock_manager_class()
+        self.phase_histogram = self.phase_histogram_class().connect(self)
+        self.metrics = self.metrics_class(self)
+        self.profiler = None
+        self.offloader = None
         self.define_signals()
 
     def define_signals(self):
         self.before_first_request(parse_dataset)
+        self.before_first_request(configure_profiler)
+        self.before_first_request(configure_offloader)
+        self.before_request(start_profile)
         self.before_request(push_default_dataset)
-        self.after_request(pop_default_dataset)
-        self.after_request(resource_link_type)
-        self.after_request(set_etag)
+        # registered first, so runs after other after request hooks
+        self.after_request(server_timing)
+        self.after_request(timed_hook(pop_default_dataset))
+        self.after_request(timed_hook(resource_link_type))
+        self.after_request(timed_hook(set_etag))
+        # teardown functions run in reverse, profile ends last
+        self.teardown_request(stop_profile)
+        self.teardown_request(release_named_graphs)
+        self.teardown_request(release_resource_locks)
+
+    def request_context(self, environ):
+        return self.request_context_class(self, environ)
+
+    def asgi(self, **options):
+        '''
+        Returns ASGI application serving this app, see `ldp.asgi`
+        '''
+        return self.asgi_adapter_class(self, **options)
+
+    def metrics_view(self, rule='/metrics', endpoint='ldp.metrics'):
+        '''
+        Registers view exposing `metrics` in Prometheus text format
+        '''
+        def metrics():
+            return self.response_class(self.metrics.render(),
+                                       content_type=METRICS_CONTENT_TYPE)
+        self.add_url_rule(rule, endpoint, metrics)
+        return metrics
 
     def bind(self, varname, rule, **options):
         def decorator(view_func):
@@ -193,31 +289,43 @@ class LDP(header_rule_mixin(Flask), Flask):
 
         rvars = rule.resource_vars
 
-        req.resource_adapters = {}
-        for varname, value in req.view_args.items():
-            if varname in rvars:
-                req.resource_adapters[varname] = \
-                    self.resource_adapter_class(req,
-                                                self,
-                                                req.view_args[varname],
-                                                req.url_rule.context,
-                                                req.url_rule.pool,
-                                                req.url_rule.selectors)
-                if req.url_rule.bound_to\
-                        and varname == req.url_rule.bound_to.primary_resource:
+        with timed('adapters'):
+            req.resource_adapters = {}
+            for varname, value in req.view_args.items():
+                if varname in rvars:
+                    req.resource_adapters[varname] = \
+                        self.resource_adapter_class(req,
+                                                    self,
+                                                    req.view_args[varname],
+                                                    req.url_rule.context,
+                                                    current_object(
+                                                        req.url_rule.pool),
+                                                    req.url_rule.selectors)
+                    if req.url_rule.bound_to and varname == \
+                            req.url_rule.bound_to.primary_resource:
                         req.resource_adapters['resource'] \
                             = req.resource_adapters[varname]
 
-        for varname in req.resource_adapters:
-            resource = req.resource_adapters[varname].resource
-            if resource is None and req.method is not 'PUT':
-                raise NotFound('Resource %s' % req.view_args[varname])
-            req.view_args[varname] = resource
+        if self.config['RESOURCE_LOCKS'] and req.resource_adapters:
+            with timed('locks'):
+                req.resource_locks = self.locks.acquire(
+                    (a.uriref for a in req.resource_adapters.values()),
+                    write=req.method in WRITE_METHODS)
+
+        with timed('resources'):
+            for varname in req.resource_adapters:
+                resource = req.resource_adapters[varname].resource
+                if resource is None and req.method is not 'PUT':
+                    raise NotFound('Resource %s' % req.view_args[varname])
+                req.view_args[varname] = resource
         if 'If-Match' in req.headers:
-            if req.headers['If-Match'] != aggregated_etag(req):
+            with timed('if_match'):
+                matched = req.headers['If-Match'] == aggregated_etag(req)
+            if not matched:
                 req.routing_exception = PreconditionFailed('Resource changed')
                 self.raise_routing_exception(req)
-        return super(LDP, self).dispatch_request()
+        with timed('view'):
+            return super(LDP, self).dispatch_request()
 
     def make_default_options_response(self, *args, **kwargs):
         '''
@@ -0,0 +1,193 @@
+'''
+    ldp.asgi
+    ~~~~~~~~
+
+    ASGI front-end of LDP apps. Connections live on asyncio loop:
+    request bodies are received and responses sent without holding
+    threads, so slow clients cost nothing but a coroutine. Dispatch
+    pipeline (routing, resource adapters, views of rule builders,
+    locks and serialization) runs in thread pool, since Flask request
+    context and resource locks are bound to thread::
+
+        application = ASGIAdapter(app, workers=32)
+
+    Responses are iterated in worker thread and sent with back
+    pressure of `queue_size` chunks, responses fitting into queue
+    release worker before slow client reads them. Errors raised
+    before response started are sent as 500.
+'''
+import asyncio
+import io
+import sys
+import threading
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+
+DONE = object()
+
+
+def environ_from_scope(scope, body):
+    server = scope.get('server') or ('localhost', 80)
+    client = scope.get('client') or ('', 0)
+    environ = {
+        'REQUEST_METHOD': scope['method'],
+        'SCRIPT_NAME': scope.get('root_path', '')
+                            .encode('utf-8').decode('latin-1'),
+        'PATH_INFO': scope['path'].encode('utf-8').decode('latin-1'),
+        'QUERY_STRING': scope.get('query_string', b'').decode('latin-1'),
+        'SERVER_NAME': server[0],
+        'SERVER_PORT': str(server[1]),
+        'SERVER_PROTOCOL': 'HTTP/%s' % scope.get('http_version', '1.1'),
+        'REMOTE_ADDR': client[0],
+        'REMOTE_PORT': str(client[1]),
+        'CONTENT_LENGTH': str(len(body)),
+        'wsgi.version': (1, 0),
+        'wsgi.url_scheme': scope.get('scheme', 'http'),
+        'wsgi.input': io.BytesIO(body),
+        'wsgi.errors': sys.stderr,
+        'wsgi.multithread': True,
+        'wsgi.multiprocess': False,
+        'wsgi.run_once': False,
+        'asgi.scope': scope,
+    }
+    for name, value in scope.get('headers', ()):
+        name = name.decode('latin-1').upper().replace('-', '_')
+        value = value.decode('latin-1')
+        if name == 'CONTENT_TYPE':
+            environ['CONTENT_TYPE'] = value
+            continue
+        if name == 'CONTENT_LENGTH':
+            # declared length is kept, so short body is detected
+            environ['CONTENT_LENGTH'] = value
+            continue
+        key = 'HTTP_' + name
+        if key in environ:
+            value = environ[key] + ',' + value
+        environ[key] = value
+    return environ
+
+
+class ASGIAdapter(object):
+    def __init__(self, app, executor=None, workers=None, queue_size=8):
+        self.app = app
+        self.own_executor = executor is None
+        self.executor = executor or ThreadPoolExecutor(
+            max_workers=workers, thread_name_prefix='ldp-asgi')
+        self.queue_size = queue_size
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] == 'lifespan':
+            return await self.lifespan(receive, send)
+        if scope['type'] != 'http':
+            raise ValueError('Unsupported ASGI scope %r' % scope['type'])
+        body = await self.read_body(receive)
+        if body is None:
+            return
+        loop = asyncio.get_running_loop()
+        queue = asyncio.Queue(self.queue_size)
+        cancelled = threading.Event()
+        produced = loop.run_in_executor(
+            self.executor, self.produce,
+            environ_from_scope(scope, body), loop, queue, cancelled)
+        finished = False
+        try:
+            while True:
+                message = await queue.get()
+                if message is DONE:
+                    finished = True
+                    break
+                if isinstance(message, BaseException):
+                    raise message
+                await send(message)
+        finally:
+            if not finished:
+                cancelled.set()
+                while await queue.get() is not DONE:
+                    pass
+            await produced
+        await send({'type': 'http.response.body', 'body': b'',
+                    'more_body': False})
+
+    async def lifespan(self, receive, send):
+        while True:
+            message = await receive()
+            if message['type'] == 'lifespan.startup':
+                await send({'type': 'lifespan.startup.complete'})
+            elif message['type'] == 'lifespan.shutdown':
+                if self.own_executor:
+                    self.executor.shutdown(wait=True)
+                await send({'type': 'lifespan.shutdown.complete'})
+                return
+
+    async def read_body(self, receive):
+        '''
+        Returns request body, or None when client disconnected
+        before sending all of it
+        '''
+        chunks = []
+        while True:
+            message = await receive()
+            if message['type'] == 'http.disconnect':
+                return None
+            chunks.append(message.get('body', b''))
+            if not message.get('more_body', False):
+                break
+        return b''.join(chunks)
+
+    def produce(self, environ, loop, queue, cancelled):
+        '''
+        Runs WSGI app in worker thread and puts ASGI messages into
+        `queue`, response is iterated and closed in the same thread,
+        so request context of streamed responses stays valid
+        '''
+        def put(message):
+            asyncio.run_coroutine_threadsafe(queue.put(message),
+                                             loop).result()
+
+        started = []
+
+        def start_response(status, headers, exc_info=None):
+            started[:] = [status, headers]
+            return lambda data: None
+
+        def start():
+            status, headers = started
+            put({'type': 'http.response.start',
+                 'status': int(status.split(' ', 1)[0]),
+                 'headers': [(name.lower().encode('latin-1'),
+                              value.encode('latin-1'))
+                             for name, value in headers]})
+            started.append(True)
+
+        try:
+            app_iter = self.app(environ, start_response)
+            try:
+                if started:
+                    start()
+                for chunk in app_iter:
+                    if len(started) == 2:
+                        start()
+                    if cancelled.is_set():
+                        break
+                    if chunk:
+                        put({'type': 'http.response.body',
+                             'body': chunk, 'more_body': True})
+                if len(started) == 2:
+                    start()
+            finally:
+                if hasattr(app_iter, 'close'):
+                    app_iter.close()
+        except Exception as e:
+            if len(started) == 3:
+                put(e)
+            else:
+                # app failed before response started, client gets 500
+                traceback.print_exc(file=environ['wsgi.errors'])
+                put({'type': 'http.response.start', 'status': 500,
+                     'headers': [(b'content-type', b'text/plain')]})
+                put({'type': 'http.response.body',
+                     'body': b'Internal Server Error', 'more_body': True})
+        except BaseException as e:
+            put(e)
+        finally:
+            put(DONE)
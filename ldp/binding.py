@@ -1,9 +1,10 @@
 
 import re
 from werkzeug.routing import DEFAULT_CONVERTERS
-from rdflib import URIRef
 from cached_property import cached_property
 
+from ldp.terms import uriref
+
 _uriref_rule_re = re.compile(r'''
     (?P<head>[^<]*)                           # static rule data
     <
@@ -51,7 +52,7 @@ class URIRefBinding(object):
         self.options = options
 
     def uriref(self, **args):
-        return URIRef(self.template.format(**args))
+        return uriref(self.template.format(**args))
 
     @cached_property
     def parsed_rule(self):
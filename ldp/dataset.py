@@ -1,14 +1,122 @@
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
 from contextlib import contextmanager
-from itertools import chain
+import multiprocessing
+import os
+import threading
+import time
+from weakref import WeakKeyDictionary
+
 from rdflib.graph import (
-    ReadOnlyGraphAggregate, Dataset, Graph, ConjunctiveGraph)
+    ReadOnlyGraphAggregate, Dataset, Graph, ConjunctiveGraph,
+    DATASET_DEFAULT_GRAPH_ID)
 
 from rdflib.paths import Path
+from rdflib.store import TripleAddedEvent, TripleRemovedEvent
+from blinker import Namespace
 
+from . import snapshot
 from .globals import _dataset_ctx_stack
+from .helpers import RepresentationCache
+from .journal import Journal
+from .memory import MemoryEstimator, cache_footprints
+from .namespace import SharedNamespaceManager
+from .terms import interner
+from .store import pool_store
+from .store.mapped import mapped_graph
+
+
+signals = Namespace()
+
+graph_loaded = signals.signal('graph-loaded')
+
+
+class GraphSummary(object):
+    '''
+    Subjects and predicates of every context of a store, kept up to
+    date by store add events. Removals are not tracked, so summary
+    may list graphs which no longer match a term, never the opposite
+    '''
+    def __init__(self, store, changed=None):
+        self.subjects = {}
+        self.predicates = {}
+        self.changed = changed
+        self.lock = threading.Lock()
+        store.dispatcher.subscribe(TripleAddedEvent, self.added)
+        store.dispatcher.subscribe(TripleRemovedEvent, self.removed)
+        for (s, p, o), contexts in store.triples((None, None, None)):
+            for c in contexts:
+                self.add(s, p, c)
+
+    def add(self, s, p, context):
+        identifier = getattr(context, 'identifier', context)
+        with self.lock:
+            self.subjects.setdefault(s, set()).add(identifier)
+            self.predicates.setdefault(p, set()).add(identifier)
+
+    def added(self, event):
+        s, p, o = event.triple
+        self.add(s, p, event.context)
+        if self.changed is not None:
+            self.changed()
+
+    def removed(self, event):
+        if self.changed is not None:
+            self.changed()
+
+    def candidates(self, s, p):
+        '''
+        Returns identifiers of graphs which may match bound `s` and `p`,
+        None when both are unbound
+        '''
+        found = None
+        with self.lock:
+            for term, index in ((s, self.subjects), (p, self.predicates)):
+                if term is None:
+                    continue
+                graphs = index.get(term, ())
+                found = set(graphs) if found is None \
+                    else found.intersection(graphs)
+        return found
+
+
+class PathEvaluation(object):
+    '''
+    Read view of aggregation for single property path evaluation.
+    Results of every pattern are memoised, so transitive paths
+    query each intermediate node once
+    '''
+    def __init__(self, aggregation):
+        self.aggregation = aggregation
+        self.memo = {}
+
+    def triples(self, triple):
+        try:
+            return iter(self.memo[triple])
+        except KeyError:
+            pass
+        s, p, o = triple
+        if isinstance(p, Path):
+            found = [(s1, p, o1) for s1, o1
+                     in OrderedDict.fromkeys(p.eval(self, s, o))]
+        else:
+            found = list(OrderedDict.fromkeys(
+                self.aggregation.triples(triple)))
+        self.memo[triple] = found
+        return iter(found)
+
+    def subject_objects(self, predicate=None):
+        for s, p, o in self.triples((None, predicate, None)):
+            yield s, o
+
+    def __contains__(self, triple):
+        for t in self.triples(triple):
+            return True
+        return False
 
 
 class DatasetGraphAggregation(ReadOnlyGraphAggregate):
+    path_cache_size = 256
 
     def __init__(self, graphs, store='default'):
         if store is not None:
@@ -17,26 +125,124 @@ class DatasetGraphAggregation(ReadOnlyGraphAggregate):
             self.__namespace_manager = None
 
         self.graphs = graphs
+        self.summaries = WeakKeyDictionary()
+        self.lock = threading.Lock()
+        self.generation = 0
+        self.local = threading.local()
+
+    def changed(self):
+        self.generation += 1
+
+    def summary(self, store):
+        '''
+        Returns summary of `store`, None for single graph stores
+        and stores written by other processes
+        '''
+        if not store.context_aware or getattr(store, 'shared', False):
+            return None
+        with self.lock:
+            summary = self.summaries.get(store)
+            if summary is None:
+                summary = self.summaries[store] = \
+                    GraphSummary(store, self.changed)
+        return summary
+
+    def candidates(self, store, s, p):
+        '''
+        Identifiers of `store` contexts which may match `s` and `p`,
+        None when every context may
+        '''
+        if s is None and p is None or not store.context_aware:
+            return None
+        if getattr(store, 'shared', False):
+            return set(c.identifier for c in store.contexts((s, p, None)))
+        return self.summary(store).candidates(s, p)
+
+    def member_graphs(self, s, p):
+        '''
+        Yields member graphs and dataset contexts which may match
+        '''
+        for g in list(self.graphs):
+            candidates = self.candidates(g.store, s, p)
+            if candidates is None:
+                for graph in (g.contexts() if isinstance(g, Dataset)
+                              else (g,)):
+                    yield graph
+            elif isinstance(g, Dataset):
+                for identifier in candidates:
+                    yield Graph(store=g.store, identifier=identifier)
+            elif isinstance(g, ConjunctiveGraph):
+                if candidates:
+                    yield g
+            elif g.identifier in candidates:
+                yield g
+
+    @property
+    def path_cache(self):
+        cache = getattr(self.local, 'paths', None)
+        if cache is None:
+            cache = self.local.paths = \
+                RepresentationCache(maxsize=self.path_cache_size)
+        return cache
+
+    def clear_path_cache(self):
+        '''
+        Drops path results cached by current thread,
+        called when request starts
+        '''
+        self.local.paths = None
+
+    def path_pairs(self, s, path, o):
+        '''
+        Evaluates property path once against whole aggregation.
+        Results are cached until next write or `clear_path_cache`,
+        unless some member store is written by other processes,
+        whose writes do not advance `generation`
+        '''
+        shared = False
+        for g in list(self.graphs):
+            self.summary(g.store)
+            shared = shared or getattr(g.store, 'shared', False)
+
+        def evaluate():
+            return list(OrderedDict.fromkeys(
+                path.eval(PathEvaluation(self), s, o)))
+
+        if shared:
+            return evaluate()
+        return self.path_cache.get((s, path, o, self.generation), evaluate)
 
     def triples(self, xxx_todo_changeme8):
         (s, p, o) = xxx_todo_changeme8
-        graphs = chain(*(g.contexts() if isinstance(g, Dataset)
-                         else (g,) for g in self.graphs))
-        for graph in graphs:
-            if isinstance(p, Path):
-                for s, o in p.eval(self, s, o):
-                    yield s, p, o
-            else:
-                for s1, p1, o1 in graph.triples((s, p, o)):
-                    yield (s1, p1, o1)
+        if isinstance(p, Path):
+            for s1, o1 in self.path_pairs(s, p, o):
+                yield s1, p, o1
+            return
+        for graph in self.member_graphs(s, p):
+            for s1, p1, o1 in graph.triples((s, p, o)):
+                yield (s1, p1, o1)
 
 
 class GraphGetter(object):
-
+    '''
+    Named graphs of dataset.
+    Graphs registered with `lazy` are parsed on first access and,
+    with `evict_after` seconds in descriptor, unloaded when idle.
+    Requests `enter` and `exit` named graphs, idle graphs are
+    evicted once no request uses them
+    '''
     def __init__(self, ds=None):
         self.ds = ds
         self.map = {}
-        self.aggregation = DatasetGraphAggregation(self.map.values())
+        self.descriptors = {}
+        self.locks = {}
+        self.accessed = {}
+        self.pinned = False
+        self.next_eviction = None
+        self.active = 0
+        self.usage = threading.RLock()
+        self.estimator = MemoryEstimator()
+        self._aggregation = DatasetGraphAggregation(self.map.values())
 
     def __get__(self, instance, owner):
         if instance is None:
@@ -47,26 +253,592 @@ class GraphGetter(object):
 
         return instance.g
 
+    @property
+    def aggregation(self):
+        self.load_all()
+        return self._aggregation
+
+    def clear_path_cache(self):
+        self._aggregation.clear_path_cache()
+
     def __getitem__(self, name):
         if name is None:
             return self.ds.graph()
-        return self.map[name]
+        if name not in self.descriptors:
+            return self.map[name]
+
+        self.accessed[name] = time.time()
+        try:
+            return self.map[name]
+        except KeyError:
+            return self.load(name)
 
     def __setitem__(self, name, identifier):
         self.map[name] = self.ds.graph(identifier)
         return self.map[name]
 
+    def lazy(self, name, descriptor):
+        self.descriptors[name] = descriptor
+        self.locks[name] = threading.Lock()
 
-def _push_dataset_ctx(**graph_descriptors):
+    def load(self, name):
+        with self.locks[name]:
+            if name not in self.map:
+                descriptor = dict(self.descriptors[name])
+                evict_after = descriptor.pop('evict_after', None)
+                g = parse_descriptor(self.ds, **descriptor)
+                self.replay_migrations(g)
+                self.ds.namespace_manager.merge(g)
+                self[name] = g
+                graph_loaded.send(self, name=name, graph=g)
+                if evict_after is not None and not self.pinned:
+                    self.next_eviction = min(
+                        self.next_eviction or float('inf'),
+                        time.time() + evict_after)
+            return self.map[name]
+
+    def replay_migrations(self, g):
+        '''
+        Drops triples of resources already moved to pool from freshly
+        parsed graph, as moving them did, so graph evicted and parsed
+        again does not bring moved resources back
+        '''
+        pool = self.map.get('pool')
+        identifiers = getattr(pool, 'identifiers', None)
+        if identifiers is None:
+            return
+        for s in set(g.subjects()):
+            if s in identifiers:
+                g.remove((s, None, None))
+
+    def load_all(self, pin=True):
+        '''
+        Loads every lazy graph. With `pin` also disables eviction,
+        since whole dataset is used from now on
+        '''
+        if pin:
+            self.pinned = True
+            self.next_eviction = None
+        for name in list(self.descriptors):
+            self[name]
+
+    def enter(self):
+        '''
+        Marks named graphs used, graphs are not evicted while
+        request may iterate them
+        '''
+        with self.usage:
+            self.active += 1
+
+    def exit(self):
+        with self.usage:
+            self.active -= 1
+            if self.next_eviction is not None \
+                    and self.next_eviction <= time.time():
+                self.evict()
+
+    def evict(self, now=None):
+        '''
+        Unloads lazy graphs idle longer than their `evict_after`,
+        unless some request uses named graphs
+        '''
+        now = time.time() if now is None else now
+        with self.usage:
+            if self.active or self.pinned:
+                return
+            self.next_eviction = None
+            for name, descriptor in self.descriptors.items():
+                evict_after = descriptor.get('evict_after')
+                if evict_after is None or name not in self.map:
+                    continue
+                with self.locks[name]:
+                    if name not in self.map:
+                        continue
+                    if now - self.accessed.get(name, now) >= evict_after:
+                        g = self.map.pop(name)
+                        self.estimator.forget(g)
+                        self.ds.remove_graph(g)
+                    else:
+                        self.next_eviction = min(
+                            self.next_eviction or float('inf'),
+                            self.accessed[name] + evict_after)
+
+    def memory_usage(self, graphs=False):
+        '''
+        Returns accounting of every named graph, lazy graphs
+        not loaded yet are reported as such and not loaded.
+        Pool reports its totals, and its graphs with `graphs`
+        '''
+        usage = {}
+        for name, g in list(self.map.items()):
+            if hasattr(g, 'memory_usage'):
+                usage[name] = g.memory_usage(graphs=graphs)
+            else:
+                usage[name] = self.estimator.usage(g)
+            usage[name]['loaded'] = True
+        for name in self.descriptors:
+            if name not in usage:
+                usage[name] = {'loaded': False}
+        return usage
+
+
+class ResourceVersions(dict):
+    '''
+    Modification counters of pool resources
+    '''
+    def __missing__(self, identifier):
+        return 0
+
+    def bump(self, *identifiers):
+        for identifier in identifiers:
+            self[identifier] += 1
+
+
+class GraphSnapshot(object):
+    '''
+    Immutable version of pool resource graph.
+    Prefixes come from shared namespace manager of pool
+    '''
+    __slots__ = ('identifier', 'version', 'triples', 'namespace_manager')
+
+    def __init__(self, identifier, version, triples, namespace_manager=None):
+        self.identifier = identifier
+        self.version = version
+        self.triples = frozenset(triples)
+        self.namespace_manager = namespace_manager
+
+    def __len__(self):
+        return len(self.triples)
+
+    def graph(self):
+        '''
+        Returns standalone copy to serialize
+        '''
+        g = Graph(identifier=self.identifier,
+                  namespace_manager=self.namespace_manager)
+        g.addN((s, p, o, g) for s, p, o in self.triples)
+        return g
+
+
+class PoolDataset(Dataset):
+    '''
+    Dataset of per resource graphs.
+    Keeps identifier and containment indexes, so resource lookups
+    do not iterate over all pool contexts, and versioned
+    representations of its resources.
+    Resources are read from immutable snapshots, writers `commit`
+    changes and publish next snapshot, so readers never see half
+    applied changes and never wait for writers.
+    Snapshot is second copy of resource triples (terms are shared
+    with store), so only `snapshot_limit` recently read snapshots
+    are kept, others are rebuilt from store when read again.
+    Triples are counted once stores are loaded and commits keep
+    the counts, stores shared by processes count them themselves
+    '''
+    def __init__(self, store='default', snapshot_limit=4096):
+        self.identifiers = set()
+        self.triple_counts = {}
+        self.triple_total = 0
+        self.containment = {}
+        self.versions = ResourceVersions()
+        self.representations = RepresentationCache()
+        self.snapshots = OrderedDict()
+        self.snapshot_limit = snapshot_limit
+        self.estimator = MemoryEstimator()
+        self.lock = threading.RLock()
+        self.journal = None
+        self.compaction = None
+        self.compact_size = None
+        super(PoolDataset, self).__init__(store=store)
+        self.namespace_manager = SharedNamespaceManager(self)
+        if hasattr(self.store, 'identifiers'):
+            self.identifiers = self.store.identifiers
+        else:
+            self.identifiers.update(c.identifier for c in self.contexts())
+        if hasattr(self.store, 'versions'):
+            self.versions = self.store.versions
+        # sampled across all pool graphs for estimates of totals
+        self.union = ConjunctiveGraph(store=self.store)
+        self.recount()
+
+    def graph(self, identifier=None):
+        g = super(PoolDataset, self).graph(identifier)
+        g.namespace_manager = self.namespace_manager
+        self.identifiers.add(g.identifier)
+        if g.identifier != DATASET_DEFAULT_GRAPH_ID:
+            self.triple_counts.setdefault(g.identifier, 0)
+        return g
+
+    def remove_graph(self, g):
+        '''
+        Drops resource graph, with journal attached returns
+        once removal is on disk
+        '''
+        identifier = getattr(g, 'identifier', g)
+        ticket = None
+        with self.lock:
+            super(PoolDataset, self).remove_graph(g)
+            self.identifiers.discard(identifier)
+            self.snapshots.pop(identifier, None)
+            self.count(identifier, 0)
+            self.triple_counts.pop(identifier, None)
+            self.representations.discard(identifier)
+            if self.journal is not None:
+                ticket = self.journal.append(('remove', identifier))
+        if ticket is not None:
+            self.journal.sync(ticket)
+        return self
+
+    def recount(self):
+        '''
+        Counts triples of every pool graph
+        '''
+        if hasattr(self.store, 'graph_totals'):
+            return
+        counts = dict((identifier,
+                       len(Graph(store=self.store, identifier=identifier)))
+                      for identifier in list(self.identifiers)
+                      if identifier != DATASET_DEFAULT_GRAPH_ID)
+        with self.lock:
+            self.triple_counts = counts
+            self.triple_total = sum(counts.values())
+
+    def count(self, identifier, count):
+        self.triple_total += count - self.triple_counts.get(identifier, 0)
+        self.triple_counts[identifier] = count
+
+    def totals(self):
+        '''
+        Returns (graphs, triples) of pool
+        '''
+        graph_totals = getattr(self.store, 'graph_totals', None)
+        if graph_totals is not None:
+            return graph_totals(exclude=(DATASET_DEFAULT_GRAPH_ID, ))
+        with self.lock:
+            return len(self.triple_counts), self.triple_total
+
+    def memory_usage(self, graphs=False):
+        '''
+        Returns totals of pool graphs, snapshots and representations
+        cache, with `graphs` also accounting of every pool graph
+        '''
+        footprints = cache_footprints(self.representations)
+        snapshots = dict(self.snapshots)
+        graph_count, triples = self.totals()
+        usage = {'graphs': graph_count,
+                 'triples': triples,
+                 'estimated_bytes': int(triples * self.estimator.triple_bytes(
+                     self.union, triples)),
+                 'namespaces': len(getattr(self.namespace_manager, 'table',
+                                           ())),
+                 'snapshots': len(snapshots),
+                 'snapshot_triples': sum(len(s) for s in snapshots.values()),
+                 'cache_entries': sum(f[0] for f in footprints.values()),
+                 'cache_bytes': sum(f[1] for f in footprints.values())}
+        if not graphs:
+            return usage
+        per_graph = {}
+        for identifier in list(self.identifiers):
+            if identifier == DATASET_DEFAULT_GRAPH_ID:
+                continue
+            g = Graph(store=self.store, identifier=identifier)
+            count = len(g)
+            snapshot = snapshots.get(identifier)
+            entries, cached = footprints.get(identifier, (0, 0))
+            per_graph[identifier] = {
+                'triples': count,
+                'estimated_bytes': self.estimator.graph_bytes(g, count),
+                'snapshot_triples': len(snapshot)
+                if snapshot is not None else 0,
+                'cache_entries': entries,
+                'cache_bytes': cached}
+        usage['per_graph'] = per_graph
+        return usage
+
+    def snapshot(self, identifier):
+        '''
+        Returns current snapshot of resource graph
+        '''
+        snapshot = self.snapshots.get(identifier)
+        if snapshot is not None \
+                and snapshot.version == self.versions[identifier]:
+            try:
+                self.snapshots.move_to_end(identifier)
+            except KeyError:
+                pass
+            return snapshot
+        with self.lock:
+            snapshot = self.snapshots.get(identifier)
+            if snapshot is None \
+                    or snapshot.version != self.versions[identifier]:
+                snapshot = self.publish(self.read_snapshot(identifier))
+            return snapshot
+
+    def read_snapshot(self, identifier):
+        '''
+        Returns unpublished snapshot of resource graph in store
+        '''
+        g = Graph(store=self.store, identifier=identifier)
+        return GraphSnapshot(identifier, self.versions[identifier],
+                             g.triples((None, None, None)),
+                             self.namespace_manager)
+
+    def publish(self, snapshot):
+        '''
+        Makes `snapshot` current, drops least recently read
+        snapshots over `snapshot_limit`
+        '''
+        with self.lock:
+            self.snapshots[snapshot.identifier] = snapshot
+            self.snapshots.move_to_end(snapshot.identifier)
+            while len(self.snapshots) > self.snapshot_limit:
+                self.snapshots.popitem(last=False)
+        return snapshot
+
+    def commit(self, identifier, added=(), removed=(), namespaces=(),
+               bump=True):
+        '''
+        Applies changes to resource graph, bumps its version
+        and publishes next snapshot. With journal attached, returns
+        once changes are on disk, unless `bump` is False (resource
+        moved to pool, which is written with next batch).
+        Identifiers of new resources become visible to readers only
+        once their first snapshot is published
+        '''
+        added = set(interner.triple(t) for t in added)
+        removed = set(removed).difference(added)
+        namespaces = tuple(namespaces)
+        ticket = None
+        with self.lock:
+            current = self.snapshots.get(identifier)
+            if current is None \
+                    or current.version != self.versions[identifier]:
+                current = self.read_snapshot(identifier)
+            added.difference_update(current.triples)
+            self.apply(identifier, added, removed, namespaces)
+            if self.journal is not None:
+                ticket = self.journal.append(
+                    ('commit', identifier, tuple(added), tuple(removed),
+                     namespaces))
+            if bump:
+                self.versions.bump(identifier)
+            snapshot = self.publish(GraphSnapshot(
+                identifier, self.versions[identifier],
+                current.triples.difference(removed).union(added),
+                self.namespace_manager))
+            self.count(identifier, len(snapshot))
+            # representations built from snapshot this commit replaced
+            # without bump share its version
+            self.representations.discard(identifier)
+        if ticket is not None and bump:
+            self.journal.sync(ticket)
+            if self.journal.size > self.compact_size:
+                self.compact()
+        return snapshot
+
+    def apply(self, identifier, added, removed, namespaces=()):
+        g = self.graph(identifier)
+        for triple in removed:
+            g.remove(triple)
+        g.addN((s, p, o, g) for s, p, o in added)
+        for ns in namespaces:
+            g.bind(*ns)
+
+    def contain(self, container, identifier):
+        with self.lock:
+            self.containment.setdefault(container, set()).add(identifier)
+            if self.journal is not None:
+                self.journal.append(('contain', container, identifier))
+
+    def attach_journal(self, path, compaction=None,
+                       compact_size=64 * 1024 * 1024, delay=0.0,
+                       interval=1.0):
+        '''
+        Replays journal at `path` and journals following commits.
+        Journal is compacted into snapshot at `compaction` path once
+        it grows over `compact_size` bytes, records of moved resources
+        are written within `interval` seconds
+        '''
+        journal = Journal(path, delay=delay, interval=interval)
+        for record in journal.replay():
+            if record[0] == 'commit':
+                self.apply(*record[1:])
+            elif record[0] == 'remove':
+                self.remove_graph(record[1])
+            elif record[0] == 'contain':
+                self.containment.setdefault(record[1], set())\
+                    .add(record[2])
+        self.recount()
+        self.journal = journal
+        self.compaction = compaction or path + '.snapshot'
+        self.compact_size = compact_size
+        return self
+
+    def compact(self):
+        '''
+        Writes pool snapshot and empties journal
+        '''
+        with self.lock:
+            self.journal.flush()
+            self.dump_snapshot(self.compaction)
+            self.journal.truncate()
+
+    def load_snapshot(self, path):
+        graphs, namespaces, meta = snapshot.load(path)
+        for ns in namespaces:
+            self.bind(*ns)
+        for identifier, triples in graphs.items():
+            g = self.graph(identifier)
+            self.store.addN((s, p, o, g) for s, p, o in triples)
+        for container, identifiers in meta.get('containment', {}).items():
+            self.containment.setdefault(container, set()).update(identifiers)
+        self.recount()
+        return self
+
+    def dump_snapshot(self, path):
+        graphs = dict((g.identifier, g.triples((None, None, None)))
+                      for g in self.contexts() if len(g))
+        snapshot.dump(graphs, path,
+                      namespaces=self.namespaces(),
+                      containment=self.containment)
+
+
+def _pool_dataset(snapshot=None, journal=None, compact_size=None,
+                  journal_delay=0.0, journal_interval=1.0,
+                  snapshot_limit=4096, **store):
+    pool = PoolDataset(store=pool_store(**store),
+                       snapshot_limit=snapshot_limit)
+    if journal is not None:
+        snapshot = snapshot or journal + '.snapshot'
+        if os.path.exists(snapshot):
+            pool.load_snapshot(snapshot)
+        pool.attach_journal(journal, snapshot,
+                            compact_size or 64 * 1024 * 1024,
+                            delay=journal_delay, interval=journal_interval)
+    elif snapshot is not None:
+        pool.load_snapshot(snapshot)
+    return pool
+
+
+def _add_graph(ds, identifier, triples, namespaces):
+    g = Graph(store=ds.store, identifier=identifier)
+    g.remove((None, None, None))
+    ds.store.addN(interner.triple(t) + (g, ) for t in triples)
+    for ns in namespaces:
+        g.bind(*ns)
+    return g
+
+
+def _parse_interned(ds, descriptor):
+    # parser creates new term objects, they are replaced by
+    # interned ones on the way into `ds`
+    parsed = ConjunctiveGraph().parse(**descriptor)
+    g = Graph(store=ds.store, identifier=parsed.identifier)
+    ds.store.addN(interner.triple(t) + (g, )
+                  for t in parsed.triples((None, None, None)))
+    for ns in parsed.namespaces():
+        g.bind(*ns)
+    return g
+
+
+def parse_descriptor(ds, snapshot_dir=None, **descriptor):
+    '''
+    Parses descriptor into `ds` context.
+    With `snapshot_dir` reuses binary snapshot of previous parse
+    while source file is unchanged
+    '''
+    cache = None if snapshot_dir is None \
+        else snapshot.DescriptorSnapshot(snapshot_dir, descriptor)
+    if cache is None or not cache.cacheable:
+        return _parse_interned(ds, descriptor)
+
+    cached = cache.load()
+    if cached is None:
+        g = _parse_interned(ds, descriptor)
+        cache.dump(g)
+        return g
+
+    return _add_graph(ds, *cached)
+
+
+def _parse_remote(descriptor):
+    g = parse_descriptor(ConjunctiveGraph(), **descriptor)
+    return snapshot.encode({g.identifier: g.triples((None, None, None))},
+                           g.namespaces())
+
+
+def parse_descriptors(ds, descriptors, workers=None, start_method='spawn'):
+    '''
+    Parses `descriptors` into `ds` contexts and returns list
+    of `(name, graph)`. With `workers` (0 for cpu count) descriptors
+    are parsed concurrently in worker processes started with
+    `start_method`, graphs are still merged into `ds` in descriptors
+    order
+    '''
+    remote = {}
+    if workers is not None and workers != 1:
+        remote = dict((name, descriptor) for name, descriptor
+                      in descriptors.items() if 'file' not in descriptor)
+    if len(remote) < 2:
+        remote = {}
+
+    if not remote:
+        return [(name, parse_descriptor(ds, **descriptor))
+                for name, descriptor in descriptors.items()]
+
+    with ProcessPoolExecutor(
+            max_workers=workers or None,
+            mp_context=multiprocessing.get_context(start_method)) as executor:
+        futures = dict((name, executor.submit(_parse_remote, descriptor))
+                       for name, descriptor in remote.items())
+        parsed = []
+        for name, descriptor in descriptors.items():
+            if name in futures:
+                graphs, namespaces, meta = snapshot.decode(
+                    futures[name].result())
+                (identifier, triples), = graphs.items()
+                g = _add_graph(ds, identifier, triples, namespaces)
+            else:
+                g = parse_descriptor(ds, **descriptor)
+            parsed.append((name, g))
+        return parsed
+
+
+def build_dataset(graph_descriptors, workers=None, start_method='spawn'):
     ds = NamedContextDataset()
-    ds.g['pool'] = Dataset()
+    graph_descriptors = dict(graph_descriptors)
+    ds.g['pool'] = _pool_dataset(**graph_descriptors.pop('pool', {}))
+    ds.namespace_manager.merge(ds.g['pool'])
+
+    parseable = {}
     for name, descriptor in graph_descriptors.items():
-        if set(descriptor).intersection(set(('data', 'file', 'source'))):
-            ds.g[name] = ds.parse(**descriptor)
-            for ns in ds.g[name].namespaces():
-                ds.bind(*ns)
+        if not set(descriptor).intersection(set(('data', 'file', 'source'))):
+            continue
+        descriptor = dict(descriptor)
+        if descriptor.pop('lazy', False):
+            ds.g.lazy(name, descriptor)
+        else:
+            descriptor.pop('evict_after', None)
+            parseable[name] = descriptor
+
+    for name, g in parse_descriptors(ds, parseable, workers=workers,
+                                     start_method=start_method):
+        ds.g[name] = g
+        ds.namespace_manager.merge(g)
+
+    for name, descriptor in graph_descriptors.items():
+        if name in parseable or name in ds.g.descriptors:
+            continue
+        if 'mapped' in descriptor:
+            ds.g[name] = mapped_graph(descriptor['mapped'])
+            ds.namespace_manager.merge(ds.g[name])
         else:
             ds.g[name] = ConjunctiveGraph()
+    return ds
+
+
+def _push_dataset_ctx(**graph_descriptors):
+    ds = build_dataset(graph_descriptors)
     _dataset_ctx_stack.push(ds)
     return ds
 
@@ -78,6 +850,40 @@ def _pop_dataset_ctx():
 class NamedContextDataset(Dataset):
     g = GraphGetter()
 
+    def __init__(self, *args, **kwargs):
+        super(NamedContextDataset, self).__init__(*args, **kwargs)
+        self.namespace_manager = SharedNamespaceManager(self)
+
+    def memory_usage(self, graphs=False):
+        '''
+        Returns accounting of named graphs, see `GraphGetter.memory_usage`
+        '''
+        return self.g.memory_usage(graphs=graphs)
+
+    def external_graphs(self):
+        '''
+        Named graphs kept in stores of their own (mapped graphs),
+        pool excluded
+        '''
+        return [g for g in list(self.g.map.values())
+                if g.store is not self.store and not isinstance(g, Dataset)]
+
+    def quads(self, quad=None):
+        '''
+        Quads of dataset store followed by quads of external graphs,
+        so rules with dataset context find resources of mapped graphs
+        '''
+        quad = tuple(quad or ()) + (None, ) * (4 - len(quad or ()))
+        for q in super(NamedContextDataset, self).quads(quad):
+            yield q
+        s, p, o, c = quad
+        c = getattr(c, 'identifier', c)
+        for g in self.external_graphs():
+            if c is not None and c != g.identifier:
+                continue
+            for triple in g.triples((s, p, o)):
+                yield triple + (g.identifier, )
+
 
 @contextmanager
 def context(**graph_descriptors):
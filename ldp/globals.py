@@ -4,59 +4,96 @@
     ~~~~~~~~~~~~~
 
     Defines all the global objects that are proxies to the current
-    active context.
+    active context. Context stacks live in `contextvars`, so they are
+    local to threads and to asyncio tasks. Proxies resolve with single
+    lookup, hot code gets objects with `current_dataset`,
+    `current_graph` or `current_object` and skips proxies altogether.
 """
-import sys
-import types
-
-from werkzeug.local import LocalStack, LocalProxy
-
-class GlobalsModule(types.ModuleType):
-    __all__ = ('_dataset_ctx_stack', 'dataset', 'data', 'aggregation', 'resource')
-    __package__ = __package__
-    __loader__ = __loader__
-    __name__ = __name__
-    __path__ = __file__
-    if '__initializing__' in locals():
-        __initializing__ = __initializing__
-    _dataset_ctx_stack = LocalStack()
-    _resource_ctx_stack = LocalStack()
-
-    def __init__(self, *args, **kwargs):
-        super(GlobalsModule, self).__init__(*args, **kwargs)
-        self.dataset = LocalProxy(self._lookup_dataset)
-        self.data = LocalProxy(self._lookup_data_mapping)
-        self.aggregation = LocalProxy(self._lookup_data_aggregation)
-        self.resource = LocalProxy(self._lookup_resource_stack)
-
-    def _lookup_resource_stack(self):
-        top = self._resource_ctx_stack.top
-        if top is None:
-            raise RuntimeError('working outside of resource context')
-        return top
-
-    def _lookup_dataset(self):
-        top = self._dataset_ctx_stack.top
-        if top is None:
-            raise RuntimeError('working outside of dataset context')
-        return top
-
-    def _lookup_data_mapping(self):
-        return self.dataset.g
-
-    def _lookup_data_aggregation(self):
-        return self.data.aggregation
-
-    def _lookup_named_graph(self, name):
-        return self.data[name]
-
-    def __getattr__(self, name):
-        from werkzeug.local import LocalProxy
-        from functools import partial
-        if name not in self.__dict__:
-            self.__dict__[name] = LocalProxy(
-                partial(self._lookup_named_graph, name))
-
-        return self.__dict__[name]
-
-sys.modules[__name__] = GlobalsModule(__name__, __doc__)
+from contextvars import ContextVar
+from functools import partial
+
+from werkzeug.local import LocalProxy
+
+__all__ = ('_dataset_ctx_stack', 'dataset', 'data', 'aggregation', 'resource',
+           'current_dataset', 'current_graph', 'current_object')
+
+
+class ContextStack(object):
+    '''
+    Stack kept as tuple in context variable, tasks started while
+    object is pushed see it, but their pushes do not leak back
+    '''
+    def __init__(self, name):
+        self.var = ContextVar(name, default=())
+
+    def push(self, obj):
+        self.var.set(self.var.get() + (obj,))
+
+    def pop(self):
+        stack = self.var.get()
+        if not stack:
+            return None
+        self.var.set(stack[:-1])
+        return stack[-1]
+
+    @property
+    def top(self):
+        stack = self.var.get()
+        return stack[-1] if stack else None
+
+
+_dataset_ctx_stack = ContextStack('ldp.dataset')
+_resource_ctx_stack = ContextStack('ldp.resource')
+
+_datasets = _dataset_ctx_stack.var
+
+
+def current_dataset():
+    stack = _datasets.get()
+    if not stack:
+        raise RuntimeError('working outside of dataset context')
+    return stack[-1]
+
+
+def current_data():
+    return current_dataset().g
+
+
+def current_aggregation():
+    return current_dataset().g.aggregation
+
+
+def current_graph(name):
+    return current_dataset().g[name]
+
+
+def current_resource():
+    top = _resource_ctx_stack.top
+    if top is None:
+        raise RuntimeError('working outside of resource context')
+    return top
+
+
+def current_object(obj):
+    '''
+    Returns object behind `obj` if it is proxy, else `obj`
+    '''
+    if isinstance(obj, LocalProxy):
+        return obj._get_current_object()
+    return obj
+
+
+dataset = LocalProxy(current_dataset)
+data = LocalProxy(current_data)
+aggregation = LocalProxy(current_aggregation)
+resource = LocalProxy(current_resource)
+
+_named_graphs = {}
+
+
+def __getattr__(name):
+    if name.startswith('__'):
+        raise AttributeError(name)
+    if name not in _named_graphs:
+        _named_graphs[name] = LocalProxy(partial(current_graph, name))
+    return _named_graphs[name]
@@ -1,6 +1,7 @@
 import re
+import threading
 from types import GeneratorType
-from collections import deque
+from collections import deque, OrderedDict
 from urllib.parse import (
     urlencode,
     urlsplit,
@@ -249,4 +250,50 @@ class Uncacheable(object):
         for name, prop  in self.__class__.__dict__.items():
             if name in self.__dict__ and isinstance(prop, cached_property):
                 if not uncaches or name in uncaches:
-                    del self.__dict__[name]
\ No newline at end of file
+                    del self.__dict__[name]
+
+
+class RepresentationCache(object):
+    '''
+    Bounded LRU cache of resource representations.
+    Keys include resource version, so outdated entries are never hit
+    and just age out
+    '''
+    def __init__(self, maxsize=1024):
+        self.maxsize = maxsize
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key, build):
+        with self.lock:
+            try:
+                value = self.entries[key]
+            except KeyError:
+                self.misses += 1
+            else:
+                self.entries.move_to_end(key)
+                self.hits += 1
+                return value
+
+        value = build()
+        with self.lock:
+            self.entries[key] = value
+            while len(self.entries) > self.maxsize:
+                self.entries.popitem(last=False)
+                self.evictions += 1
+        return value
+
+    def discard(self, identifier):
+        '''
+        Drops every representation of resource `identifier`
+        '''
+        with self.lock:
+            for key in [k for k in self.entries if k[0] == identifier]:
+                del self.entries[key]
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
@@ -0,0 +1,205 @@
+'''
+    ldp.journal
+    ~~~~~~~~~~~
+
+    Append-only write-ahead journal of pool changes.
+    Records appended by concurrent commits are written and fsynced
+    together by whichever committer comes first (group commit),
+    so durability costs one fsync per batch instead of per request.
+
+    Journal is a sequence of frames: length and crc32 of payload,
+    followed by pickled list of records. Torn frame at the end of
+    journal left by crash is dropped on replay.
+
+    Records nobody syncs on (resources moved to pool) are written
+    every `interval` seconds by flusher thread.
+'''
+import os
+import pickle
+import struct
+import threading
+import time
+import zlib
+
+FRAME = struct.Struct('<II')
+
+
+class JournalError(IOError):
+    '''
+    Records were not written to journal
+    '''
+
+
+class Journal(object):
+    '''
+    Journal file at `path`. With `delay` seconds the first committer
+    of a batch waits for more records before writing it.
+    Records of failed batch are put back to be written with next one,
+    while committers waiting for it get `JournalError`
+    '''
+    def __init__(self, path, delay=0.0, interval=1.0):
+        self.path = path
+        self.delay = delay
+        self.interval = interval
+        self.condition = threading.Condition()
+        self.pending = []
+        self.appended = 0
+        self.synced = 0
+        self.syncing = False
+        self.syncs = 0
+        self.failures = 0
+        self.failed = 0
+        self.error = None
+        self.broken = None
+        self.written = 0
+        self.file = None
+        self.stopped = threading.Event()
+        self.flusher = None
+
+    def replay(self):
+        '''
+        Yields journaled records, truncates torn tail
+        and opens journal for appending
+        '''
+        valid = 0
+        if os.path.exists(self.path):
+            with open(self.path, 'rb') as f:
+                while True:
+                    header = f.read(FRAME.size)
+                    if len(header) < FRAME.size:
+                        break
+                    length, crc = FRAME.unpack(header)
+                    payload = f.read(length)
+                    if len(payload) < length \
+                            or zlib.crc32(payload) & 0xffffffff != crc:
+                        break
+                    for record in pickle.loads(payload):
+                        yield record
+                    valid = f.tell()
+        self.open(valid)
+
+    def open(self, size=0):
+        self.file = open(self.path, 'ab')
+        if self.file.tell() != size:
+            self.file.truncate(size)
+            self.file.flush()
+            os.fsync(self.file.fileno())
+        self.written = size
+        if self.interval:
+            self.stopped.clear()
+            self.flusher = threading.Thread(target=self.run,
+                                            name='ldp-journal-flusher')
+            self.flusher.daemon = True
+            self.flusher.start()
+
+    def run(self):
+        while not self.stopped.wait(self.interval):
+            try:
+                self.flush()
+            except JournalError:
+                pass
+
+    def close(self):
+        if self.file is not None:
+            self.stopped.set()
+            self.flush()
+            self.file.close()
+            self.file = None
+
+    @property
+    def size(self):
+        return os.fstat(self.file.fileno()).st_size
+
+    def append(self, record):
+        '''
+        Queues record and returns ticket to `sync` on. Records
+        are written in append order
+        '''
+        with self.condition:
+            self.pending.append(record)
+            self.appended += 1
+            return self.appended
+
+    def sync(self, ticket):
+        '''
+        Returns once records up to `ticket` are on disk, raises
+        `JournalError` when batch with them failed meanwhile
+        '''
+        with self.condition:
+            failures = self.failures
+            while self.synced < ticket:
+                if self.broken is not None:
+                    raise JournalError('Journal %s is broken' % self.path)\
+                        from self.broken
+                if self.failures != failures and ticket <= self.failed:
+                    raise JournalError('Journal %s write failed'
+                                       % self.path) from self.error
+                if self.syncing:
+                    self.condition.wait()
+                    continue
+                self.syncing = True
+                if self.delay:
+                    self.condition.release()
+                    try:
+                        time.sleep(self.delay)
+                    finally:
+                        self.condition.acquire()
+                records, self.pending = self.pending, []
+                last = self.appended
+                self.condition.release()
+                try:
+                    self.write(records)
+                except Exception as e:
+                    self.condition.acquire()
+                    self.pending[:0] = records
+                    self.failures += 1
+                    self.failed, self.error = last, e
+                    raise JournalError('Journal %s write failed'
+                                       % self.path) from e
+                else:
+                    self.condition.acquire()
+                    self.synced = last
+                finally:
+                    self.syncing = False
+                    self.condition.notify_all()
+
+    def write(self, records):
+        '''
+        Writes frame of `records`, partial frame is truncated
+        when write fails
+        '''
+        payload = pickle.dumps(records, pickle.HIGHEST_PROTOCOL)
+        try:
+            self.file.write(FRAME.pack(len(payload),
+                                       zlib.crc32(payload) & 0xffffffff))
+            self.file.write(payload)
+            self.file.flush()
+            os.fsync(self.file.fileno())
+        except Exception:
+            # buffered part of frame is dropped with file object
+            try:
+                self.file.close()
+            except Exception:
+                pass
+            try:
+                self.file = open(self.path, 'ab')
+                self.file.truncate(self.written)
+            except Exception as e:
+                # frames after torn one would be dropped on replay
+                self.broken = e
+            raise
+        self.written += FRAME.size + len(payload)
+        self.syncs += 1
+
+    def flush(self):
+        self.sync(self.appended)
+
+    def truncate(self):
+        '''
+        Empties journal once its records are compacted elsewhere
+        '''
+        with self.condition:
+            self.file.truncate(0)
+            self.file.flush()
+            os.fsync(self.file.fileno())
+            self.written = 0
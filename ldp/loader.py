@@ -0,0 +1,157 @@
+'''
+    ldp.loader
+    ~~~~~~~~~~
+
+    Seeds pool from large RDF dumps. Triples are partitioned by subject
+    into per resource graphs, the same way `ResourceContextAdapter`
+    moves them into pool, and written as pool snapshot, which can be
+    served with `DATASET_DESCRIPTORS = {'pool': {'snapshot': path}}`
+'''
+import argparse
+import gzip
+import resource
+import sys
+import time
+from itertools import islice
+
+from rdflib import ConjunctiveGraph, Graph, URIRef
+from rdflib.graph import DATASET_DEFAULT_GRAPH_ID
+from rdflib.util import guess_format
+
+from ldp import NS as LDP
+from ldp import snapshot
+
+LINE_FORMATS = ('nt', 'nquads')
+
+
+def open_source(path):
+    if path.endswith('.gz'):
+        return gzip.open(path, 'rt', encoding='utf-8')
+    return open(path, 'rt', encoding='utf-8')
+
+
+def source_format(path):
+    return guess_format(path[:-3] if path.endswith('.gz') else path)
+
+
+def iter_triples(path, format=None, chunk_size=100000):
+    '''
+    Line based formats are parsed in chunks of `chunk_size` lines,
+    others are parsed as a whole
+    '''
+    format = format or source_format(path)
+    if format is None:
+        raise ValueError('Can not guess format of %s' % path)
+    if format not in LINE_FORMATS:
+        g = Graph()
+        with open_source(path) as f:
+            g.parse(data=f.read(), format=format)
+        yield g.namespaces()
+        yield from g
+        return
+
+    yield ()
+    with open_source(path) as f:
+        while True:
+            lines = list(islice(f, chunk_size))
+            if not lines:
+                break
+            g = ConjunctiveGraph()
+            g.parse(data=''.join(lines), format=format)
+            yield from g.triples((None, None, None))
+
+
+def peak_memory():
+    '''peak resident set size in megabytes'''
+    usage = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return usage / (1024 * 1024 if sys.platform == 'darwin' else 1024)
+
+
+class BulkLoader(object):
+    '''
+    Partitions triples by subject. Triples with non URIRef subjects
+    are kept in default graph
+    '''
+    def __init__(self, report=None, report_every=1000000):
+        self.graphs = {}
+        self.namespaces = {}
+        self.containment = {}
+        self.count = 0
+        self.report = report
+        self.report_every = report_every
+        self.started = time.time()
+
+    def add(self, triple):
+        s, p, o = triple
+        if not isinstance(s, URIRef):
+            s = DATASET_DEFAULT_GRAPH_ID
+        self.graphs.setdefault(s, []).append(triple)
+        if p == LDP.contains:
+            self.containment.setdefault(triple[0], set()).add(o)
+        self.count += 1
+        if self.report is not None and not self.count % self.report_every:
+            self.report(self.stats())
+
+    def load(self, path, format=None, chunk_size=100000):
+        triples = iter_triples(path, format=format, chunk_size=chunk_size)
+        for prefix, namespace in next(triples):
+            self.namespaces.setdefault(prefix, namespace)
+        for triple in triples:
+            self.add(triple)
+        return self
+
+    def stats(self):
+        elapsed = time.time() - self.started
+        return {'triples': self.count,
+                'graphs': len(self.graphs),
+                'seconds': elapsed,
+                'triples_per_second': self.count / elapsed if elapsed else 0,
+                'peak_memory_mb': peak_memory()}
+
+    def dump(self, path):
+        snapshot.dump(self.graphs, path,
+                      namespaces=self.namespaces.items(),
+                      containment=self.containment)
+
+
+def format_stats(stats):
+    return ('%(triples)d triples, %(graphs)d graphs, %(seconds).1fs, '
+            '%(triples_per_second).0f triples/sec, '
+            'peak memory %(peak_memory_mb).1fMB' % stats)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description='Load RDF dumps into LDP pool snapshot')
+    parser.add_argument('sources', nargs='+',
+                        help='N-Quads, N-Triples, Turtle or any rdflib '
+                             'parseable file, optionally gzipped')
+    parser.add_argument('-o', '--output', required=True,
+                        help='pool snapshot path')
+    parser.add_argument('-f', '--format', default=None,
+                        help='source format, guessed from extension '
+                             'by default')
+    parser.add_argument('--chunk-size', type=int, default=100000,
+                        help='lines parsed at once for line based formats')
+    parser.add_argument('--report-every', type=int, default=1000000,
+                        help='report progress every N triples')
+    args = parser.parse_args(argv)
+    if args.format is None:
+        for source in args.sources:
+            if source_format(source) is None:
+                parser.error('can not guess format of %s from extension, '
+                             'use --format' % source)
+
+    def report(stats):
+        print(format_stats(stats), file=sys.stderr)
+
+    loader = BulkLoader(report=report, report_every=args.report_every)
+    for source in args.sources:
+        loader.load(source, format=args.format, chunk_size=args.chunk_size)
+    loader.dump(args.output)
+    report(loader.stats())
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,151 @@
+'''
+    ldp.locks
+    ~~~~~~~~~
+
+    Per resource read-write locks of LDP app.
+    `dispatch_request` takes write locks of request resources for
+    modifying methods and read locks otherwise, so serializing
+    resources never overlaps with writes of the same resource, while
+    different resources are written in parallel.
+    Locks are released on request teardown.
+    Moving resources to pool and reloading sources mutate dataset
+    context shared by all resources, so they hold `migration` mutex
+    of lock manager, taken after resource locks.
+'''
+import threading
+import time
+
+WRITE_METHODS = frozenset(('PUT', 'POST', 'PATCH', 'DELETE'))
+
+
+class RWLock(object):
+    '''
+    Shared read, exclusive write lock. Waiting writers block
+    new readers, so writes are not starved by stream of reads
+    '''
+    def __init__(self):
+        self.condition = threading.Condition(threading.Lock())
+        self.readers = 0
+        self.writer = False
+        self.waiting_writers = 0
+
+    def acquire_read(self):
+        with self.condition:
+            while self.writer or self.waiting_writers:
+                self.condition.wait()
+            self.readers += 1
+
+    def release_read(self):
+        with self.condition:
+            self.readers -= 1
+            if not self.readers:
+                self.condition.notify_all()
+
+    def acquire_write(self):
+        with self.condition:
+            self.waiting_writers += 1
+            while self.writer or self.readers:
+                self.condition.wait()
+            self.waiting_writers -= 1
+            self.writer = True
+
+    def release_write(self):
+        with self.condition:
+            self.writer = False
+            self.condition.notify_all()
+
+
+class LockStats(object):
+    __slots__ = ('count', 'wait', 'max_wait')
+
+    def __init__(self):
+        self.count = 0
+        self.wait = 0.0
+        self.max_wait = 0.0
+
+    def add(self, wait):
+        self.count += 1
+        self.wait += wait
+        self.max_wait = max(self.max_wait, wait)
+
+    def as_dict(self):
+        return {'count': self.count,
+                'wait_seconds': self.wait,
+                'max_wait_seconds': self.max_wait}
+
+
+class HeldLocks(object):
+    '''
+    Locks acquired for one request
+    '''
+    def __init__(self, manager, identifiers, write):
+        self.manager = manager
+        self.identifiers = identifiers
+        self.write = write
+
+    def release(self):
+        identifiers, self.identifiers = self.identifiers, ()
+        for identifier in reversed(identifiers):
+            self.manager.release(identifier, self.write)
+
+
+class LockManager(object):
+    '''
+    Hands out read-write locks keyed by resource identifier.
+    Locks exist only while used, and wait times are accumulated
+    per mode
+    '''
+    def __init__(self):
+        self.mutex = threading.Lock()
+        self.locks = {}
+        self.users = {}
+        self.stats = {'read': LockStats(), 'write': LockStats()}
+        self.migration = threading.Lock()
+
+    def lock(self, identifier):
+        with self.mutex:
+            lock = self.locks.get(identifier)
+            if lock is None:
+                lock = self.locks[identifier] = RWLock()
+                self.users[identifier] = 0
+            self.users[identifier] += 1
+            return lock
+
+    def unlock(self, identifier):
+        with self.mutex:
+            self.users[identifier] -= 1
+            if not self.users[identifier]:
+                del self.users[identifier]
+                del self.locks[identifier]
+
+    def acquire(self, identifiers, write=False):
+        '''
+        Locks `identifiers` in sorted order, so requests locking
+        several resources can not deadlock
+        '''
+        identifiers = sorted(set(identifiers))
+        started = time.perf_counter()
+        for identifier in identifiers:
+            lock = self.lock(identifier)
+            if write:
+                lock.acquire_write()
+            else:
+                lock.acquire_read()
+        wait = time.perf_counter() - started
+        with self.mutex:
+            self.stats['write' if write else 'read'].add(wait)
+        return HeldLocks(self, identifiers, write)
+
+    def release(self, identifier, write=False):
+        with self.mutex:
+            lock = self.locks[identifier]
+        if write:
+            lock.release_write()
+        else:
+            lock.release_read()
+        self.unlock(identifier)
+
+    def metrics(self):
+        with self.mutex:
+            return dict((mode, stats.as_dict())
+                        for mode, stats in self.stats.items())
@@ -0,0 +1,111 @@
+'''
+    ldp.memory
+    ~~~~~~~~~~
+
+    Memory accounting of named and pool graphs. Triple counts come
+    from stores (constant time for memory and compact stores), bytes
+    are estimated from sample of triples taken once per graph and
+    retaken only when graph size changes noticeably, so accounting
+    can be sampled often without walking every triple.
+'''
+import sys
+import threading
+from collections import OrderedDict
+from itertools import islice
+
+from rdflib import Literal
+
+# approximate size of index entries rdflib memory stores keep per triple
+TRIPLE_OVERHEAD = 512
+
+
+def term_bytes(term):
+    size = sys.getsizeof(term)
+    if isinstance(term, Literal):
+        if term.language:
+            size += sys.getsizeof(term.language)
+        if term.value is not None and term.value is not term:
+            size += sys.getsizeof(term.value)
+    return size
+
+
+def namespace_count(graph):
+    table = getattr(graph.namespace_manager, 'table', None)
+    if table is not None:
+        return len(table)
+    return sum(1 for _ in graph.namespaces())
+
+
+class MemoryEstimator(object):
+    '''
+    Estimates bytes used by graphs. Stores providing
+    `memory_usage(context)` are asked directly, otherwise estimate
+    is count of triples times `triple_bytes` of store, or average
+    size of `sample` triples. Terms shared between triples are counted
+    for every triple, so estimates are upper bounds. Averages of only
+    `size` recently estimated graphs are kept
+    '''
+    def __init__(self, sample=64, tolerance=0.25, size=1024):
+        self.sample = sample
+        self.tolerance = tolerance
+        self.size = size
+        self.samples = OrderedDict()
+        self.lock = threading.Lock()
+
+    def triple_bytes(self, graph, count):
+        fixed = getattr(graph.store, 'triple_bytes', None)
+        if fixed is not None:
+            return fixed
+        key = (id(graph.store), graph.identifier)
+        cached = self.samples.get(key)
+        if cached is not None:
+            sampled_count, average = cached
+            if abs(count - sampled_count) <= self.tolerance * sampled_count:
+                return average
+        sizes = [sum(term_bytes(t) for t in triple) + TRIPLE_OVERHEAD
+                 for triple in islice(graph.triples((None, None, None)),
+                                      self.sample)]
+        average = sum(sizes) / len(sizes) if sizes else 0
+        with self.lock:
+            self.samples[key] = (count, average)
+            self.samples.move_to_end(key)
+            while len(self.samples) > self.size:
+                self.samples.popitem(last=False)
+        return average
+
+    def graph_bytes(self, graph, count=None):
+        if count is None:
+            count = len(graph)
+        usage = getattr(graph.store, 'memory_usage', None)
+        if usage is not None:
+            return usage(graph)
+        if not count:
+            return 0
+        return int(count * self.triple_bytes(graph, count))
+
+    def usage(self, graph):
+        '''
+        Returns accounting of single graph
+        '''
+        count = len(graph)
+        return {'triples': count,
+                'estimated_bytes': self.graph_bytes(graph, count),
+                'namespaces': namespace_count(graph)}
+
+    def forget(self, graph):
+        with self.lock:
+            self.samples.pop((id(graph.store), graph.identifier), None)
+
+
+def cache_footprints(cache):
+    '''
+    Returns {identifier: [entries, bytes]} of representations cache
+    '''
+    with cache.lock:
+        items = list(cache.entries.items())
+    footprints = {}
+    for key, value in items:
+        footprint = footprints.setdefault(key[0], [0, 0])
+        footprint[0] += 1
+        footprint[1] += sys.getsizeof(value)
+    return footprints
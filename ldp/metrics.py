@@ -0,0 +1,186 @@
+'''
+    ldp.metrics
+    ~~~~~~~~~~~
+
+    Counters of LDP internals: how request resources were resolved
+    (found in pool or moved to pool), serialization bytes and time per
+    mimetype and response statuses. Graph accounting, representation
+    cache, term cache, locks and request phases are read when rendered.
+    `LDP.metrics_view` exposes them in Prometheus text format.
+'''
+import threading
+
+from blinker import Namespace
+
+from flask import current_app, has_app_context, request_finished
+
+from ldp.terms import interner
+from ldp.timing import PhaseHistogram
+
+signals = Namespace()
+
+resource_resolved = signals.signal('resource-resolved')
+resource_serialized = signals.signal('resource-serialized')
+
+FORMAT_MIME = {'turtle': 'text/turtle',
+               'json-ld': 'application/ld+json',
+               'xml': 'application/rdf+xml',
+               None: 'application/rdf+xml'}
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+
+def emit(signal, **kwargs):
+    '''
+    Sends `signal` from current app, if any
+    '''
+    if signal.receivers and has_app_context():
+        signal.send(current_app._get_current_object(), **kwargs)
+
+
+class Metrics(object):
+    def __init__(self, app):
+        self.app = app
+        self.lock = threading.Lock()
+        self.resolved = {}
+        self.serialized_bytes = {}
+        self.serialization = PhaseHistogram()
+        self.responses = {}
+        resource_resolved.connect(self.on_resolved, sender=app, weak=False)
+        resource_serialized.connect(self.on_serialized,
+                                    sender=app, weak=False)
+        request_finished.connect(self.on_response, sender=app, weak=False)
+
+    def increment(self, counter, key, value=1):
+        with self.lock:
+            counter[key] = counter.get(key, 0) + value
+
+    def on_resolved(self, sender, identifier, source):
+        self.increment(self.resolved, source)
+
+    def on_serialized(self, sender, format, size, duration):
+        mimetype = FORMAT_MIME.get(format, format)
+        self.increment(self.serialized_bytes, mimetype, size)
+        self.serialization.observe(mimetype, duration)
+
+    def on_response(self, sender, response):
+        self.increment(self.responses, response.status_code)
+
+    @property
+    def pool(self):
+        dataset = self.app.config.get('DATASET')
+        if dataset is None:
+            return None
+        return dataset.g.map.get('pool')
+
+    def samples(self):
+        '''
+        Yields (name, type, help, [(labels, value)]) of every metric
+        '''
+        yield ('ldp_resources_resolved_total', 'counter',
+               'Request resources found in pool, moved to pool or missing',
+               [({'source': source}, count)
+                for source, count in sorted(self.resolved.items())])
+        yield ('ldp_responses_total', 'counter',
+               'Responses by status code, 304 and 412 for conditionals',
+               [({'code': str(code)}, count)
+                for code, count in sorted(self.responses.items())])
+        yield ('ldp_serialization_bytes_total', 'counter',
+               'Bytes of serialized resources',
+               [({'mimetype': mimetype}, size)
+                for mimetype, size in sorted(self.serialized_bytes.items())])
+        yield ('ldp_serialization_seconds', 'histogram',
+               'Time spent serializing resources',
+               self.histogram(self.serialization, 'mimetype'))
+        yield ('ldp_phase_seconds', 'histogram',
+               'Time spent in request phases',
+               self.histogram(self.app.phase_histogram, 'phase'))
+
+        yield ('ldp_term_cache_hits_total', 'counter',
+               'Interned terms, including resource binding URIRefs, reused',
+               [({}, interner.hits)])
+        yield ('ldp_term_cache_misses_total', 'counter',
+               'Interned terms created',
+               [({}, interner.misses)])
+
+        locks = self.app.locks.metrics()
+        yield ('ldp_lock_acquired_total', 'counter',
+               'Resource locks acquired',
+               [({'mode': mode}, stats['count'])
+                for mode, stats in sorted(locks.items())])
+        yield ('ldp_lock_wait_seconds_total', 'counter',
+               'Time spent waiting for resource locks',
+               [({'mode': mode}, stats['wait_seconds'])
+                for mode, stats in sorted(locks.items())])
+
+        dataset = self.app.config.get('DATASET')
+        if dataset is None:
+            return
+        usage = dataset.g.memory_usage()
+        loaded = sorted((name, graph) for name, graph in usage.items()
+                        if graph['loaded'])
+        yield ('ldp_graph_triples', 'gauge',
+               'Triples in named graphs, pool graphs summed',
+               [({'graph': name}, graph['triples'])
+                for name, graph in loaded])
+        yield ('ldp_graph_estimated_bytes', 'gauge',
+               'Estimated memory of named graphs',
+               [({'graph': name}, graph['estimated_bytes'])
+                for name, graph in loaded])
+
+        pool = self.pool
+        if pool is None:
+            return
+        pool_usage = usage['pool']
+        yield ('ldp_pool_graphs', 'gauge',
+               'Resource graphs in pool', [({}, pool_usage['graphs'])])
+        yield ('ldp_pool_triples', 'gauge',
+               'Triples in pool', [({}, pool_usage['triples'])])
+        yield ('ldp_pool_snapshot_triples', 'gauge',
+               'Triples held by published pool snapshots',
+               [({}, pool_usage['snapshot_triples'])])
+        yield ('ldp_representation_cache_bytes', 'gauge',
+               'Size of cached representations',
+               [({}, pool_usage['cache_bytes'])])
+        cache = getattr(pool, 'representations', None)
+        if cache is not None:
+            yield ('ldp_representation_cache_hits_total', 'counter',
+                   'Representations served from cache', [({}, cache.hits)])
+            yield ('ldp_representation_cache_misses_total', 'counter',
+                   'Representations built', [({}, cache.misses)])
+            yield ('ldp_representation_cache_evictions_total', 'counter',
+                   'Representations evicted from cache',
+                   [({}, cache.evictions)])
+            yield ('ldp_representation_cache_entries', 'gauge',
+                   'Representations in cache', [({}, len(cache.entries))])
+
+    def histogram(self, histogram, label):
+        samples = []
+        for name, phase in sorted(histogram.metrics().items()):
+            seen = 0
+            for bound, count in zip(histogram.buckets, phase['buckets']):
+                seen += count
+                samples.append(({label: name, 'le': repr(bound)}, seen,
+                                '_bucket'))
+            samples.append(({label: name, 'le': '+Inf'}, phase['count'],
+                            '_bucket'))
+            samples.append(({label: name}, phase['sum'], '_sum'))
+            samples.append(({label: name}, phase['count'], '_count'))
+        return samples
+
+    def render(self):
+        lines = []
+        for name, kind, description, samples in self.samples():
+            lines.append('# HELP %s %s' % (name, description))
+            lines.append('# TYPE %s %s' % (name, kind))
+            for sample in samples:
+                labels, value = sample[:2]
+                suffix = sample[2] if len(sample) > 2 else ''
+                if labels:
+                    labels = '{%s}' % ','.join(
+                        '%s="%s"' % (k, str(v).replace('"', '\\"'))
+                        for k, v in sorted(labels.items()))
+                else:
+                    labels = ''
+                lines.append('%s%s%s %s' % (name, suffix, labels, value))
+        return '\n'.join(lines) + '\n'
@@ -0,0 +1,63 @@
+'''
+    ldp.namespace
+    ~~~~~~~~~~~~~
+
+    Namespace manager shared by every graph of a dataset store.
+    Bindings are mirrored in a table which is replaced, never
+    modified, on change (copy-on-write), so graphs iterate bindings
+    without touching the store, binding known prefix costs one dict
+    lookup and merging unchanged manager of other dataset costs
+    nothing.
+'''
+import threading
+from weakref import WeakKeyDictionary
+
+from rdflib import URIRef, Graph
+from rdflib.namespace import NamespaceManager
+
+
+class SharedNamespaceManager(NamespaceManager):
+    def __init__(self, graph):
+        self.table = {}
+        self.version = 0
+        self.lock = threading.RLock()
+        self.merged = WeakKeyDictionary()
+        super(SharedNamespaceManager, self).__init__(graph)
+        self.refresh()
+
+    def refresh(self):
+        self.table = dict((prefix, URIRef(str(namespace)))
+                          for prefix, namespace in self.store.namespaces())
+        self.version += 1
+
+    def bind(self, prefix, namespace, override=True, replace=False):
+        namespace = URIRef(str(namespace))
+        if self.table.get(prefix or '') == namespace:
+            return
+        with self.lock:
+            super(SharedNamespaceManager, self).bind(prefix, namespace,
+                                                     override, replace)
+            self.refresh()
+
+    def namespaces(self):
+        for prefix, namespace in self.table.items():
+            yield prefix, namespace
+
+    def merge(self, source):
+        '''
+        Binds namespaces of `source` graph or manager, once
+        per version of shared source manager
+        '''
+        manager = getattr(source, 'namespace_manager', source)
+        # rdflib contexts use their conjunctive graph as manager
+        while isinstance(manager, Graph):
+            manager = manager.namespace_manager
+        if manager is self:
+            return
+        version = getattr(manager, 'version', None)
+        if version is not None and self.merged.get(manager) == version:
+            return
+        for ns in list(manager.namespaces()):
+            self.bind(*ns)
+        if version is not None:
+            self.merged[manager] = version
@@ -0,0 +1,112 @@
+'''
+    ldp.offload
+    ~~~~~~~~~~~
+
+    Parsing and serialization of large resources in worker processes,
+    so they do not hold GIL of request threads. Graphs travel between
+    processes in snapshot exchange format (term table and arrays of
+    term ids). Enabled by `OFFLOAD_WORKERS` (0 for cpu count),
+    resources of `OFFLOAD_TRIPLES` triples and request bodies of
+    `OFFLOAD_BYTES` bytes or more are offloaded, smaller payloads are
+    handled in request thread. Workers are started with
+    `OFFLOAD_START_METHOD` ('spawn' by default), forking request
+    threads would copy locks held by other threads into workers.
+'''
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+from rdflib import Graph
+
+from flask import current_app, has_app_context
+
+from ldp import snapshot
+
+
+def serialize_encoded(encoded, **kwargs):
+    graphs, namespaces, meta = snapshot.decode(encoded)
+    (identifier, triples), = graphs.items()
+    g = Graph(identifier=identifier)
+    for ns in namespaces:
+        g.bind(*ns)
+    g.addN((s, p, o, g) for s, p, o in triples)
+    return g.serialize(**kwargs)
+
+
+def parse_encoded(data, **kwargs):
+    g = Graph().parse(data=data, **kwargs)
+    return snapshot.encode({g.identifier: g.triples((None, None, None))},
+                           g.namespaces())
+
+
+class Offloader(object):
+    def __init__(self, workers=None, triples=20000, size=1 << 20,
+                 start_method='spawn'):
+        self.workers = workers or None
+        self.triples = triples
+        self.size = size
+        self.start_method = start_method
+        self.lock = threading.Lock()
+        self._executor = None
+
+    @classmethod
+    def from_config(cls, config):
+        if config.get('OFFLOAD_WORKERS') is None:
+            return None
+        return cls(config['OFFLOAD_WORKERS'],
+                   triples=config.get('OFFLOAD_TRIPLES', 20000),
+                   size=config.get('OFFLOAD_BYTES', 1 << 20),
+                   start_method=config.get('OFFLOAD_START_METHOD', 'spawn'))
+
+    @property
+    def executor(self):
+        with self.lock:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=multiprocessing.get_context(
+                        self.start_method))
+            return self._executor
+
+    def serialize(self, identifier, triples, namespaces=(), **kwargs):
+        '''
+        Serializes `triples` in worker process, returns None
+        when there are too few of them to offload
+        '''
+        if len(triples) < self.triples:
+            return None
+        encoded = snapshot.encode({identifier: triples}, namespaces)
+        return self.executor.submit(serialize_encoded, encoded,
+                                    **kwargs).result()
+
+    def parse(self, data=None, **kwargs):
+        '''
+        Parses `data` in worker process into (triples, namespaces),
+        returns None when `data` is too small to offload
+        '''
+        if data is None or len(data) < self.size:
+            return None
+        graphs, namespaces, meta = snapshot.decode(
+            self.executor.submit(parse_encoded, data, **kwargs).result())
+        (identifier, triples), = graphs.items()
+        return triples, namespaces
+
+    def shutdown(self):
+        with self.lock:
+            if self._executor is not None:
+                self._executor.shutdown()
+                self._executor = None
+
+
+def current_offloader():
+    if not has_app_context():
+        return None
+    return getattr(current_app, 'offloader', None)
+
+
+def configure_offloader(*args, **kwargs):
+    app = current_app._get_current_object()
+    app.offloader = app.offloader_class.from_config(app.config)
+    if app.offloader is not None:
+        # pool is created with app, not by first large request
+        app.offloader.executor
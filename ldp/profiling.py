@@ -0,0 +1,132 @@
+'''
+    ldp.profiling
+    ~~~~~~~~~~~~~
+
+    Sampled request profiling. With `PROFILE_DIR` configured, LDP app
+    profiles `PROFILE_FRACTION` of requests and every request of
+    endpoints matching `PROFILE_ENDPOINTS` glob patterns (for example
+    ``'*.ldp.put'``) with cProfile. Stats are aggregated per endpoint
+    and written every `PROFILE_BATCH` profiled requests as
+    ``<endpoint>-<time>-<pid>.prof``, keeping `PROFILE_KEEP` newest files.
+'''
+import cProfile
+import fnmatch
+import os
+import pstats
+import random
+import re
+import threading
+import time
+
+from flask import request, current_app
+
+UNSAFE = re.compile(r'[^\w.-]+')
+
+
+class RequestProfiler(object):
+    def __init__(self, directory, fraction=0.0, endpoints=None,
+                 batch=1, keep=50, sample=random.random):
+        self.directory = directory
+        self.fraction = fraction
+        if isinstance(endpoints, str):
+            endpoints = [endpoints]
+        self.endpoints = re.compile('|'.join(
+            fnmatch.translate(e) for e in endpoints)) if endpoints else None
+        self.batch = batch
+        self.keep = keep
+        self.sample = sample
+        self.lock = threading.Lock()
+        self.pending = {}
+        self.counts = {}
+        if not os.path.isdir(directory):
+            os.makedirs(directory)
+
+    @classmethod
+    def from_config(cls, config):
+        if not config.get('PROFILE_DIR'):
+            return None
+        return cls(config['PROFILE_DIR'],
+                   fraction=config.get('PROFILE_FRACTION', 0.0),
+                   endpoints=config.get('PROFILE_ENDPOINTS', None),
+                   batch=config.get('PROFILE_BATCH', 1),
+                   keep=config.get('PROFILE_KEEP', 50))
+
+    def wants(self, endpoint):
+        if self.endpoints is not None and endpoint is not None\
+                and self.endpoints.match(endpoint):
+            return True
+        return self.fraction > 0 and self.sample() < self.fraction
+
+    def start(self):
+        profile = cProfile.Profile()
+        try:
+            profile.enable()
+        except ValueError:
+            # other profiler is active
+            return None
+        return profile
+
+    def stop(self, profile, endpoint):
+        profile.disable()
+        endpoint = endpoint or 'unmatched'
+        with self.lock:
+            stats = self.pending.get(endpoint)
+            if stats is None:
+                self.pending[endpoint] = pstats.Stats(profile)
+            else:
+                stats.add(profile)
+            self.counts[endpoint] = self.counts.get(endpoint, 0) + 1
+            if self.counts[endpoint] >= self.batch:
+                self.write(endpoint)
+
+    def write(self, endpoint):
+        stats = self.pending.pop(endpoint)
+        self.counts.pop(endpoint)
+        path = os.path.join(self.directory, '%s-%.6f-%s.prof' % (
+            UNSAFE.sub('_', endpoint), time.time(), os.getpid()))
+        stats.dump_stats(path)
+        self.rotate()
+        return path
+
+    def flush(self):
+        '''
+        Writes stats of every endpoint profiled since last write
+        '''
+        with self.lock:
+            return [self.write(endpoint) for endpoint in list(self.pending)]
+
+    def files(self):
+        return sorted((os.path.join(self.directory, name)
+                       for name in os.listdir(self.directory)
+                       if name.endswith('.prof')),
+                      key=os.path.getmtime)
+
+    def rotate(self):
+        files = self.files()
+        for path in files[:max(len(files) - self.keep, 0)]:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+
+def configure_profiler(*args, **kwargs):
+    app = current_app._get_current_object()
+    app.profiler = app.profiler_class.from_config(app.config)
+
+
+def start_profile(*args, **kwargs):
+    profiler = current_app.profiler
+    if profiler is None:
+        return
+    endpoint = request.url_rule.endpoint if request.url_rule else None
+    if profiler.wants(endpoint):
+        request.profile = profiler.start()
+
+
+def stop_profile(exc=None):
+    profile = getattr(request, 'profile', None)
+    if profile is not None:
+        current_app.profiler.stop(
+            profile,
+            request.url_rule.endpoint if request.url_rule else None)
@@ -0,0 +1,193 @@
+'''
+    ldp.reload
+    ~~~~~~~~~~
+
+    Hot reload of `DATASET_DESCRIPTORS` sources.
+    Changed sources are reparsed and compared with previous parse
+    by resource descriptions (subject triples together with blank
+    nodes reachable from them). Only difference of changed
+    descriptions is applied, to dataset context or to pool graph
+    the resource was moved to, so triples added by clients are kept.
+    Versions of changed pool resources are bumped, pool graphs left
+    empty by resources deleted from source are dropped.
+'''
+import os
+import threading
+
+from rdflib import BNode, ConjunctiveGraph, Graph
+from rdflib.compare import to_isomorphic
+
+from ldp.dataset import graph_loaded
+from ldp.snapshot import source_path
+
+
+def descriptions(graph):
+    '''
+    Yields `(subject, triples)` for every non blank node subject
+    '''
+    subjects = set(s for s in graph.subjects() if not isinstance(s, BNode))
+    for subject in subjects:
+        triples = []
+        seen = set()
+        queue = [subject]
+        while queue:
+            node = queue.pop()
+            for triple in graph.triples((node, None, None)):
+                triples.append(triple)
+                o = triple[2]
+                if isinstance(o, BNode) and o not in seen:
+                    seen.add(o)
+                    queue.append(o)
+        yield subject, triples
+
+
+def signature(triples):
+    if any(isinstance(t, BNode) for triple in triples for t in triple):
+        g = Graph()
+        for triple in triples:
+            g.add(triple)
+        return to_isomorphic(g).graph_digest()
+    return hash(frozenset(triples))
+
+
+def signatures(described):
+    return dict((s, signature(triples))
+                for s, triples in described.items())
+
+
+class SourceWatcher(object):
+    '''
+    Polls sources of dataset named graphs every `interval` seconds.
+    Graphs are compared with the parse they were loaded from,
+    so watcher is created before resources are moved to pool.
+    With `locks` (app `LockManager`) changed resources are applied
+    under their write lock and migration mutex, so requests never see
+    half applied descriptions
+    '''
+    def __init__(self, ds, descriptors, interval=1.0, locks=None):
+        self.ds = ds
+        self.interval = interval
+        self.locks = locks
+        self.descriptors = {}
+        self.mtimes = {}
+        self.descriptions = {}
+        self.signatures = {}
+        self.stopped = threading.Event()
+        self.thread = None
+
+        for name, descriptor in descriptors.items():
+            path = source_path(descriptor)
+            if path is None or name == 'pool':
+                continue
+            descriptor = dict((k, v) for k, v in descriptor.items()
+                              if k not in ('file', 'location', 'lazy',
+                                           'evict_after', 'snapshot_dir'))
+            descriptor['source'] = path
+            self.descriptors[name] = descriptor
+            if name in ds.g.map:
+                self.track(name, ds.g.map[name])
+        graph_loaded.connect(self.graph_loaded, sender=ds.g)
+
+    def track(self, name, graph):
+        self.mtimes[name] = os.stat(self.descriptors[name]['source']).st_mtime
+        self.descriptions[name] = dict((s, frozenset(triples))
+                                       for s, triples in descriptions(graph))
+        self.signatures[name] = signatures(self.descriptions[name])
+
+    def graph_loaded(self, sender, name, graph):
+        if name in self.descriptors:
+            self.track(name, graph)
+
+    def start(self):
+        self.thread = threading.Thread(target=self.run,
+                                       name='ldp-source-watcher')
+        self.thread.daemon = True
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.stopped.set()
+
+    def run(self):
+        while not self.stopped.wait(self.interval):
+            self.check()
+
+    def check(self):
+        '''
+        Reloads changed sources, returns changed resources
+        '''
+        changed = set()
+        for name in list(self.signatures):
+            if name not in self.ds.g.map:
+                del self.signatures[name]
+                del self.descriptions[name]
+                continue
+            mtime = os.stat(self.descriptors[name]['source']).st_mtime
+            if mtime != self.mtimes[name]:
+                self.mtimes[name] = mtime
+                changed.update(self.reload(name))
+        return changed
+
+    def reload(self, name):
+        source = ConjunctiveGraph().parse(**self.descriptors[name])
+        fresh = dict((s, frozenset(triples))
+                     for s, triples in descriptions(source))
+        fresh_signatures = signatures(fresh)
+        previous = self.signatures[name]
+
+        changed = set(s for s in set(previous).union(fresh_signatures)
+                      if previous.get(s) != fresh_signatures.get(s))
+        described = self.descriptions[name]
+
+        context = self.ds.g.map[name]
+        pool = self.ds.g['pool']
+        for subject in changed:
+            held = None
+            if self.locks is not None:
+                held = self.locks.acquire((subject, ), write=True)
+                self.locks.migration.acquire()
+            try:
+                self.apply(subject, described.get(subject, frozenset()),
+                           fresh.get(subject, frozenset()), context, pool)
+                if not hasattr(pool, 'commit') \
+                        and subject in pool.identifiers:
+                    pool.versions.bump(subject)
+            finally:
+                if held is not None:
+                    self.locks.migration.release()
+                    held.release()
+
+        self.descriptions[name] = fresh
+        self.signatures[name] = fresh_signatures
+        return changed
+
+    def apply(self, subject, previous, fresh, context, pool):
+        '''
+        Applies difference of `previous` and `fresh` description
+        of `subject`, subject triples go to pool graph once resource
+        is moved there, blank nodes stay in context
+        '''
+        removed = previous.difference(fresh)
+        added = fresh.difference(previous)
+        moved = subject in pool.identifiers
+        for triple in removed:
+            if triple[0] != subject or not moved:
+                context.remove(triple)
+        for triple in added:
+            if triple[0] != subject or not moved:
+                context.add(triple)
+        if not moved:
+            return
+
+        removed = [t for t in removed if t[0] == subject]
+        added = [t for t in added if t[0] == subject]
+        if hasattr(pool, 'commit'):
+            pool.commit(subject, added, removed)
+        else:
+            target = pool.graph(subject)
+            for triple in removed:
+                target.remove(triple)
+            for triple in added:
+                target.add(triple)
+        if not len(pool.graph(subject)):
+            pool.remove_graph(subject)
@@ -1,3 +1,5 @@
+from time import perf_counter
+
 from flask import request
 from cached_property import cached_property
 from treelib import Tree
@@ -10,6 +12,9 @@ from rdflib.resource import Resource as RDFResource
 
 from ldp import NS as LDP
 from ldp.helpers import Uncacheable
+from ldp.timing import record
+from ldp.metrics import emit, resource_serialized
+from ldp.offload import current_offloader
 
 
 def ldp_types_hierarchy():
@@ -60,51 +65,137 @@ def implied_types(*explicit_types, hierarchy=TYPES):
 
 
 class LDP_RDFResource(Uncacheable, RDFResource):
+    '''
+    Serializations are shared between requests through `pool`
+    representations cache, keyed by resource version, and built
+    from pool snapshot of resource graph.
+    Changes go through `commit`, code modifying resource graph
+    directly calls `uncache` to bump version
+    '''
     SERIALIZED_ATTRIBUTE_MAP = {
         'text/turtle': 'turtle_serialization',
         'application/ld+json': 'ldjson_serialization',
         }
 
+    pool = None
+
+    @cached_property
+    def snapshot(self):
+        if not hasattr(self.pool, 'snapshot'):
+            return None
+        return self.pool.snapshot(self.identifier)
+
+    @property
+    def version(self):
+        if self.snapshot is not None:
+            return self.snapshot.version
+        if self.pool is None:
+            return None
+        return self.pool.versions[self.identifier]
+
+    def serialize(self, **kwargs):
+        start = perf_counter()
+        if self.snapshot is not None:
+            data = self.offloaded_serialize(**kwargs)
+            if data is None:
+                data = self.snapshot.graph().serialize(**kwargs)
+        else:
+            data = self.graph.serialize(**kwargs)
+        duration = perf_counter() - start
+        record('serialize', duration)
+        emit(resource_serialized, format=kwargs.get('format'),
+             size=len(data), duration=duration)
+        return data
+
+    def offloaded_serialize(self, **kwargs):
+        offloader = current_offloader()
+        if offloader is None:
+            return None
+        manager = self.snapshot.namespace_manager
+        return offloader.serialize(
+            self.identifier, self.snapshot.triples,
+            manager.namespaces() if manager is not None else (), **kwargs)
+
+    def representation(self, name, build):
+        cache = getattr(self.pool, 'representations', None)
+        if cache is None:
+            return build()
+        return cache.get((self.identifier, self.version, name), build)
+
+    def commit(self, added=(), removed=(), namespaces=()):
+        '''
+        Applies changes to resource graph
+        '''
+        if hasattr(self.pool, 'commit'):
+            self.pool.commit(self.identifier, added, removed, namespaces)
+            super(LDP_RDFResource, self).uncache()
+            return
+        for triple in removed:
+            self.graph.remove(triple)
+        for triple in added:
+            self.graph.add(triple)
+        for ns in namespaces:
+            self.graph.bind(*ns)
+        self.uncache()
+
+    def uncache(self, *uncaches):
+        if not uncaches and self.pool is not None:
+            self.pool.versions.bump(self.identifier)
+        super(LDP_RDFResource, self).uncache(*uncaches)
+
     @cached_property
     def etag(self):
-        return generate_etag(self.turtle_serialization)
+        return self.representation(
+            'etag', lambda: generate_etag(self.turtle_serialization))
 
     @cached_property
     def turtle_serialization(self):
-        return self.graph.serialize(format='turtle')
+        return self.representation(
+            'turtle', lambda: self.serialize(format='turtle'))
 
     @cached_property
     def ldjson_serialization(self):
-        return self.graph.serialize(format='json-ld')
+        return self.representation(
+            'json-ld', lambda: self.serialize(format='json-ld'))
 
     @cached_property
     def rdfxml_serialization(self):
-        return self.graph.serialize()
+        return self.representation(
+            'xml', lambda: self.serialize())
+
+
+def parse_triples(identifier=None, **kwargs):
+    '''
+    Returns (triples, namespaces) parsed from `kwargs`, large
+    payloads are parsed by app offloader
+    '''
+    offloader = current_offloader()
+    if offloader is not None:
+        parsed = offloader.parse(**kwargs)
+        if parsed is not None:
+            return parsed
+    g = Graph(identifier=identifier).parse(**kwargs)
+    return list(g[::]), list(g.namespaces())
 
 
 def replace_resource(rule, resource, **kwargs):
-        source = Graph(identifier=resource.identifier)
-        source.parse(**kwargs)
+        triples, namespaces = parse_triples(resource.identifier, **kwargs)
 
-        added = set(source[::])
-        removed = set(resource.graph[::])
+        added = set(triples)
+        current = set(resource.graph[::])
+        removed = current.difference(added)
 
         is_container = bool(set(rule.bound_to.resource_types)
                             .intersection(CONTAINMENT_TYPES))
-        for triple in removed.difference(added):
+        for triple in removed:
             if (is_container
                     and triple[0] == resource.identifier
                     and triple[1] == LDP.contains):
                     raise Conflict(
                         'Unable to modify containment triple for %r'
                         % resource.identifier)
-            resource.graph.remove(triple)
 
-        for triple in added.difference(removed):
-            resource.graph.add(triple)
-
-        for ns in source.namespaces():
-            resource.graph.bind(*ns)
+        resource.commit(added.difference(current), removed, namespaces)
 
 
 def build_put_rule(app, bound_to):
@@ -115,7 +206,6 @@ def build_put_rule(app, bound_to):
                          resource,
                          data=request.data,
                          format=MIME_FORMAT[mimetype])
-        resource.uncache()
         return app.make_response(('', 204, ()))
 
     rule = match_headers(
@@ -147,20 +237,18 @@ def build_get_rule(app, bound_to):
 
 
 def identified_graph(**kwargs):
-    g = Graph().parse(**kwargs)
-    try:
-        next(g[::])
-    except StopIteration:
+    triples, namespaces = parse_triples(**kwargs)
+    if not triples:
         raise UnprocessableEntity('No triples found in <pre>\n%r\n</pre>'
                                   % kwargs['data'].decode())
 
-    subject = list(set((s for s, o in g[:RDF.type:])))
+    subject = list(set((s for s, p, o in triples if p == RDF.type)))
     if len(subject) > 1:
         raise Conflict('Multiple subjects %r found while creating resource' %
                        subject)
     subject = subject.pop()
 
-    return subject, g[::]
+    return subject, triples
 
 
 def create_contained_resource(rule, resource, **kwargs):
@@ -172,11 +260,16 @@ def create_contained_resource(rule, resource, **kwargs):
     link = adapter.url_for(identifier)
 
     if link is not None:
-        dest = adapter.pool.graph(identifier)
-        for t in triples:
-            dest.add(t)
-
-        resource.add(LDP.contains, identifier)
+        if hasattr(adapter.pool, 'commit'):
+            adapter.pool.commit(identifier, triples)
+        else:
+            dest = adapter.pool.graph(identifier)
+            for t in triples:
+                dest.add(t)
+
+        if hasattr(adapter.pool, 'contain'):
+            adapter.pool.contain(resource.identifier, identifier)
+        resource.commit([(resource.identifier, LDP.contains, identifier)])
         return link
     else:
         raise UnprocessableEntity('No url found for %r' % identifier)
@@ -189,7 +282,6 @@ def build_post_rule(app, bound_to):
         path = create_contained_resource(
             request.url_rule.bound_to, resource,
             data=request.data, format=MIME_FORMAT[mimetype])
-        resource.uncache()
         return app.make_response(('', 201, (('Location', path), )))
 
     rule = match_headers(
@@ -1,6 +1,8 @@
 
 import re
 import fnmatch
+import threading
+from contextvars import ContextVar
 
 from cached_property import cached_property
 
@@ -11,18 +13,25 @@ from werkzeug.routing import (parse_rule,
                               ValidationError,
                               BuildError)
 from werkzeug._compat import iteritems
-from werkzeug.local import LocalProxy
 
 from flask import Flask
 
 from ldp import NS as LDP
-from ldp.globals import dataset, pool
-from ldp.dataset import DatasetGraphAggregation
+from ldp.globals import dataset, pool, current_object
+from ldp.dataset import DatasetGraphAggregation, NamedContextDataset
 from ldp.helpers import Pipeline
 from ldp.resource import LDP_RDFResource
+from ldp.terms import interner
+from ldp.timing import timed
+from ldp.metrics import emit, resource_resolved
 
 
 
+# headers of request being matched, rules are shared by all requests
+_request_headers = ContextVar('ldp.request_headers', default=None)
+_compile_lock = threading.Lock()
+
+
 class match_headers(str):
     __slots__ = ('headers', )
 
@@ -37,17 +46,23 @@ class HeadersRule(Flask.url_rule_class):
     Can match headers and var inside of headers if rule
         defined with `match_headers` metaclass
     '''
+    @property
+    def headers(self):
+        return _request_headers.get()
+
     def match(self, *args, **kwargs):
         match = super(HeadersRule, self).match(*args, **kwargs)
         if hasattr(self.rule, 'headers')\
            and not hasattr(self, '_header_rules_compiled'):
-            self.rule.headers = dict(
+            with _compile_lock:
+                if not hasattr(self, '_header_rules_compiled'):
+                    self.rule.headers = dict(
                                     ((k, self.compile_header_rule(v))
                                      for k, v
                                      in self.rule.headers.items()))
-            self._header_rules_compiled = True
+                    self._header_rules_compiled = True
 
-        if hasattr(self, 'headers')\
+        if self.headers is not None\
            and hasattr(self.rule, 'headers') and match is not None:
             if not set(self.headers.keys())\
                     .issuperset(set(self.rule.headers.keys())):
@@ -126,15 +141,20 @@ def header_rule_mixin(cls):
         def create_url_adapter(self, request):
             adapter = cls.create_url_adapter.__get__(self, cls)(request)
             if request is not None:
-                for rule in adapter.map._rules:
-                    rule.headers = request.headers
                 _match = adapter.match
+                matched = []
 
                 def match(self, *args, **kwargs):
-                    rv = _match(*args, **kwargs)
-                    for rule in adapter.map._rules:
-                        del rule.__dict__['headers']
-                    return rv
+                    # headers select rule of request only, later
+                    # matches (allowed methods) ignore them
+                    if matched:
+                        return _match(*args, **kwargs)
+                    matched.append(True)
+                    token = _request_headers.set(request.headers)
+                    try:
+                        return _match(*args, **kwargs)
+                    finally:
+                        _request_headers.reset(token)
                 adapter.match = match.__get__(adapter, adapter.__class__)
             return adapter
     return HeaderRuleMixin
@@ -157,12 +177,9 @@ class BindableRule(HeadersRule):
         super(BindableRule, self).__init__(*args, **kwargs)
         self.resource_vars = {}
 
-    @cached_property
+    @property
     def context(self):
-        if isinstance(self._context, LocalProxy):
-            context = self._context._get_current_object()
-        else:
-            context = self._context
+        context = current_object(self._context)
 
         if isinstance(context, DatasetGraphAggregation):
             raise TypeError('%r cant be resource context' % context)
@@ -182,7 +199,13 @@ class BindableRule(HeadersRule):
         return match
 
 
+def read_only(context):
+    return getattr(context.store, 'read_only', False)
+
+
 def remove_from_context(quad, context, is_quad=True):
+    if read_only(context):
+        return quad
     if is_quad:
         context.remove(quad)
     else:
@@ -212,18 +235,37 @@ class ResourceContextAdapter(object):
 
     @cached_property
     def pool_uris(self):
+        identifiers = getattr(self.pool, 'identifiers', None)
+        if identifiers is not None:
+            return identifiers
         return [n.identifier for n in self.pool.contexts()]
 
     @cached_property
     def resource(self):
+        g = self.pooled()
+        if g is None:
+            with self.app.locks.migration:
+                # resource may have been moved while waiting
+                self.__dict__.pop('pool_uris', None)
+                g = self.pooled()
+                if g is None:
+                    self.resource_moved_to_pool = False
+                    with timed('move_to_pool'):
+                        g = self.move_to_pool()
+                    if g is None:
+                        emit(resource_resolved, identifier=self.uriref,
+                             source='missing')
+                        return
+                    emit(resource_resolved, identifier=self.uriref,
+                         source='moved')
+        resource = self.rdf_resource_class(g, self.uriref)
+        resource.pool = self.pool
+        return resource
+
+    def pooled(self):
         if self.uriref in self.pool_uris:
-            return self.rdf_resource_class(self.pool.graph(self.uriref),
-                                           self.uriref)
-        else:
-            self.resource_moved_to_pool = False
-            g = self.move_to_pool()
-            if g is not None:
-                return self.rdf_resource_class(g, self.uriref)
+            emit(resource_resolved, identifier=self.uriref, source='pool')
+            return self.pool.graph(self.uriref)
 
     def select_quads(self, quads, context):
         pipeline = Pipeline(self.selectors)
@@ -233,10 +275,22 @@ class ResourceContextAdapter(object):
             yield q
 
     def move_to_pool(self,):
-        g = self.pool.graph(self.uriref)
-        for ns in self.context.namespaces():
-            g.bind(*ns)
         context = self.context
+        if isinstance(context, NamedContextDataset):
+            # resource may be in any named graph, lazy ones are loaded,
+            # but stay evictable once idle
+            context.g.load_all(pin=False)
+        committing = hasattr(self.pool, 'commit')
+        # pools with commit register resource once it is committed,
+        # readers never see it before its snapshot
+        g = None if committing else self.pool.graph(self.uriref)
+        manager = self.pool.namespace_manager if committing \
+            else g.namespace_manager
+        if hasattr(manager, 'merge'):
+            manager.merge(context)
+        else:
+            for ns in context.namespaces():
+                (self.pool if committing else g).bind(*ns)
         if hasattr(context, 'quads'):
             quads = context.quads((self.uriref, None, None, None))
 
@@ -244,12 +298,21 @@ class ResourceContextAdapter(object):
             quads = ((s, p, o, context.identifier)
                      for s, p, o in context.triples((self.uriref, None, None)))
 
+        removable = not read_only(context)
+        triples = []
         for quad in self.select_quads(quads, context):
-            self.context.remove(quad)
-            g.add(quad[:3])
-
-        if self.resource_moved_to_pool:
-            return g
+            if removable:
+                self.context.remove(quad)
+            triples.append(quad[:3])
+
+        if not self.resource_moved_to_pool:
+            return
+        if committing:
+            self.pool.commit(self.uriref, triples, bump=False)
+            return self.pool.graph(self.uriref)
+        for triple in triples:
+            g.add(interner.triple(triple))
+        return g
 
     @cached_property
     def urladapter(self):
@@ -0,0 +1,177 @@
+import hashlib
+import os
+import pickle
+from array import array
+
+from rdflib import URIRef, BNode, Literal
+
+from ldp.terms import uriref, intern
+
+SNAPSHOT_VERSION = 1
+
+URIREF, BNODE, LITERAL = range(3)
+
+
+class SnapshotError(ValueError):
+    pass
+
+
+class TermTable(object):
+    '''
+    Interns terms into integer ids, so every distinct term
+    is written to snapshot exactly once
+    '''
+    def __init__(self):
+        self.ids = {}
+        self.terms = []
+
+    def __call__(self, term):
+        try:
+            return self.ids[term]
+        except KeyError:
+            self.ids[term] = i = len(self.terms)
+            self.terms.append(term)
+            return i
+
+    def encoded(self):
+        for term in self.terms:
+            if isinstance(term, Literal):
+                yield (LITERAL, str(term), term.datatype, term.language)
+            elif isinstance(term, BNode):
+                yield (BNODE, str(term))
+            else:
+                yield (URIREF, str(term))
+
+
+def decode_terms(encoded):
+    for item in encoded:
+        kind = item[0]
+        if kind == URIREF:
+            yield uriref(item[1])
+        elif kind == BNODE:
+            yield intern(BNode(item[1]))
+        else:
+            yield intern(Literal(item[1], datatype=item[2], lang=item[3]))
+
+
+def encode(graphs, namespaces=(), **meta):
+    '''
+    Encodes `graphs` (mapping of graph identifier to triples)
+    as term table and flat arrays of term ids
+    '''
+    table = TermTable()
+    encoded_graphs = []
+    for identifier, triples in graphs.items():
+        ids = array('Q')
+        for triple in triples:
+            ids.extend(table(t) for t in triple)
+        encoded_graphs.append((table(identifier), ids.tobytes()))
+
+    return {'version': SNAPSHOT_VERSION,
+            'meta': meta,
+            'namespaces': [(p, str(n)) for p, n in namespaces],
+            'terms': list(table.encoded()),
+            'graphs': encoded_graphs}
+
+
+def decode(snapshot):
+    '''
+    Returns `(graphs, namespaces, meta)` where `graphs` maps
+    graph identifier to list of triples
+    '''
+    if not isinstance(snapshot, dict)\
+            or snapshot.get('version') != SNAPSHOT_VERSION:
+        raise SnapshotError('Unsupported snapshot version')
+
+    terms = list(decode_terms(snapshot['terms']))
+    graphs = {}
+    for identifier, data in snapshot['graphs']:
+        ids = array('Q')
+        ids.frombytes(data)
+        graphs[terms[identifier]] = [(terms[ids[i]],
+                                      terms[ids[i + 1]],
+                                      terms[ids[i + 2]])
+                                     for i in range(0, len(ids), 3)]
+    namespaces = [(p, URIRef(n)) for p, n in snapshot['namespaces']]
+    return graphs, namespaces, snapshot['meta']
+
+
+def dump(graphs, path, namespaces=(), **meta):
+    tmp_path = '%s.%s.tmp' % (path, os.getpid())
+    with open(tmp_path, 'wb') as f:
+        pickle.dump(encode(graphs, namespaces, **meta), f,
+                    protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(tmp_path, path)
+
+
+def load(path):
+    with open(path, 'rb') as f:
+        return decode(pickle.load(f))
+
+
+def file_digest(path, chunk_size=1 << 20):
+    digest = hashlib.sha1()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def source_path(descriptor):
+    '''
+    Absolute path of descriptor source file, if it has one
+    '''
+    source = descriptor.get('source', descriptor.get('location'))
+    if source is None and hasattr(descriptor.get('file'), 'name'):
+        source = descriptor['file'].name
+    if isinstance(source, str) and os.path.isfile(source):
+        return os.path.abspath(source)
+
+
+class DescriptorSnapshot(object):
+    '''
+    Snapshot of graph parsed from `DATASET_DESCRIPTORS` entry.
+    Valid while source path, mtime and content hash are unchanged
+    '''
+    def __init__(self, directory, descriptor):
+        self.directory = directory
+        self.descriptor = descriptor
+        self.source = source_path(descriptor)
+
+    @property
+    def cacheable(self):
+        return self.source is not None
+
+    @property
+    def path(self):
+        key = repr(sorted((k, str(v)) for k, v in self.descriptor.items()
+                          if k not in ('source', 'location', 'file')))
+        key = hashlib.sha1((self.source + key).encode('utf-8')).hexdigest()
+        return os.path.join(self.directory, '%s.snapshot' % key)
+
+    def load(self):
+        '''
+        Returns `(identifier, triples, namespaces)` or None
+        if snapshot is missing or outdated
+        '''
+        try:
+            graphs, namespaces, meta = load(self.path)
+        except (OSError, EOFError, pickle.UnpicklingError, SnapshotError):
+            return None
+
+        if meta.get('source') != self.source\
+                or meta.get('mtime') != os.stat(self.source).st_mtime\
+                or meta.get('sha1') != file_digest(self.source):
+            return None
+
+        (identifier, triples), = graphs.items()
+        return identifier, triples, namespaces
+
+    def dump(self, graph):
+        os.makedirs(self.directory, exist_ok=True)
+        dump({graph.identifier: graph.triples((None, None, None))},
+             self.path,
+             namespaces=graph.namespaces(),
+             source=self.source,
+             mtime=os.stat(self.source).st_mtime,
+             sha1=file_digest(self.source))
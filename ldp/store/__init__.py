@@ -0,0 +1,31 @@
+'''
+    ldp.store
+    ~~~~~~~~~
+
+    rdflib stores pluggable as LDP pool with
+    `DATASET_DESCRIPTORS = {'pool': {'store': name, ...}}`
+'''
+from importlib import import_module
+
+STORES = {
+    'default': None,
+    'sqlite': 'ldp.store.sqlite.SQLiteStore',
+    'compact': 'ldp.store.compact.CompactStore',
+}
+
+
+def pool_store(store='default', **options):
+    '''
+    Returns rdflib store instance (or plugin name) for pool
+    '''
+    if not isinstance(store, str):
+        return store
+
+    if store not in STORES:
+        raise LookupError('Unknown pool store %r' % store)
+
+    if STORES[store] is None:
+        return store
+
+    module, cls = STORES[store].rsplit('.', 1)
+    return getattr(import_module(module), cls)(**options)
@@ -0,0 +1,344 @@
+'''
+    ldp.store.compact
+    ~~~~~~~~~~~~~~~~~
+
+    Memory efficient pool store. Terms are interned into integer ids,
+    triples of every graph are kept in three sorted `array` permutations
+    (SPO, POS, OSP), so a triple costs 36 bytes of index data
+    instead of nested dicts of term objects.
+'''
+from array import array
+from bisect import bisect_left
+
+from rdflib import Graph
+from rdflib.store import Store
+
+from ldp.terms import intern
+
+TYPECODE = 'I'
+
+
+def spo(s, p, o):
+    return s, p, o
+
+
+def pos(s, p, o):
+    return p, o, s
+
+
+def osp(s, p, o):
+    return o, s, p
+
+
+class Rows(object):
+    '''
+    Flat array of id triples viewed as sorted sequence of tuples
+    '''
+    __slots__ = ('ids', )
+
+    def __init__(self, ids):
+        self.ids = ids
+
+    def __len__(self):
+        return len(self.ids) // 3
+
+    def __getitem__(self, i):
+        ids = self.ids
+        i *= 3
+        return ids[i], ids[i + 1], ids[i + 2]
+
+    def range(self, prefix):
+        if not prefix:
+            return 0, len(self)
+        upper = prefix[:-1] + (prefix[-1] + 1, )
+        return bisect_left(self, prefix), bisect_left(self, upper)
+
+    def insert(self, key):
+        i = bisect_left(self, key)
+        if i < len(self) and self[i] == key:
+            return False
+        self.ids[i * 3:i * 3] = array(TYPECODE, key)
+        return True
+
+    def delete(self, key):
+        i = bisect_left(self, key)
+        if i < len(self) and self[i] == key:
+            del self.ids[i * 3:i * 3 + 3]
+            return True
+        return False
+
+
+class GraphIndex(object):
+    __slots__ = ('spo', 'pos', 'osp')
+
+    def __init__(self):
+        self.spo = array(TYPECODE)
+        self.pos = array(TYPECODE)
+        self.osp = array(TYPECODE)
+
+    def __len__(self):
+        return len(self.spo) // 3
+
+    def add(self, triple):
+        if Rows(self.spo).insert(triple):
+            Rows(self.pos).insert(pos(*triple))
+            Rows(self.osp).insert(osp(*triple))
+            return True
+        return False
+
+    def extend(self, triples):
+        triples = set(triples)
+        triples.update(Rows(self.spo)[i] for i in range(len(self)))
+        for name, permutation in (('spo', spo), ('pos', pos), ('osp', osp)):
+            ids = array(TYPECODE)
+            for key in sorted(permutation(*t) for t in triples):
+                ids.extend(key)
+            setattr(self, name, ids)
+
+    def discard(self, triple):
+        if Rows(self.spo).delete(triple):
+            Rows(self.pos).delete(pos(*triple))
+            Rows(self.osp).delete(osp(*triple))
+
+    def match(self, s, p, o):
+        '''
+        Yields id triples matching pattern, `None` is wildcard
+        '''
+        if s is not None:
+            if p is None and o is not None:
+                rows, prefix, restore = self.osp, (o, s), pos
+            else:
+                rows, prefix, restore = self.spo, \
+                    (s, ) if p is None else (s, p) if o is None \
+                    else (s, p, o), spo
+        elif p is not None:
+            rows, prefix, restore = self.pos, \
+                (p, ) if o is None else (p, o), osp
+        elif o is not None:
+            rows, prefix, restore = self.osp, (o, ), pos
+        else:
+            rows, prefix, restore = self.spo, (), spo
+
+        rows = Rows(rows)
+        start, stop = rows.range(prefix)
+        for i in range(start, stop):
+            yield restore(*rows[i])
+
+
+class CompactStore(Store):
+    context_aware = True
+    graph_aware = True
+    formula_aware = False
+    transaction_aware = False
+
+    def __init__(self, configuration=None, identifier=None):
+        self.ids = {}
+        self.terms = []
+        self.indexes = {}
+        self.subjects = {}
+        self.__namespace = {}
+        self.__prefix = {}
+        super(CompactStore, self).__init__(configuration, identifier)
+
+    def intern(self, term):
+        try:
+            return self.ids[term]
+        except KeyError:
+            term = intern(term)
+            self.ids[term] = tid = len(self.terms)
+            self.terms.append(term)
+            return tid
+
+    def encode(self, triple):
+        '''
+        Returns id pattern or None if some bound term is unknown
+        '''
+        ids = []
+        for term in triple:
+            if term is None:
+                ids.append(None)
+            else:
+                tid = self.ids.get(term)
+                if tid is None:
+                    return None
+                ids.append(tid)
+        return ids
+
+    def graph(self, gid):
+        return Graph(store=self, identifier=self.terms[gid])
+
+    def index(self, context, create=False):
+        if context is None:
+            return None, None
+        if create:
+            gid = self.intern(context.identifier)
+            if gid not in self.indexes:
+                self.indexes[gid] = GraphIndex()
+        else:
+            gid = self.ids.get(context.identifier)
+        return gid, self.indexes.get(gid)
+
+    def subject_graphs(self, sid):
+        graphs = self.subjects.get(sid, ())
+        return (graphs, ) if isinstance(graphs, int) else graphs
+
+    def link_subject(self, sid, gid):
+        graphs = self.subjects.get(sid)
+        if graphs is None:
+            self.subjects[sid] = gid
+        elif isinstance(graphs, int):
+            if graphs != gid:
+                self.subjects[sid] = set((graphs, gid))
+        else:
+            graphs.add(gid)
+
+    def unlink_subject(self, sid, gid, index):
+        if next(index.match(sid, None, None), None) is not None:
+            return
+        graphs = self.subjects.get(sid)
+        if isinstance(graphs, int):
+            if graphs == gid:
+                del self.subjects[sid]
+        elif graphs is not None:
+            graphs.discard(gid)
+            if len(graphs) == 1:
+                self.subjects[sid] = graphs.pop()
+
+    def add(self, triple, context, quoted=False):
+        Store.add(self, triple, context, quoted)
+        gid, index = self.index(context, create=True)
+        ids = tuple(self.intern(t) for t in triple)
+        if index.add(ids):
+            self.link_subject(ids[0], gid)
+
+    def addN(self, quads):
+        '''
+        Bulk insert path, graphs are sorted once per call
+        '''
+        grouped = {}
+        for s, p, o, c in quads:
+            Store.add(self, (s, p, o), c)
+            grouped.setdefault(c, []).append(
+                (self.intern(s), self.intern(p), self.intern(o)))
+        for context, triples in grouped.items():
+            gid, index = self.index(context, create=True)
+            index.extend(triples)
+            for triple in triples:
+                self.link_subject(triple[0], gid)
+
+    def remove(self, triple, context=None):
+        Store.remove(self, triple, context)
+        pattern = self.encode(triple)
+        if pattern is None:
+            return
+        for gid in self.candidate_graphs(pattern, context):
+            index = self.indexes[gid]
+            for ids in list(index.match(*pattern)):
+                index.discard(ids)
+                self.unlink_subject(ids[0], gid, index)
+
+    def candidate_graphs(self, pattern, context):
+        if context is not None:
+            gid = self.ids.get(context.identifier)
+            return (gid, ) if gid in self.indexes else ()
+        if pattern[0] is not None:
+            return tuple(self.subject_graphs(pattern[0]))
+        return tuple(self.indexes)
+
+    def triples(self, triple, context=None):
+        pattern = self.encode(triple)
+        if pattern is None:
+            return
+        terms = self.terms
+        if context is not None:
+            for gid in self.candidate_graphs(pattern, context):
+                for s, p, o in self.indexes[gid].match(*pattern):
+                    yield ((terms[s], terms[p], terms[o]),
+                           iter((context, )))
+            return
+
+        matches = {}
+        for gid in self.candidate_graphs(pattern, None):
+            for ids in self.indexes[gid].match(*pattern):
+                matches.setdefault(ids, []).append(gid)
+        for (s, p, o), graphs in matches.items():
+            yield ((terms[s], terms[p], terms[o]),
+                   (self.graph(gid) for gid in graphs))
+
+    @property
+    def triple_bytes(self):
+        '''
+        Bytes of id indexes per triple, three permutations
+        of three ids
+        '''
+        return 9 * array(TYPECODE).itemsize
+
+    def memory_usage(self, context):
+        '''
+        Bytes of id indexes of `context`, terms are shared
+        by graphs and not included
+        '''
+        gid, index = self.index(context)
+        if index is None:
+            return 0
+        return sum(ids.itemsize * len(ids)
+                   for ids in (index.spo, index.pos, index.osp))
+
+    def __len__(self, context=None):
+        if context is not None:
+            gid, index = self.index(context)
+            return len(index) if index is not None else 0
+        return len(set(ids for index in self.indexes.values()
+                       for ids in index.match(None, None, None)))
+
+    def contexts(self, triple=None):
+        if triple is None or triple == (None, None, None):
+            for gid in list(self.indexes):
+                yield self.graph(gid)
+            return
+        pattern = self.encode(triple)
+        if pattern is None:
+            return
+        for gid in self.candidate_graphs(pattern, None):
+            if next(self.indexes[gid].match(*pattern), None) is not None:
+                yield self.graph(gid)
+
+    def add_graph(self, graph):
+        self.index(graph, create=True)
+
+    def remove_graph(self, graph):
+        gid, index = self.index(graph)
+        if index is None:
+            return
+        for ids in list(index.match(None, None, None)):
+            index.discard(ids)
+            self.unlink_subject(ids[0], gid, index)
+        del self.indexes[gid]
+
+    def bind(self, prefix, namespace):
+        bound = self.__namespace.pop(prefix, None)
+        if bound is not None:
+            self.__prefix.pop(bound, None)
+        bound = self.__prefix.pop(namespace, None)
+        if bound is not None:
+            self.__namespace.pop(bound, None)
+        self.__prefix[namespace] = prefix
+        self.__namespace[prefix] = namespace
+
+    def namespace(self, prefix):
+        return self.__namespace.get(prefix, None)
+
+    def prefix(self, namespace):
+        return self.__prefix.get(namespace, None)
+
+    def namespaces(self):
+        for prefix, namespace in self.__namespace.items():
+            yield prefix, namespace
+
+    def memory(self):
+        '''
+        Returns bytes used by triple indexes
+        '''
+        return sum(ids.buffer_info()[1] * ids.itemsize
+                   for index in self.indexes.values()
+                   for ids in (index.spo, index.pos, index.osp))
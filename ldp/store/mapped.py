@@ -0,0 +1,290 @@
+'''
+    ldp.store.mapped
+    ~~~~~~~~~~~~~~~~
+
+    Read-only graph store served from memory-mapped file, so pre-fork
+    workers share one page cache copy of `DATASET_DESCRIPTORS` data.
+    Files are built with `ldp-map` and used as named graph with
+    `DATASET_DESCRIPTORS = {name: {'mapped': path}}`.
+
+    File layout: header, term offsets, sorted term keys (term id is
+    position of its key), SPO/POS/OSP permutations of uint32 id
+    triples, namespaces as JSON.
+'''
+import argparse
+import json
+import mmap
+import pathlib
+import struct
+import sys
+from array import array
+from bisect import bisect_left
+
+from rdflib import Graph, URIRef, BNode, Literal
+from rdflib.graph import ModificationException
+from rdflib.store import Store
+from rdflib.util import guess_format
+
+from ldp.store.compact import GraphIndex, spo, pos, osp
+from ldp.terms import uriref, term_key as cache_key
+
+MAGIC = b'LDPMAP01'
+HEADER = struct.Struct('<8sQQQQQQQ')
+
+URIREF, BNODE, LITERAL = b'\x00', b'\x01', b'\x02'
+
+
+def term_key(term):
+    if isinstance(term, Literal):
+        return b''.join((LITERAL, str(term).encode('utf-8'), b'\x00',
+                         (term.datatype or '').encode('utf-8'), b'\x00',
+                         (term.language or '').encode('utf-8')))
+    elif isinstance(term, BNode):
+        return BNODE + str(term).encode('utf-8')
+    return URIREF + str(term).encode('utf-8')
+
+
+def key_term(key):
+    kind, value = key[:1], key[1:]
+    if kind == LITERAL:
+        value, datatype, lang = value.rsplit(b'\x00', 2)
+        return Literal(value.decode('utf-8'),
+                       datatype=datatype.decode('utf-8') or None,
+                       lang=lang.decode('utf-8') or None)
+    elif kind == BNODE:
+        return BNode(value.decode('utf-8'))
+    return uriref(value.decode('utf-8'))
+
+
+def build(graph, path):
+    '''
+    Writes triples of `graph` to mapped store file at `path`
+    '''
+    triples = list(graph.triples((None, None, None)))
+    keys = set([term_key(graph.identifier)])
+    for triple in triples:
+        keys.update(term_key(t) for t in triple)
+    keys = sorted(keys)
+    ids = dict((key, i) for i, key in enumerate(keys))
+    encoded = [tuple(ids[term_key(t)] for t in triple)
+               for triple in triples]
+
+    namespaces = json.dumps([(p, str(n)) for p, n
+                             in graph.namespaces()]).encode('utf-8')
+
+    offsets = array('Q')
+    offsets_offset = HEADER.size
+    position = offsets_offset + (len(keys) + 1) * 8
+    for key in keys:
+        offsets.append(position)
+        position += len(key)
+    offsets.append(position)
+    index_offset = position + (-position % 8)
+    namespaces_offset = index_offset + len(encoded) * 3 * 3 * 4
+
+    with open(path, 'wb') as f:
+        f.write(HEADER.pack(MAGIC, len(keys), len(encoded), offsets_offset,
+                            index_offset, ids[term_key(graph.identifier)],
+                            namespaces_offset, len(namespaces)))
+        f.write(offsets.tobytes())
+        for key in keys:
+            f.write(key)
+        f.write(b'\x00' * (index_offset - position))
+        for permutation in (spo, pos, osp):
+            rows = array('I')
+            for row in sorted(permutation(*t) for t in encoded):
+                rows.extend(row)
+            f.write(rows.tobytes())
+        f.write(namespaces)
+
+
+class MappedIndex(GraphIndex):
+    __slots__ = ()
+
+    def __init__(self, spo, pos, osp):
+        self.spo = spo
+        self.pos = pos
+        self.osp = osp
+
+
+class MappedStore(Store):
+    context_aware = False
+    graph_aware = False
+    formula_aware = False
+    transaction_aware = False
+    read_only = True
+    # triples live in shared page cache, not in process heap
+    triple_bytes = 0
+
+    def __init__(self, path=None, configuration=None, identifier=None,
+                 cache_size=100000):
+        self.cache_size = cache_size
+        self.ids = {}
+        self.terms = {}
+        super(MappedStore, self).__init__(identifier=identifier)
+        path = path or configuration
+        if path is not None:
+            self.open(path)
+
+    def open(self, configuration, create=False):
+        self.path = configuration
+        self.file = open(configuration, 'rb')
+        self.map = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+        (magic, self.term_count, self.triple_count, offsets_offset,
+         index_offset, identifier, namespaces_offset, namespaces_length) = \
+            HEADER.unpack_from(self.map)
+        if magic != MAGIC:
+            raise ValueError('%r is not mapped store file' % configuration)
+
+        view = memoryview(self.map)
+        self.offsets = view[offsets_offset:
+                            offsets_offset + (self.term_count + 1) * 8]\
+            .cast('Q')
+        size = self.triple_count * 3 * 4
+        self.index = MappedIndex(
+            *(view[index_offset + i * size:index_offset + (i + 1) * size]
+              .cast('I') for i in range(3)))
+        self.views = [view, self.offsets,
+                      self.index.spo, self.index.pos, self.index.osp]
+        self.graph_identifier = self.term(identifier)
+        self.__namespaces = dict(
+            (p, URIRef(n)) for p, n in json.loads(
+                self.map[namespaces_offset:
+                         namespaces_offset + namespaces_length]
+                .decode('utf-8')))
+        return 1
+
+    def close(self, commit_pending_transaction=False):
+        self.index = self.offsets = None
+        for view in reversed(self.views):
+            view.release()
+        self.map.close()
+        self.file.close()
+
+    def key(self, tid):
+        return self.map[self.offsets[tid]:self.offsets[tid + 1]]
+
+    def term(self, tid):
+        try:
+            return self.terms[tid]
+        except KeyError:
+            term = key_term(self.key(tid))
+            self.cache(tid, term)
+            return term
+
+    def term_id(self, term):
+        try:
+            return self.ids[cache_key(term)]
+        except KeyError:
+            pass
+        key = term_key(term)
+        keys = TermKeys(self)
+        tid = bisect_left(keys, key)
+        if tid < self.term_count and keys[tid] == key:
+            self.cache(tid, term)
+            return tid
+
+    def cache(self, tid, term):
+        if len(self.terms) >= self.cache_size:
+            self.ids.clear()
+            self.terms.clear()
+        self.ids[cache_key(term)] = tid
+        self.terms[tid] = term
+
+    def graph(self):
+        return Graph(store=self, identifier=self.graph_identifier)
+
+    def triples(self, triple, context=None):
+        if context is not None\
+                and context.identifier != self.graph_identifier:
+            return
+        pattern = []
+        for term in triple:
+            if term is None:
+                pattern.append(None)
+            else:
+                tid = self.term_id(term)
+                if tid is None:
+                    return
+                pattern.append(tid)
+        contexts = (context if context is not None else self.graph(), )
+        for s, p, o in self.index.match(*pattern):
+            yield (self.term(s), self.term(p), self.term(o)), iter(contexts)
+
+    def __len__(self, context=None):
+        if context is not None\
+                and context.identifier != self.graph_identifier:
+            return 0
+        return self.triple_count
+
+    def contexts(self, triple=None):
+        if triple is None or next(self.triples(triple), None) is not None:
+            yield self.graph()
+
+    def add(self, triple, context, quoted=False):
+        raise ModificationException()
+
+    def addN(self, quads):
+        raise ModificationException()
+
+    def remove(self, triple, context=None):
+        raise ModificationException()
+
+    def bind(self, prefix, namespace):
+        pass
+
+    def namespace(self, prefix):
+        return self.__namespaces.get(prefix)
+
+    def prefix(self, namespace):
+        for prefix, bound in self.__namespaces.items():
+            if bound == namespace:
+                return prefix
+
+    def namespaces(self):
+        for prefix, namespace in self.__namespaces.items():
+            yield prefix, namespace
+
+
+class TermKeys(object):
+    '''
+    Sorted term keys of mapped store as sequence
+    '''
+    __slots__ = ('store', )
+
+    def __init__(self, store):
+        self.store = store
+
+    def __len__(self):
+        return self.store.term_count
+
+    def __getitem__(self, tid):
+        return self.store.key(tid)
+
+
+def mapped_graph(path):
+    return MappedStore(path).graph()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description='Build memory-mapped read-only graph file')
+    parser.add_argument('source')
+    parser.add_argument('-o', '--output', required=True)
+    parser.add_argument('-f', '--format', default=None)
+    parser.add_argument('--publicID', default=None,
+                        help='graph identifier, source URI by default')
+    args = parser.parse_args(argv)
+
+    g = Graph(identifier=args.publicID or
+              pathlib.Path(args.source).resolve().as_uri())
+    g.parse(source=args.source, publicID=args.publicID,
+            format=args.format or guess_format(args.source) or 'xml')
+    build(g, args.output)
+    print('%d triples written to %s' % (len(g), args.output),
+          file=sys.stderr)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,426 @@
+'''
+    ldp.store.sqlite
+    ~~~~~~~~~~~~~~~~
+
+    Persistent pool store on top of stdlib `sqlite3`.
+    Database runs in WAL mode, so several worker processes can share
+    one file, each thread of a process keeps its own connection.
+    Triple counts of graphs are kept by triggers, so all processes
+    read them without counting quads.
+'''
+import sqlite3
+import threading
+
+from rdflib import Graph, Literal, BNode, URIRef
+from rdflib.store import Store
+
+from ldp.snapshot import URIREF, BNODE, LITERAL, decode_terms
+from ldp.terms import term_key as cache_key
+
+SCHEMA = '''
+CREATE TABLE IF NOT EXISTS terms (
+    id INTEGER PRIMARY KEY,
+    key TEXT NOT NULL UNIQUE,
+    kind INTEGER NOT NULL,
+    value TEXT NOT NULL,
+    datatype TEXT,
+    lang TEXT);
+CREATE TABLE IF NOT EXISTS graphs (
+    g INTEGER PRIMARY KEY,
+    version INTEGER NOT NULL DEFAULT 0,
+    triples INTEGER NOT NULL DEFAULT 0);
+CREATE TABLE IF NOT EXISTS quads (
+    g INTEGER NOT NULL,
+    s INTEGER NOT NULL,
+    p INTEGER NOT NULL,
+    o INTEGER NOT NULL,
+    PRIMARY KEY (g, s, p, o)) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS quads_spo ON quads (s, p, o, g);
+CREATE INDEX IF NOT EXISTS quads_pos ON quads (p, o, s, g);
+CREATE INDEX IF NOT EXISTS quads_osp ON quads (o, s, p, g);
+CREATE TABLE IF NOT EXISTS namespaces (
+    prefix TEXT PRIMARY KEY,
+    uri TEXT NOT NULL);
+'''
+
+# databases created before triple counts get column filled once
+COUNTS = ('ALTER TABLE graphs ADD COLUMN triples INTEGER NOT NULL DEFAULT 0',
+          'UPDATE graphs SET triples = '
+          '(SELECT count(*) FROM quads WHERE quads.g = graphs.g)')
+
+TRIGGERS = ('CREATE TRIGGER IF NOT EXISTS quads_added AFTER INSERT ON quads '
+            'BEGIN UPDATE graphs SET triples = triples + 1 '
+            'WHERE g = NEW.g; END',
+            'CREATE TRIGGER IF NOT EXISTS quads_removed AFTER DELETE ON quads '
+            'BEGIN UPDATE graphs SET triples = triples - 1 '
+            'WHERE g = OLD.g; END')
+
+
+def term_row(term):
+    if isinstance(term, Literal):
+        return (term.n3(), LITERAL, str(term),
+                term.datatype and str(term.datatype), term.language)
+    elif isinstance(term, BNode):
+        return (term.n3(), BNODE, str(term), None, None)
+    return (term.n3(), URIREF, str(term), None, None)
+
+
+class GraphIdentifiers(object):
+    '''
+    Identifier index of pool read from database, so graphs
+    created by other processes are visible
+    '''
+    def __init__(self, store):
+        self.store = store
+
+    def __contains__(self, identifier):
+        return self.store.has_graph(identifier)
+
+    def __iter__(self):
+        return (g.identifier for g in self.store.contexts())
+
+    def __len__(self):
+        return self.store.execute('SELECT count(*) FROM graphs')\
+            .fetchone()[0]
+
+    def add(self, identifier):
+        pass
+
+    def discard(self, identifier):
+        pass
+
+    def update(self, identifiers):
+        pass
+
+
+class GraphVersions(object):
+    '''
+    Resource versions kept in database and shared by processes
+    '''
+    def __init__(self, store):
+        self.store = store
+
+    def __getitem__(self, identifier):
+        gid = self.store.term_id(identifier, create=False)
+        if gid is None:
+            return 0
+        row = self.store.execute('SELECT version FROM graphs WHERE g = ?',
+                                 (gid,)).fetchone()
+        return row[0] if row else 0
+
+    def bump(self, *identifiers):
+        with self.store.transaction() as connection:
+            for identifier in identifiers:
+                gid = self.store.term_id(identifier)
+                connection.execute(
+                    'INSERT OR IGNORE INTO graphs (g) VALUES (?)', (gid,))
+                connection.execute(
+                    'UPDATE graphs SET version = version + 1 WHERE g = ?',
+                    (gid,))
+
+
+class SQLiteStore(Store):
+    context_aware = True
+    graph_aware = True
+    formula_aware = False
+    transaction_aware = True
+    # written by other processes, add events do not cover every change
+    shared = True
+    # triples live in database file, not in process memory
+    triple_bytes = 0
+
+    def __init__(self, path=None, configuration=None, identifier=None,
+                 timeout=30.0, cache_size=100000):
+        self.path = path or configuration
+        self.timeout = timeout
+        self.cache_size = cache_size
+        self.local = threading.local()
+        self.connections = []
+        self.lock = threading.Lock()
+        self.ids = {}
+        self.terms = {}
+        self.graphs = {}
+        self.namespace_cache = None
+        self.identifiers = GraphIdentifiers(self)
+        self.versions = GraphVersions(self)
+        super(SQLiteStore, self).__init__(identifier=identifier)
+        if self.path is not None:
+            self.open(self.path)
+
+    def open(self, configuration, create=True):
+        self.path = configuration
+        self.connection.executescript(SCHEMA)
+        with self.transaction() as connection:
+            columns = [row[1] for row in
+                       connection.execute('PRAGMA table_info(graphs)')]
+            statements = TRIGGERS if 'triples' in columns \
+                else COUNTS + TRIGGERS
+            for statement in statements:
+                connection.execute(statement)
+        return 1
+
+    def close(self, commit_pending_transaction=False):
+        with self.lock:
+            for connection in self.connections:
+                if commit_pending_transaction and connection.in_transaction:
+                    connection.execute('COMMIT')
+                connection.close()
+            self.connections = []
+        self.local = threading.local()
+
+    @property
+    def connection(self):
+        connection = getattr(self.local, 'connection', None)
+        if connection is None:
+            connection = sqlite3.connect(self.path,
+                                         timeout=self.timeout,
+                                         isolation_level=None,
+                                         check_same_thread=False)
+            connection.execute('PRAGMA journal_mode=WAL')
+            connection.execute('PRAGMA synchronous=NORMAL')
+            self.local.connection = connection
+            with self.lock:
+                self.connections.append(connection)
+        return connection
+
+    def execute(self, sql, parameters=()):
+        return self.connection.execute(sql, parameters)
+
+    def transaction(self):
+        return Transaction(self.connection)
+
+    def commit(self):
+        if self.connection.in_transaction:
+            self.connection.execute('COMMIT')
+
+    def rollback(self):
+        if self.connection.in_transaction:
+            self.connection.execute('ROLLBACK')
+
+    def term_id(self, term, create=True):
+        try:
+            return self.ids[cache_key(term)]
+        except KeyError:
+            pass
+        row = term_row(term)
+        if create:
+            self.execute('INSERT OR IGNORE INTO terms '
+                         '(key, kind, value, datatype, lang) '
+                         'VALUES (?, ?, ?, ?, ?)', row)
+        found = self.execute('SELECT id FROM terms WHERE key = ?',
+                             (row[0],)).fetchone()
+        if found is None:
+            return None
+        self.cache(found[0], term)
+        return found[0]
+
+    def cache(self, tid, term):
+        if len(self.terms) >= self.cache_size:
+            self.ids.clear()
+            self.terms.clear()
+        self.ids[cache_key(term)] = tid
+        self.terms[tid] = term
+
+    def term(self, tid):
+        try:
+            return self.terms[tid]
+        except KeyError:
+            row = self.execute('SELECT kind, value, datatype, lang '
+                               'FROM terms WHERE id = ?', (tid,)).fetchone()
+            term, = decode_terms([row])
+            self.cache(tid, term)
+            return term
+
+    def graph(self, gid):
+        try:
+            return self.graphs[gid]
+        except KeyError:
+            g = self.graphs[gid] = Graph(store=self, identifier=self.term(gid))
+            return g
+
+    def pattern(self, triple, context):
+        '''
+        Returns WHERE clause and parameters for triple pattern,
+        or None if some bound term is unknown
+        '''
+        clauses = []
+        parameters = []
+        for column, term in zip('spo', triple):
+            if term is not None:
+                tid = self.term_id(term, create=False)
+                if tid is None:
+                    return None
+                clauses.append('%s = ?' % column)
+                parameters.append(tid)
+        if context is not None:
+            gid = self.term_id(context.identifier, create=False)
+            if gid is None:
+                return None
+            clauses.append('g = ?')
+            parameters.append(gid)
+        where = (' WHERE ' + ' AND '.join(clauses)) if clauses else ''
+        return where, parameters
+
+    def add(self, triple, context, quoted=False):
+        Store.add(self, triple, context, quoted)
+        self.addN([triple + (context,)])
+
+    def addN(self, quads):
+        '''
+        Bulk insert path, single transaction for all quads
+        '''
+        with self.transaction() as connection:
+            rows = []
+            graphs = set()
+            for s, p, o, c in quads:
+                gid = self.term_id(c.identifier)
+                graphs.add(gid)
+                rows.append((gid,
+                             self.term_id(s),
+                             self.term_id(p),
+                             self.term_id(o)))
+            connection.executemany('INSERT OR IGNORE INTO graphs (g) '
+                                   'VALUES (?)', ((g,) for g in graphs))
+            connection.executemany('INSERT OR IGNORE INTO quads '
+                                   '(g, s, p, o) VALUES (?, ?, ?, ?)', rows)
+
+    def remove(self, triple, context=None):
+        Store.remove(self, triple, context)
+        pattern = self.pattern(triple, context)
+        if pattern is not None:
+            with self.transaction() as connection:
+                connection.execute('DELETE FROM quads' + pattern[0],
+                                   pattern[1])
+
+    def triples(self, triple, context=None):
+        pattern = self.pattern(triple, context)
+        if pattern is None:
+            return
+        where, parameters = pattern
+        if context is not None:
+            rows = self.execute('SELECT s, p, o FROM quads' + where,
+                                parameters).fetchall()
+            for s, p, o in rows:
+                yield ((self.term(s), self.term(p), self.term(o)),
+                       iter((context, )))
+        else:
+            rows = self.execute('SELECT s, p, o, group_concat(g) '
+                                'FROM quads' + where +
+                                ' GROUP BY s, p, o', parameters).fetchall()
+            for s, p, o, graphs in rows:
+                yield ((self.term(s), self.term(p), self.term(o)),
+                       (self.graph(int(g)) for g in graphs.split(',')))
+
+    def __len__(self, context=None):
+        if context is None:
+            return self.execute('SELECT count(*) FROM '
+                                '(SELECT DISTINCT s, p, o FROM quads)')\
+                .fetchone()[0]
+        gid = self.term_id(context.identifier, create=False)
+        if gid is None:
+            return 0
+        row = self.execute('SELECT triples FROM graphs WHERE g = ?',
+                           (gid, )).fetchone()
+        return row[0] if row else 0
+
+    def graph_totals(self, exclude=()):
+        '''
+        Returns (graphs, triples) of all graphs but `exclude`
+        '''
+        excluded = [gid for gid in (self.term_id(identifier, create=False)
+                                    for identifier in exclude)
+                    if gid is not None]
+        where = ' WHERE g NOT IN (%s)' % ', '.join('?' * len(excluded))\
+            if excluded else ''
+        graphs, triples = self.execute(
+            'SELECT count(*), total(triples) FROM graphs' + where,
+            excluded).fetchone()
+        return graphs, int(triples)
+
+    def contexts(self, triple=None):
+        if triple is None or triple == (None, None, None):
+            rows = self.execute('SELECT g FROM graphs').fetchall()
+        else:
+            pattern = self.pattern(triple, None)
+            if pattern is None:
+                return
+            rows = self.execute('SELECT DISTINCT g FROM quads' + pattern[0],
+                                pattern[1]).fetchall()
+        for gid, in rows:
+            yield self.graph(gid)
+
+    def has_graph(self, identifier):
+        gid = self.term_id(identifier, create=False)
+        return gid is not None and self.execute(
+            'SELECT 1 FROM graphs WHERE g = ?', (gid,)).fetchone() is not None
+
+    def add_graph(self, graph):
+        gid = self.term_id(graph.identifier)
+        self.execute('INSERT OR IGNORE INTO graphs (g) VALUES (?)', (gid,))
+
+    def remove_graph(self, graph):
+        gid = self.term_id(graph.identifier, create=False)
+        if gid is None:
+            return
+        with self.transaction() as connection:
+            connection.execute('DELETE FROM quads WHERE g = ?', (gid,))
+            connection.execute('DELETE FROM graphs WHERE g = ?', (gid,))
+
+    @property
+    def bound_namespaces(self):
+        if self.namespace_cache is None:
+            self.namespace_cache = dict(
+                self.execute('SELECT prefix, uri FROM namespaces'))
+        return self.namespace_cache
+
+    def bind(self, prefix, namespace):
+        namespace = str(namespace)
+        if self.bound_namespaces.get(prefix) == namespace:
+            return
+        for bound, uri in list(self.bound_namespaces.items()):
+            if uri == namespace:
+                del self.bound_namespaces[bound]
+        self.bound_namespaces[prefix] = namespace
+        with self.transaction() as connection:
+            connection.execute('DELETE FROM namespaces WHERE uri = ?',
+                               (namespace,))
+            connection.execute('INSERT OR REPLACE INTO namespaces '
+                               '(prefix, uri) VALUES (?, ?)',
+                               (prefix, namespace))
+
+    def namespace(self, prefix):
+        uri = self.bound_namespaces.get(prefix)
+        return URIRef(uri) if uri is not None else None
+
+    def prefix(self, namespace):
+        namespace = str(namespace)
+        for prefix, uri in self.bound_namespaces.items():
+            if uri == namespace:
+                return prefix
+
+    def namespaces(self):
+        for prefix, uri in list(self.bound_namespaces.items()):
+            yield prefix, URIRef(uri)
+
+
+class Transaction(object):
+    '''
+    Joins transaction already open on connection, otherwise
+    begins and commits (or rolls back) one
+    '''
+    def __init__(self, connection):
+        self.connection = connection
+        self.owner = False
+
+    def __enter__(self):
+        if not self.connection.in_transaction:
+            self.connection.execute('BEGIN IMMEDIATE')
+            self.owner = True
+        return self.connection
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if self.owner:
+            if exc_type is None:
+                self.connection.execute('COMMIT')
+            else:
+                self.connection.execute('ROLLBACK')
@@ -0,0 +1,80 @@
+'''
+    ldp.terms
+    ~~~~~~~~~
+
+    Interning of rdflib terms shared by bindings, snapshot decoding
+    and pool stores, so repeated identifiers are one object, compare
+    by identity first and are kept in memory once.
+'''
+from rdflib import URIRef, Literal
+
+
+def term_key(term):
+    '''
+    Dictionary key of `term`, literals are keyed on lexical form,
+    datatype and language as written: rdflib compares "x"@EN equal
+    to "x"@en and "01" equal to "1" of the same numeric datatype
+    '''
+    if type(term) is URIRef:
+        return str(term)
+    if isinstance(term, Literal):
+        return str(term), term.datatype, term.language
+    return term
+
+
+class TermInterner(object):
+    '''
+    Canonical term objects. rdflib terms can not be weakly referenced,
+    so instead of weak-value dictionary two generations of strong
+    references are kept: terms not used during one generation of
+    `maxsize` new terms are dropped
+    '''
+    def __init__(self, maxsize=100000):
+        self.maxsize = maxsize
+        self.current = {}
+        self.previous = {}
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self.current) + len(self.previous)
+
+    def get(self, key, make):
+        try:
+            term = self.current[key]
+        except KeyError:
+            pass
+        else:
+            self.hits += 1
+            return term
+
+        term = self.previous.get(key)
+        if term is None:
+            term = make(key)
+            self.misses += 1
+        else:
+            self.hits += 1
+        if len(self.current) >= self.maxsize:
+            self.previous, self.current = self.current, {}
+        self.current[key] = term
+        return term
+
+    def uriref(self, value):
+        '''
+        Returns canonical `URIRef` of string `value`
+        '''
+        return self.get(str(value), URIRef)
+
+    def intern(self, term):
+        return self.get(term_key(term), lambda key: term)
+
+    def triple(self, triple):
+        intern = self.intern
+        return intern(triple[0]), intern(triple[1]), intern(triple[2])
+
+
+interner = TermInterner()
+
+uriref = interner.uriref
+
+intern = interner.intern
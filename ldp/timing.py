@@ -0,0 +1,151 @@
+'''
+    ldp.timing
+    ~~~~~~~~~~
+
+    Per request phase timing. LDP app times url matching, phases of
+    `dispatch_request` (resource adapters, locks, resolving resources
+    including `move_to_pool`, `If-Match` check, view) and its after
+    request hooks, sending `phase-timed` signal for every phase.
+    Timings of request are kept in `request.phase_timings` and
+    rendered as `Server-Timing` header when `SERVER_TIMING` is set.
+'''
+import threading
+from bisect import bisect_left
+from collections import OrderedDict
+from contextlib import contextmanager
+from functools import wraps
+from time import perf_counter
+
+from blinker import Namespace
+
+from flask import request, current_app
+from flask.ctx import RequestContext
+from flask.globals import _request_ctx_stack
+
+signals = Namespace()
+
+phase_timed = signals.signal('phase-timed')
+
+BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01,
+           0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def record(name, duration, ctx=None):
+    '''
+    Records `duration` of phase `name` of request of `ctx`,
+    current request context by default
+    '''
+    if ctx is None:
+        ctx = _request_ctx_stack.top
+        if ctx is None:
+            return
+    timings = getattr(ctx.request, 'phase_timings', None)
+    if timings is None:
+        timings = ctx.request.phase_timings = []
+    timings.append((name, duration))
+    phase_timed.send(ctx.app, name=name, duration=duration)
+
+
+@contextmanager
+def timed(name):
+    start = perf_counter()
+    try:
+        yield
+    finally:
+        record(name, perf_counter() - start)
+
+
+def timed_hook(f):
+    '''
+    Times request hook `f` as phase named after it
+    '''
+    @wraps(f)
+    def hook(*args, **kwargs):
+        with timed(f.__name__):
+            return f(*args, **kwargs)
+    return hook
+
+
+class TimedRequestContext(RequestContext):
+    def match_request(self):
+        start = perf_counter()
+        try:
+            super(TimedRequestContext, self).match_request()
+        finally:
+            record('match', perf_counter() - start, self)
+
+
+def server_timing(response):
+    if not current_app.config.get('SERVER_TIMING', False):
+        return response
+    totals = OrderedDict()
+    for name, duration in getattr(request, 'phase_timings', ()):
+        totals[name] = totals.get(name, 0.0) + duration
+    if totals:
+        response.headers['Server-Timing'] = ', '.join(
+            '%s;dur=%.3f' % (name.replace('_', '-'), duration * 1000)
+            for name, duration in totals.items())
+    return response
+
+
+class PhaseHistogram(object):
+    '''
+    In-process histograms of phase durations, fed by `phase-timed`
+    signal of connected apps
+    '''
+    def __init__(self, buckets=BUCKETS):
+        self.buckets = tuple(buckets)
+        self.lock = threading.Lock()
+        self.phases = {}
+
+    def connect(self, app):
+        phase_timed.connect(self.observed, sender=app, weak=False)
+        return self
+
+    def disconnect(self, app):
+        phase_timed.disconnect(self.observed, sender=app)
+
+    def observed(self, sender, name, duration):
+        self.observe(name, duration)
+
+    def observe(self, name, duration):
+        with self.lock:
+            phase = self.phases.get(name)
+            if phase is None:
+                phase = self.phases[name] = {
+                    'count': 0, 'sum': 0.0, 'max': 0.0,
+                    'buckets': [0] * (len(self.buckets) + 1)}
+            phase['count'] += 1
+            phase['sum'] += duration
+            phase['max'] = max(phase['max'], duration)
+            phase['buckets'][bisect_left(self.buckets, duration)] += 1
+
+    def quantile(self, name, q):
+        '''
+        Upper bound of bucket holding `q` quantile of phase `name`
+        '''
+        return self.bucket_quantile(self.phases.get(name), q)
+
+    def bucket_quantile(self, phase, q):
+        if phase is None or not phase['count']:
+            return None
+        rank = q * phase['count']
+        seen = 0
+        for bound, count in zip(self.buckets, phase['buckets']):
+            seen += count
+            if seen >= rank:
+                return bound
+        return phase['max']
+
+    def metrics(self):
+        with self.lock:
+            phases = dict((name, dict(phase, buckets=list(phase['buckets'])))
+                          for name, phase in self.phases.items())
+        for phase in phases.values():
+            phase['p50'] = self.bucket_quantile(phase, 0.5)
+            phase['p99'] = self.bucket_quantile(phase, 0.99)
+        return phases
+
+    def clear(self):
+        with self.lock:
+            self.phases = {}
@@ -70,6 +70,8 @@ if __name__ == '__main__':
                           'blinker'],
         tests_require=['nosetests'],
         entry_points={
+            'console_scripts': ['ldp-load = ldp.loader:main',
+                                'ldp-map = ldp.store.mapped:main'],
         },
         classifiers=[
             'Development Status :: 2 - Pre-Alpha',
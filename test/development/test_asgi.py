@@ -0,0 +1,173 @@
+import asyncio
+import threading
+
+from flask import Response, stream_with_context, request
+
+from ldp.rule import match_headers
+
+from test.base import LDPTest, CONTINENTS, GN, PUT
+
+
+def call(method, path, headers=(), body=b'', chunk=None):
+    '''
+    Returns ASGI scope, receive and send of request, and list
+    collecting sent messages
+    '''
+    chunks = [body[i:i + chunk] for i in range(0, len(body), chunk)]\
+        if chunk and body else [body]
+    received = [{'type': 'http.request', 'body': c,
+                 'more_body': i < len(chunks) - 1}
+                for i, c in enumerate(chunks)]
+    sent = []
+
+    async def receive():
+        return received.pop(0)
+
+    async def send(message):
+        sent.append(message)
+
+    scope = {'type': 'http', 'method': method, 'path': path,
+             'query_string': b'', 'http_version': '1.1',
+             'headers': [(k.lower().encode(), v.encode())
+                         for k, v in headers]}
+    return scope, receive, send, sent
+
+
+def run(application, *args, **kwargs):
+    scope, receive, send, sent = call(*args, **kwargs)
+    asyncio.run(application(scope, receive, send))
+    return sent[0], b''.join(m.get('body', b'') for m in sent[1:]), sent
+
+
+class TestASGIAdapter(LDPTest):
+    DATASET_DESCRIPTORS = {'continents': {'source': 'test/continents.rdf',
+                                          'publicID': CONTINENTS}}
+
+    def setUp(self):
+        self.threads = set()
+
+        @self.app.route('/x/<c>')
+        @self.app.bind('c', CONTINENTS['<c>#<c>'])
+        def population(c):
+            self.threads.add(threading.get_ident())
+            return c.value(GN.population)
+
+        @self.app.route('/stream')
+        def stream():
+            def chunks():
+                for i in range(20):
+                    yield request.path + '%s,' % i
+            return Response(stream_with_context(chunks()))
+
+        self.application = self.app.asgi(workers=2, queue_size=2)
+
+    def test_dispatch_off_loop(self):
+        start, body, _ = run(self.application, 'GET', '/x/AF')
+        self.assertEqual(start['status'], 200)
+        self.assertEqual(body, b'922011000')
+        self.assertNotIn(threading.get_ident(), self.threads)
+
+    def test_chunked_request_body(self):
+        start, _, _ = run(self.application, 'PUT', '/x/AF',
+                          headers=[('Content-Type', 'text/turtle')],
+                          body=PUT.format('AF').encode(), chunk=16)
+        self.assertEqual(start['status'], 204)
+        _, body, _ = run(self.application, 'GET', '/x/AF')
+        self.assertEqual(body, b'922011001')
+
+    def test_streamed_response(self):
+        start, body, sent = run(self.application, 'GET', '/stream')
+        self.assertEqual(start['status'], 200)
+        self.assertEqual(body, ''.join('/stream%s,' % i
+                                       for i in range(20)).encode())
+        self.assertEqual(len(sent), 22)
+        self.assertFalse(sent[-1]['more_body'])
+
+    def test_disconnect_before_body(self):
+        scope, receive, send, sent = call(
+            'PUT', '/x/AF', headers=[('Content-Type', 'text/turtle')],
+            body=PUT.format('AF').encode(), chunk=16)
+        messages = []
+
+        async def disconnecting():
+            if not messages:
+                messages.append(await receive())
+                return messages[0]
+            return {'type': 'http.disconnect'}
+
+        asyncio.run(self.application(scope, disconnecting, send))
+        self.assertEqual(sent, [])
+        _, body, _ = run(self.application, 'GET', '/x/AF')
+        self.assertEqual(body, b'922011000')
+
+    def test_short_body(self):
+        data = PUT.format('AF').encode()
+        start, _, _ = run(self.application, 'PUT', '/x/AF',
+                          headers=[('Content-Type', 'text/turtle'),
+                                   ('Content-Length', str(len(data)))],
+                          body=data[:len(data) // 2])
+        self.assertEqual(start['status'], 400)
+        _, body, _ = run(self.application, 'GET', '/x/AF')
+        self.assertEqual(body, b'922011000')
+
+    def test_concurrent_requests(self):
+        async def many():
+            requests = [call('GET', '/x/AF')
+                        for _ in range(20)]
+            await asyncio.gather(*(self.application(*r[:3])
+                                   for r in requests))
+            return [r[3] for r in requests]
+
+        for sent in asyncio.run(many()):
+            self.assertEqual(sent[0]['status'], 200)
+            self.assertEqual(sent[1]['body'], b'922011000')
+
+    def test_concurrent_header_rules(self):
+        @self.app.route(match_headers(
+            '/h', Accept='<any("application/json"):mimetype>'))
+        def json(mimetype):
+            return 'JSON'
+
+        @self.app.route('/h')
+        def default():
+            return 'DEFAULT'
+
+        async def many():
+            requests = [call('GET', '/h', headers=[('Accept', accept)])
+                        for i in range(200)
+                        for accept in ('application/json', 'text/html')]
+            await asyncio.gather(*(self.application(*r[:3])
+                                   for r in requests))
+            return [(dict(r[0]['headers'])[b'accept'], r[3])
+                    for r in requests]
+
+        for accept, sent in asyncio.run(many()):
+            self.assertEqual(sent[0]['status'], 200)
+            self.assertEqual(sent[1]['body'], b'JSON'
+                             if accept == b'application/json'
+                             else b'DEFAULT')
+
+    def test_error_before_response(self):
+        @self.app.route('/error')
+        def error():
+            raise RuntimeError('error')
+
+        self.app.testing = True
+        start, _, sent = run(self.application, 'GET', '/error')
+        self.assertEqual(start['status'], 500)
+        self.assertFalse(sent[-1]['more_body'])
+
+    def test_lifespan(self):
+        messages = [{'type': 'lifespan.startup'},
+                    {'type': 'lifespan.shutdown'}]
+        sent = []
+
+        async def receive():
+            return messages.pop(0)
+
+        async def send(message):
+            sent.append(message['type'])
+
+        asyncio.run(self.application({'type': 'lifespan'}, receive, send))
+        self.assertEqual(sent, ['lifespan.startup.complete',
+                                'lifespan.shutdown.complete'])
@@ -0,0 +1,75 @@
+from unittest import TestCase
+
+from rdflib import URIRef, Literal, BNode, RDF
+
+from ldp.dataset import PoolDataset
+from ldp.store.compact import CompactStore
+
+from test.base import LDPTest, CONTINENTS, GN, AF, PUT
+
+R1 = URIRef('http://example.com/r1')
+R2 = URIRef('http://example.com/r2')
+TITLE = URIRef('http://purl.org/dc/terms/title')
+
+
+class TestCompactStore(TestCase):
+    def setUp(self):
+        self.pool = PoolDataset(store=CompactStore())
+        self.g1 = self.pool.graph(R1)
+        self.g2 = self.pool.graph(R2)
+        self.pool.addN([(R1, TITLE, Literal(str(i)), self.g1)
+                        for i in range(10)])
+        self.g1.add((R1, RDF.type, URIRef('http://example.com/Type')))
+        self.g2.add((R2, TITLE, BNode()))
+        self.g2.add((R1, TITLE, Literal('0')))
+
+    def test_patterns(self):
+        self.assertEqual(len(self.g1), 11)
+        self.assertEqual(len(list(self.g1[R1:TITLE:])), 10)
+        self.assertEqual(len(list(self.g1[R1::Literal('3')])), 1)
+        self.assertEqual(len(list(self.g1[:TITLE:Literal('3')])), 1)
+        self.assertEqual(len(list(self.g1[::Literal('3')])), 1)
+        self.assertEqual(len(list(self.g1[:RDF.type:])), 1)
+        self.assertEqual(list(self.g1[:TITLE:URIRef('unknown')]), [])
+        self.assertEqual(self.g2.value(R1, TITLE), Literal('0'))
+
+    def test_quads(self):
+        quads = list(self.pool.quads((R1, TITLE, Literal('0'), None)))
+        self.assertEqual(set(q[3] for q in quads), set([R1, R2]))
+        self.assertEqual(len(list(self.pool.quads((None, TITLE, None,
+                                                   None)))), 12)
+        self.assertEqual(set(c.identifier for c
+                             in self.pool.store.contexts(
+                                 (R1, None, None))), set([R1, R2]))
+
+    def test_remove(self):
+        self.g1.remove((R1, TITLE, Literal('3')))
+        self.assertEqual(len(self.g1), 10)
+        self.pool.remove((R1, TITLE, Literal('0'), None))
+        self.assertEqual(self.g2.value(R1, TITLE), None)
+        self.assertEqual(set(c.identifier for c
+                             in self.pool.store.contexts(
+                                 (R1, None, None))), set([R1]))
+        self.pool.remove_graph(self.g1)
+        self.assertEqual(list(self.pool.quads((R1, None, None, None))), [])
+
+    def test_memory(self):
+        self.assertEqual(self.pool.store.memory(), 13 * 3 * 3 * 4)
+
+
+class TestCompactPool(LDPTest):
+    DATASET_DESCRIPTORS = {'continents': {'source': 'test/continents.rdf',
+                                          'publicID': CONTINENTS},
+                           'pool': {'store': 'compact'}}
+
+    def test_get_and_put(self):
+        @self.app.route('/x/<c>')
+        @self.app.bind('c', CONTINENTS['<c>#<c>'])
+        def population(c):
+            return c.value(GN.population)
+
+        self.assertEqual(self.client.get('/x/AF').data, b'922011000')
+        self.client.put('/x/AF', data=PUT.format('AF'),
+                        headers={'Content-Type': 'text/turtle'})
+        self.assertEqual(self.client.get('/x/AF').data, b'922011001')
+        self.assertIn(AF, self.app.config['DATASET'].g['pool'].identifiers)
@@ -0,0 +1,46 @@
+import os
+import shutil
+from tempfile import mkdtemp
+from unittest import TestCase
+
+from ldp.dataset import context as dataset
+from ldp.snapshot import DescriptorSnapshot
+
+from test.base import CONTINENTS
+
+
+class TestDescriptorSnapshot(TestCase):
+    def setUp(self):
+        self.tmp = mkdtemp()
+        self.source = os.path.join(self.tmp, 'continents.rdf')
+        shutil.copy('test/continents.rdf', self.source)
+        self.descriptor = {'source': self.source,
+                           'publicID': CONTINENTS,
+                           'snapshot_dir': self.tmp}
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp)
+
+    def snapshot(self):
+        descriptor = dict(self.descriptor)
+        return DescriptorSnapshot(descriptor.pop('snapshot_dir'), descriptor)
+
+    def test_snapshot_written_and_reused(self):
+        with dataset(cont=self.descriptor) as ds:
+            parsed = set(ds.g['cont'][::])
+        self.assertTrue(os.path.exists(self.snapshot().path))
+
+        with dataset(cont=self.descriptor) as ds:
+            self.assertEqual(str(ds.g['cont'].identifier), str(CONTINENTS))
+            self.assertEqual(set(ds.g['cont'][::]), parsed)
+            self.assertEqual(len(parsed), 112)
+
+    def test_snapshot_invalidated_on_change(self):
+        with dataset(cont=self.descriptor):
+            pass
+        self.assertIsNotNone(self.snapshot().load())
+
+        with open(self.source, 'a') as f:
+            f.write('\n')
+        os.utime(self.source, (0, 0))
+        self.assertIsNone(self.snapshot().load())
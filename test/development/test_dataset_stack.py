@@ -1,14 +1,28 @@
+import asyncio
+import os
+import shutil
+import threading
+from tempfile import mkdtemp
 from unittest import TestCase
-from rdflib import URIRef, RDF, Graph
+from rdflib import URIRef, RDF, Graph, BNode
+from rdflib.namespace import SKOS
+from rdflib.paths import OneOrMore
 
 from ldp import NS as LDP
-from ldp.dataset import NamedContextDataset, context as dataset
+from ldp.dataset import (NamedContextDataset, PoolDataset, build_dataset,
+                         context as dataset)
+from ldp.store.sqlite import SQLiteStore
 
-from ldp.globals import continents, capitals, aggregation
+from ldp.globals import (continents, capitals, aggregation,
+                         _dataset_ctx_stack, current_dataset, current_graph)
 
 CONTINENTS = URIRef('http://www.telegraphis.net/data/continents')
 CAPITALS = URIRef('http://www.telegraphis.net/data/capitals')
 
+def named(triple):
+    return not any(isinstance(t, BNode) for t in triple)
+
+
 class TestNamedContext(TestCase):
     def test_single_context_parse(self):
         ds = NamedContextDataset()
@@ -48,4 +62,144 @@ class TestNamedContext(TestCase):
                                'publicID':CAPITALS}) as ds:
             self.assertEqual(len(list(continents[::])), 112)
             self.assertEqual(len(list(capitals[::])), 2584)
-            self.assertEqual(len(list(aggregation[::])), 2696)
\ No newline at end of file
+            self.assertEqual(len(list(aggregation[::])), 2696)
+
+    def test_current_objects(self):
+        with dataset(continents={'source':'test/continents.rdf',
+                    'publicID':CONTINENTS}) as ds:
+            self.assertIs(current_dataset(), ds)
+            self.assertIs(current_graph('continents'), ds.g['continents'])
+        self.assertRaises(RuntimeError, current_dataset)
+
+    def test_task_local_stack(self):
+        first, second = NamedContextDataset(), NamedContextDataset()
+
+        async def task(ds):
+            _dataset_ctx_stack.push(ds)
+            await asyncio.sleep(0)
+            return current_dataset()
+
+        async def tasks():
+            _dataset_ctx_stack.push(first)
+            seen = await asyncio.gather(task(second), task(first))
+            return seen, current_dataset()
+
+        seen, outer = asyncio.run(tasks())
+        self.assertIs(seen[0], second)
+        self.assertIs(seen[1], first)
+        self.assertIs(outer, first)
+        self.assertIsNone(_dataset_ctx_stack.top)
+
+    def test_parallel_parse(self):
+        descriptors = {'continents': {'source': 'test/continents.rdf',
+                                      'publicID': CONTINENTS},
+                       'capitals': {'source': 'test/capitals.rdf',
+                                    'publicID': CAPITALS}}
+        sequential = build_dataset(descriptors)
+        parallel = build_dataset(descriptors, workers=2)
+        for name in descriptors:
+            self.assertEqual(len(parallel.g[name]),
+                             len(sequential.g[name]))
+            self.assertEqual(
+                set(t for t in parallel.g[name][::] if named(t)),
+                set(t for t in sequential.g[name][::] if named(t)))
+        self.assertEqual(set(parallel.namespaces()),
+                         set(sequential.namespaces()))
+        self.assertEqual(len(list(parallel.g.aggregation[::])), 2696)
+
+
+    def test_parallel_parse_in_thread(self):
+        descriptors = {'continents': {'source': 'test/continents.rdf',
+                                      'publicID': CONTINENTS},
+                       'capitals': {'source': 'test/capitals.rdf',
+                                    'publicID': CAPITALS}}
+        built = []
+        thread = threading.Thread(target=lambda: built.append(
+            build_dataset(descriptors, workers=2, start_method='spawn')))
+        thread.start()
+        thread.join()
+        self.assertEqual(len(list(built[0].g.aggregation[::])), 2696)
+
+class TestAggregationSummary(TestCase):
+    def setUp(self):
+        self.ds = build_dataset({'continents': {'source': 'test/continents.rdf',
+                                                'publicID': CONTINENTS},
+                                 'capitals': {'source': 'test/capitals.rdf',
+                                              'publicID': CAPITALS}})
+        self.aggregation = self.ds.g.aggregation
+        self.subject = next(s for s in self.ds.g['capitals'].subjects()
+                            if not isinstance(s, BNode))
+
+    def test_bound_subject_skips_graphs(self):
+        graphs = list(self.aggregation.member_graphs(self.subject, None))
+        self.assertEqual([g.identifier for g in graphs], [CAPITALS])
+        self.assertEqual(set(self.aggregation.triples((self.subject,
+                                                       None, None))),
+                         set(self.ds.g['capitals'].triples((self.subject,
+                                                            None, None))))
+
+    def test_summary_follows_writes(self):
+        list(self.aggregation.triples((self.subject, None, None)))
+        s = URIRef('http://example.com/new')
+        self.ds.g['continents'].add((s, RDF.type, LDP.Resource))
+        self.assertEqual(list(self.aggregation.triples((s, None, None))),
+                         [(s, RDF.type, LDP.Resource)])
+        self.assertEqual(
+            len(list(self.aggregation.member_graphs(None, RDF.type))), 2)
+
+    def test_pool_contexts(self):
+        pool = self.ds.g['pool']
+        for i in range(100):
+            s = URIRef('http://example.com/r%s' % i)
+            pool.graph(s).add((s, RDF.type, LDP.Resource))
+        s = URIRef('http://example.com/r7')
+        graphs = list(self.aggregation.member_graphs(s, None))
+        self.assertEqual([g.identifier for g in graphs], [s])
+        self.assertEqual(list(self.aggregation.triples((s, None, None))),
+                         [(s, RDF.type, LDP.Resource)])
+
+
+class TestAggregationPaths(TestCase):
+    def setUp(self):
+        self.ds = NamedContextDataset()
+        self.nodes = [URIRef('http://example.com/n%s' % i) for i in range(11)]
+        for i in range(10):
+            self.ds.g['g%s' % i] = URIRef('http://example.com/g%s' % i)
+            self.ds.g['g%s' % i].add((self.nodes[i], SKOS.broader, self.nodes[i + 1]))
+        self.aggregation = self.ds.g.aggregation
+        self.path = SKOS.broader * OneOrMore
+
+    def test_transitive_path_once(self):
+        found = list(self.aggregation.triples((self.nodes[0], self.path,
+                                               None)))
+        self.assertEqual([o for s, p, o in found], self.nodes[1:])
+        self.assertEqual(
+            set(self.aggregation.subjects(self.path, self.nodes[10])),
+            set(self.nodes[:10]))
+
+    def test_path_cache(self):
+        cache = self.aggregation.path_cache
+        for i in range(3):
+            list(self.aggregation.triples((self.nodes[5], self.path, None)))
+        self.assertEqual((cache.misses, cache.hits), (1, 2))
+
+        n = URIRef('http://example.com/n11')
+        self.ds.g['g0'].add((self.nodes[10], SKOS.broader, n))
+        self.assertIn(n, list(self.aggregation.objects(self.nodes[5],
+                                                       self.path)))
+        self.aggregation.clear_path_cache()
+        self.assertIsNot(self.aggregation.path_cache, cache)
+
+    def test_shared_store_not_cached(self):
+        tmp = mkdtemp()
+        self.addCleanup(shutil.rmtree, tmp)
+        path = os.path.join(tmp, 'pool.db')
+        self.ds.g['pool'] = PoolDataset(store=SQLiteStore(path))
+        list(self.aggregation.triples((self.nodes[5], self.path, None)))
+
+        n = URIRef('http://example.com/n11')
+        other = PoolDataset(store=SQLiteStore(path))
+        other.graph(n).add((self.nodes[10], SKOS.broader, n))
+        self.assertIn(n, list(self.aggregation.objects(self.nodes[5],
+                                                       self.path)))
+        self.assertEqual(len(self.aggregation.path_cache.entries), 0)
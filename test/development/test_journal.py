@@ -0,0 +1,183 @@
+import os
+import shutil
+import threading
+import time
+from tempfile import mkdtemp
+from unittest import TestCase
+
+from rdflib import URIRef, Literal
+
+from ldp.dataset import PoolDataset, _pool_dataset
+from ldp.journal import Journal, JournalError
+
+from test.base import LDPTest, CONTINENTS, GN, AF, PUT
+
+R1 = URIRef('http://example.com/r1')
+TITLE = URIRef('http://purl.org/dc/terms/title')
+
+
+class FailingFile(object):
+    def __init__(self, f):
+        self.f = f
+
+    def write(self, data):
+        raise OSError(28, 'No space left on device')
+
+    def __getattr__(self, name):
+        return getattr(self.f, name)
+
+
+class TestJournal(TestCase):
+    def setUp(self):
+        self.tmp = mkdtemp()
+        self.path = os.path.join(self.tmp, 'pool.journal')
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp)
+
+    def test_replay_drops_torn_tail(self):
+        journal = Journal(self.path)
+        self.assertEqual(list(journal.replay()), [])
+        journal.sync(journal.append(('contain', R1, AF)))
+        journal.close()
+        with open(self.path, 'ab') as f:
+            f.write(b'\x10\x00')
+        journal = Journal(self.path)
+        self.assertEqual(list(journal.replay()), [('contain', R1, AF)])
+        self.assertEqual(journal.size, os.path.getsize(self.path))
+        journal.close()
+
+    def test_group_commit(self):
+        journal = Journal(self.path, delay=0.05)
+        list(journal.replay())
+        threads = [threading.Thread(
+            target=lambda i=i: journal.sync(journal.append(i)))
+            for i in range(8)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        self.assertLess(journal.syncs, 8)
+        journal.close()
+        self.assertEqual(sorted(Journal(self.path).replay()), list(range(8)))
+
+    def test_failed_batch_retried(self):
+        journal = Journal(self.path, interval=None)
+        list(journal.replay())
+        journal.sync(journal.append('first'))
+        journal.file = FailingFile(journal.file)
+        with self.assertRaises(JournalError):
+            journal.sync(journal.append('lost'))
+        self.assertEqual((journal.synced, journal.pending), (1, ['lost']))
+        journal.sync(journal.append('second'))
+        journal.close()
+        self.assertEqual(list(Journal(self.path, interval=None).replay()),
+                         ['first', 'lost', 'second'])
+
+    def test_waiters_of_failed_batch_raise(self):
+        journal = Journal(self.path, delay=0.05, interval=None)
+        list(journal.replay())
+        journal.file = FailingFile(journal.file)
+        errors = []
+
+        def commit(i):
+            try:
+                journal.sync(journal.append(i))
+            except JournalError as e:
+                errors.append(e)
+
+        threads = [threading.Thread(target=commit, args=(i, ))
+                   for i in range(2)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        self.assertEqual(len(errors), 2)
+        self.assertEqual(journal.synced, 0)
+        journal.close()
+
+    def test_unsynced_records_flushed(self):
+        journal = Journal(self.path, interval=0.01)
+        list(journal.replay())
+        journal.append('moved')
+        for i in range(100):
+            if journal.synced:
+                break
+            time.sleep(0.01)
+        self.assertEqual(journal.synced, 1)
+        journal.close()
+
+
+class TestJournaledPool(TestCase):
+    def setUp(self):
+        self.tmp = mkdtemp()
+        self.path = os.path.join(self.tmp, 'pool.journal')
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp)
+
+    def test_replay(self):
+        pool = PoolDataset().attach_journal(self.path)
+        pool.commit(R1, [(R1, TITLE, Literal('first'))], bump=False)
+        pool.commit(R1, [(R1, TITLE, Literal('second'))],
+                    [(R1, TITLE, Literal('first'))])
+        pool.contain(AF, R1)
+        pool.journal.close()
+
+        replayed = PoolDataset().attach_journal(self.path)
+        self.assertEqual(set(replayed.graph(R1)[::]),
+                         set([(R1, TITLE, Literal('second'))]))
+        self.assertEqual(replayed.containment, {AF: set([R1])})
+        replayed.journal.close()
+
+    def test_removed_graph_replayed(self):
+        pool = PoolDataset().attach_journal(self.path)
+        pool.commit(R1, [(R1, TITLE, Literal('first'))])
+        pool.remove_graph(R1)
+        pool.journal.close()
+
+        replayed = PoolDataset().attach_journal(self.path)
+        self.assertNotIn(R1, replayed.identifiers)
+        replayed.journal.close()
+
+    def test_compaction(self):
+        pool = _pool_dataset(journal=self.path, compact_size=1)
+        pool.commit(R1, [(R1, TITLE, Literal('first'))])
+        self.assertEqual(os.path.getsize(self.path), 0)
+        self.assertTrue(os.path.exists(self.path + '.snapshot'))
+        pool.commit(R1, [(R1, TITLE, Literal('second'))])
+        pool.journal.close()
+
+        restarted = _pool_dataset(journal=self.path)
+        self.assertEqual(len(restarted.graph(R1)), 2)
+        restarted.journal.close()
+
+
+class TestJournaledApp(LDPTest):
+    def setUp(self):
+        self.tmp = mkdtemp()
+        self.DATASET_DESCRIPTORS = {
+            'continents': {'source': 'test/continents.rdf',
+                           'publicID': CONTINENTS},
+            'pool': {'journal': os.path.join(self.tmp, 'pool.journal')}}
+        self.routes()
+
+    def routes(self):
+        @self.app.route('/x/<c>')
+        @self.app.bind('c', CONTINENTS['<c>#<c>'])
+        def population(c):
+            return c.value(GN.population)
+
+    def tearDown(self):
+        super(TestJournaledApp, self).tearDown()
+        shutil.rmtree(self.tmp)
+
+    def test_put_survives_restart(self):
+        self.assertEqual(self.client.get('/x/AF').data, b'922011000')
+        self.client.put('/x/AF', data=PUT.format('AF'),
+                        headers={'Content-Type': 'text/turtle'})
+        self.app.config['DATASET'].g['pool'].journal.close()
+        del self.__dict__['app']
+        self.routes()
+        self.assertEqual(self.client.get('/x/AF').data, b'922011001')
+        self.app.config['DATASET'].g['pool'].journal.close()
@@ -0,0 +1,90 @@
+from unittest import TestCase
+
+from ldp.dataset import build_dataset, context as dataset
+from ldp.globals import continents, aggregation
+
+from test.base import LDPTest, CONTINENTS, CAPITALS, GN, AF
+
+
+class TestLazyGraphs(TestCase):
+    DESCRIPTORS = {'continents': {'source': 'test/continents.rdf',
+                                  'publicID': CONTINENTS,
+                                  'lazy': True},
+                   'capitals': {'source': 'test/capitals.rdf',
+                                'publicID': CAPITALS,
+                                'lazy': True,
+                                'evict_after': 10}}
+
+    def test_parsed_on_first_access(self):
+        with dataset(**self.DESCRIPTORS) as ds:
+            self.assertNotIn('continents', ds.g.map)
+            self.assertEqual(len(ds), 0)
+            self.assertEqual(len(list(continents[::])), 112)
+            self.assertIn('continents', ds.g.map)
+            self.assertNotIn('capitals', ds.g.map)
+
+    def test_aggregation_loads_all(self):
+        with dataset(**self.DESCRIPTORS):
+            self.assertEqual(len(list(aggregation[::])), 2696)
+
+    def test_idle_eviction(self):
+        ds = build_dataset(self.DESCRIPTORS)
+        self.assertEqual(len(ds.g['capitals']), 2584)
+        self.assertEqual(len(ds.g['continents']), 112)
+
+        ds.g.evict(ds.g.accessed['capitals'] + 5)
+        self.assertIn('capitals', ds.g.map)
+
+        ds.g.evict(ds.g.accessed['capitals'] + 10)
+        self.assertNotIn('capitals', ds.g.map)
+        self.assertIn('continents', ds.g.map)
+        self.assertEqual(len(ds), 112)
+
+        self.assertEqual(len(ds.g['capitals']), 2584)
+
+    def test_no_eviction_once_pinned(self):
+        ds = build_dataset(self.DESCRIPTORS)
+        ds.g.load_all()
+        ds.g.evict(ds.g.accessed.get('capitals', 0) + 100)
+        self.assertIn('capitals', ds.g.map)
+
+    def test_no_eviction_while_used(self):
+        ds = build_dataset(self.DESCRIPTORS)
+        ds.g['capitals']
+        ds.g.enter()
+        ds.g.evict(ds.g.accessed['capitals'] + 100)
+        self.assertIn('capitals', ds.g.map)
+        ds.g.accessed['capitals'] -= 100
+        ds.g.next_eviction = 0
+        ds.g.exit()
+        self.assertNotIn('capitals', ds.g.map)
+
+
+class TestLazyRuleContext(LDPTest):
+    DATASET_DESCRIPTORS = {'continents': {'source': 'test/continents.rdf',
+                                          'publicID': CONTINENTS,
+                                          'lazy': True,
+                                          'evict_after': 10},
+                           'capitals': {'source': 'test/capitals.rdf',
+                                        'publicID': CAPITALS,
+                                        'lazy': True,
+                                        'evict_after': 10}}
+
+    def setUp(self):
+        @self.app.route('/x/<c>')
+        @self.app.bind('c', CONTINENTS['<c>#<c>'])
+        def population(c):
+            return c.value(GN.population)
+
+    def test_moved_resources_not_reloaded(self):
+        self.assertEqual(self.client.get('/x/AF').data, b'922011000')
+        ds = self.app.config['DATASET']
+        self.assertFalse(ds.g.pinned)
+        self.assertEqual(ds.g.active, 0)
+        self.assertEqual(list(ds.g['continents'][AF::]), [])
+
+        ds.g.evict(ds.g.accessed['continents'] + 10)
+        self.assertNotIn('continents', ds.g.map)
+        self.assertEqual(list(ds.g['continents'][AF::]), [])
+        self.assertTrue(list(ds.g['continents'][CONTINENTS['AS#AS']::]))
+        self.assertEqual(self.client.get('/x/AF').data, b'922011000')
@@ -0,0 +1,64 @@
+import os
+from tempfile import mkdtemp
+from shutil import rmtree
+from unittest import TestCase
+
+from rdflib import URIRef
+
+from ldp import NS as LDP
+from ldp.loader import BulkLoader, main
+from ldp.dataset import context as dataset
+
+from test.base import AF
+
+CONTAINER = URIRef('http://example.com/c')
+
+NT = '''<http://example.com/c> <http://www.w3.org/ns/ldp#contains> <http://example.com/c/1> .
+<http://example.com/c/1> <http://purl.org/dc/terms/title> "one" .
+<http://example.com/c/1> <http://purl.org/dc/terms/title> "uno"@es .
+_:b0 <http://purl.org/dc/terms/title> "blank" .
+'''
+
+
+class TestBulkLoader(TestCase):
+    def setUp(self):
+        self.tmp = mkdtemp()
+        self.source = os.path.join(self.tmp, 'dump.nt')
+        self.snapshot = os.path.join(self.tmp, 'pool.snapshot')
+        with open(self.source, 'w') as f:
+            f.write(NT)
+
+    def tearDown(self):
+        rmtree(self.tmp)
+
+    def test_partition_by_subject(self):
+        loader = BulkLoader().load(self.source, chunk_size=1)
+        self.assertEqual(loader.count, 4)
+        self.assertEqual(len(loader.graphs[URIRef(CONTAINER + '/1')]), 2)
+        self.assertEqual(loader.containment,
+                         {CONTAINER: set([URIRef(CONTAINER + '/1')])})
+
+    def test_snapshot_served_as_pool(self):
+        main([self.source, '-o', self.snapshot])
+        with dataset(pool={'snapshot': self.snapshot}) as ds:
+            pool = ds.g['pool']
+            self.assertIn(CONTAINER, pool.identifiers)
+            self.assertEqual(len(pool.graph(URIRef(CONTAINER + '/1'))), 2)
+            self.assertIn(URIRef(CONTAINER + '/1'),
+                          pool.containment[CONTAINER])
+            self.assertTrue(list(pool.graph(CONTAINER)[:LDP.contains:]))
+
+    def test_unknown_extension(self):
+        source = os.path.join(self.tmp, 'dump.turtle')
+        with open(source, 'w') as f:
+            f.write(NT)
+        with self.assertRaises(SystemExit):
+            main([source, '-o', self.snapshot])
+        self.assertFalse(os.path.exists(self.snapshot))
+        main([source, '-o', self.snapshot, '--format', 'nt'])
+        self.assertTrue(os.path.exists(self.snapshot))
+
+    def test_rdfxml_source(self):
+        main(['test/continents.rdf', '-o', self.snapshot])
+        with dataset(pool={'snapshot': self.snapshot}) as ds:
+            self.assertIn(AF, ds.g['pool'].identifiers)
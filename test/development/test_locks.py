@@ -0,0 +1,141 @@
+import threading
+import time
+from unittest import TestCase
+
+from ldp.locks import RWLock, LockManager
+from ldp.rule import ResourceContextAdapter
+
+from test.base import LDPTest, CONTINENTS, GN, AF, AS, PUT
+
+
+class TestRWLock(TestCase):
+    def test_shared_readers(self):
+        lock = RWLock()
+        lock.acquire_read()
+        lock.acquire_read()
+        self.assertEqual(lock.readers, 2)
+        lock.release_read()
+        lock.release_read()
+
+    def test_writer_excludes_readers(self):
+        lock = RWLock()
+        lock.acquire_write()
+        events = []
+
+        def read():
+            lock.acquire_read()
+            events.append('read')
+            lock.release_read()
+
+        reader = threading.Thread(target=read)
+        reader.start()
+        time.sleep(0.05)
+        events.append('write')
+        lock.release_write()
+        reader.join(5)
+        self.assertEqual(events, ['write', 'read'])
+
+
+class TestLockManager(TestCase):
+    def test_locks_dropped_when_released(self):
+        manager = LockManager()
+        held = manager.acquire([AS, AF, AF])
+        self.assertEqual(held.identifiers, [AF, AS])
+        other = manager.acquire([AS])
+        self.assertEqual(manager.users[AS], 2)
+        held.release()
+        other.release()
+        manager.acquire([AF], write=True).release()
+        self.assertEqual(manager.locks, {})
+        metrics = manager.metrics()
+        self.assertEqual(metrics['write']['count'], 1)
+        self.assertEqual(metrics['read']['count'], 2)
+        self.assertGreater(metrics['read']['wait_seconds'], 0)
+
+    def test_different_resources_in_parallel(self):
+        manager = LockManager()
+        held = manager.acquire([AF], write=True)
+        acquired = []
+        writer = threading.Thread(
+            target=lambda: acquired.append(manager.acquire([AS],
+                                                           write=True)))
+        writer.start()
+        writer.join(5)
+        self.assertEqual(len(acquired), 1)
+        acquired[0].release()
+        held.release()
+
+
+class TestRequestLocks(LDPTest):
+    DATASET_DESCRIPTORS = {'continents': {'source': 'test/continents.rdf',
+                                          'publicID': CONTINENTS}}
+
+    def setUp(self):
+        self.held = []
+
+        @self.app.route('/x/<c>')
+        @self.app.bind('c', CONTINENTS['<c>#<c>'])
+        def population(c):
+            self.held.append(dict(self.app.locks.users))
+            return c.value(GN.population)
+
+    def test_read_lock_held_during_request(self):
+        self.assertEqual(self.client.get('/x/AF').data, b'922011000')
+        self.assertEqual(self.held, [{AF: 1}])
+        self.assertEqual(self.app.locks.locks, {})
+        self.assertEqual(self.app.locks.metrics()['read']['count'], 1)
+
+    def test_put_waits_for_write_lock(self):
+        self.client.get('/x/AF')
+        held = self.app.locks.acquire([AF])
+        responses = []
+        writer = threading.Thread(target=lambda: responses.append(
+            self.client.put('/x/AF', data=PUT.format('AF'),
+                            headers={'Content-Type': 'text/turtle'})))
+        writer.start()
+        time.sleep(0.1)
+        self.assertEqual(responses, [])
+        held.release()
+        writer.join(5)
+        self.assertEqual(responses[0].status_code, 204)
+        self.assertEqual(self.client.get('/x/AF').data, b'922011001')
+        metrics = self.app.locks.metrics()['write']
+        self.assertGreaterEqual(metrics['max_wait_seconds'], 0.1)
+
+
+class SlowAdapter(ResourceContextAdapter):
+    def select_quads(self, quads, context):
+        time.sleep(0.05)
+        for quad in super(SlowAdapter, self).select_quads(quads, context):
+            yield quad
+
+
+class TestConcurrentMigration(LDPTest):
+    DATASET_DESCRIPTORS = {'continents': {'source': 'test/continents.rdf',
+                                          'publicID': CONTINENTS}}
+
+    def setUp(self):
+        self.app.resource_adapter_class = SlowAdapter
+
+        @self.app.route('/x/<c>')
+        @self.app.bind('c', CONTINENTS['<c>#<c>'])
+        def population(c):
+            return c.value(GN.population)
+
+    def test_first_reads_move_once(self):
+        headers = {'Accept': 'text/turtle'}
+        self.client.get('/x/AS', headers=headers)
+        responses = []
+        readers = [threading.Thread(target=lambda: responses.append(
+            self.app.test_client().get('/x/AF', headers=headers)))
+            for i in range(2)]
+        for reader in readers:
+            reader.start()
+        for reader in readers:
+            reader.join(5)
+        self.assertEqual(len(responses), 2)
+        self.assertEqual(set(len(r.data) > 1 for r in responses),
+                         set([True]))
+        self.assertEqual(len(set(r.headers['ETag'] for r in responses)), 1)
+        self.assertIn(b'922011000', self.client.get('/x/AF',
+                                                    headers=headers).data)
@@ -0,0 +1,89 @@
+import os
+import shutil
+from tempfile import mkdtemp
+from unittest import TestCase
+
+from rdflib import Graph, Literal
+from rdflib.graph import ModificationException
+
+from ldp.globals import continents
+from ldp.memory import MemoryEstimator
+from ldp.store.mapped import MappedStore, build, main
+
+from test.base import LDPTest, CONTINENTS, GN, AF
+
+
+class MappedFile(object):
+    def setUp(self):
+        self.tmp = mkdtemp()
+        self.path = os.path.join(self.tmp, 'continents.ldpmap')
+        main(['test/continents.rdf', '-o', self.path,
+              '--publicID', CONTINENTS])
+
+    def tearDown(self):
+        super(MappedFile, self).tearDown()
+        shutil.rmtree(self.tmp)
+
+
+class TestMappedStore(MappedFile, TestCase):
+    def test_lookups(self):
+        source = Graph().parse('test/continents.rdf', publicID=CONTINENTS)
+        store = MappedStore(self.path)
+        g = store.graph()
+        self.assertEqual(str(g.identifier), str(CONTINENTS))
+        self.assertEqual(len(g), len(source))
+        self.assertEqual(len(list(g[AF::])), len(list(source[AF::])))
+        self.assertEqual(set(g[:GN.population:]),
+                         set(source[:GN.population:]))
+        self.assertEqual(set(g[::Literal('922011000')]),
+                         set(source[::Literal('922011000')]))
+        self.assertEqual(g.value(AF, GN.population), Literal('922011000'))
+        self.assertEqual(list(g[AF:GN.unknown:]), [])
+        self.assertEqual(g.store.namespace('gn'), GN[''])
+        with self.assertRaises(ModificationException):
+            g.remove((AF, None, None))
+        store.close()
+
+    def test_not_counted_as_heap(self):
+        store = MappedStore(self.path)
+        usage = MemoryEstimator().usage(store.graph())
+        self.assertGreater(usage['triples'], 0)
+        self.assertEqual(usage['estimated_bytes'], 0)
+        store.close()
+
+    def test_rebuild_roundtrip(self):
+        g = MappedStore(self.path).graph()
+        path = os.path.join(self.tmp, 'copy.ldpmap')
+        build(g, path)
+        copy = MappedStore(path)
+        self.assertEqual(set(copy.graph()[::]), set(g[::]))
+        copy.close()
+        g.store.close()
+
+
+class TestMappedContext(MappedFile, LDPTest):
+    def setUp(self):
+        super(TestMappedContext, self).setUp()
+        self.DATASET_DESCRIPTORS = {'continents': {'mapped': self.path}}
+
+    def test_rule_context(self):
+        @self.app.route('/x/<c>', context=continents)
+        @self.app.bind('c', CONTINENTS['<c>#<c>'])
+        def population(c):
+            return c.value(GN.population)
+
+        self.assertEqual(self.client.get('/x/AF').data, b'922011000')
+        self.assertEqual(self.client.get('/x/AF').data, b'922011000')
+        ds = self.app.config['DATASET']
+        self.assertIn(AF, ds.g['pool'].identifiers)
+        self.assertTrue(list(ds.g['continents'][AF::]))
+
+    def test_dataset_context(self):
+        @self.app.route('/x/<c>')
+        @self.app.bind('c', CONTINENTS['<c>#<c>'])
+        def population(c):
+            return c.value(GN.population)
+
+        self.assertEqual(self.client.get('/x/AF').data, b'922011000')
+        self.assertIn(AF, self.app.config['DATASET'].g['pool'].identifiers)
+        self.assertEqual(self.client.get('/x/AF').data, b'922011000')
@@ -0,0 +1,87 @@
+from unittest import TestCase
+
+from rdflib import Graph, URIRef, Literal
+
+from ldp.dataset import build_dataset, PoolDataset
+from ldp.memory import MemoryEstimator
+from ldp.store import pool_store
+
+from test.base import CONTINENTS
+
+R1 = URIRef('http://example.com/r1')
+TITLE = URIRef('http://purl.org/dc/terms/title')
+
+
+class TestMemoryEstimator(TestCase):
+    def test_sample_reused_until_size_changes(self):
+        estimator = MemoryEstimator(sample=2)
+        g = Graph(identifier=R1)
+        for i in range(10):
+            g.add((R1, TITLE, Literal('title %s' % i)))
+        usage = estimator.usage(g)
+        self.assertEqual(usage['triples'], 10)
+        self.assertGreater(usage['estimated_bytes'], 0)
+
+        key = (id(g.store), R1)
+        estimator.samples[key] = (10, 1.0)
+        g.add((R1, TITLE, Literal('title 10')))
+        self.assertEqual(estimator.graph_bytes(g), 11)
+        for i in range(11, 20):
+            g.add((R1, TITLE, Literal('title %s' % i)))
+        self.assertGreater(estimator.graph_bytes(g), 20)
+
+    def test_samples_bounded(self):
+        estimator = MemoryEstimator(size=2)
+        graphs = [Graph(identifier=URIRef('http://example.com/%s' % i))
+                  for i in range(3)]
+        for g in graphs:
+            g.add((R1, TITLE, Literal('title')))
+            estimator.usage(g)
+        self.assertEqual(list(estimator.samples),
+                         [(id(g.store), g.identifier) for g in graphs[1:]])
+
+
+class TestDatasetMemoryUsage(TestCase):
+    def test_named_and_pool_graphs(self):
+        ds = build_dataset({
+            'continents': {'source': 'test/continents.rdf',
+                           'publicID': CONTINENTS},
+            'lazy': {'source': 'test/continents.rdf', 'lazy': True}})
+        ds.g['pool'].commit(R1, [(R1, TITLE, Literal('one'))])
+        ds.g['pool'].snapshot(R1)
+
+        usage = ds.memory_usage(graphs=True)
+        self.assertEqual(usage['lazy'], {'loaded': False})
+        self.assertEqual(usage['continents']['triples'],
+                         len(ds.g['continents']))
+        self.assertGreater(usage['continents']['namespaces'], 0)
+        pool = usage['pool']
+        self.assertEqual((pool['graphs'], pool['triples']), (1, 1))
+        self.assertEqual(pool['snapshots'], 1)
+        self.assertEqual(pool['per_graph'][R1]['snapshot_triples'], 1)
+        self.assertNotIn('lazy', ds.g.map)
+
+    def test_pool_counts_kept(self):
+        pool = PoolDataset()
+        pool.commit(R1, [(R1, TITLE, Literal('one')),
+                         (R1, TITLE, Literal('two'))])
+        pool.commit(R1, [(R1, TITLE, Literal('two'))],
+                    [(R1, TITLE, Literal('one')),
+                     (R1, TITLE, Literal('missing'))])
+        self.assertEqual(pool.totals(), (1, 1))
+        pool.store.add((R1, TITLE, Literal('three')), pool.graph(R1))
+        # counts are not taken from store on each call
+        self.assertEqual(pool.memory_usage()['triples'], 1)
+        self.assertEqual(
+            pool.memory_usage(graphs=True)['per_graph'][R1]['triples'], 2)
+        pool.remove_graph(pool.graph(R1))
+        self.assertEqual(pool.totals(), (0, 0))
+
+    def test_compact_store_indexes(self):
+        pool = PoolDataset(store=pool_store('compact'))
+        pool.commit(R1, [(R1, TITLE, Literal('one')),
+                         (R1, TITLE, Literal('two'))])
+        usage = pool.memory_usage()
+        self.assertEqual(usage['triples'], 2)
+        self.assertEqual(usage['estimated_bytes'],
+                         pool.store.memory_usage(pool.graph(R1)))
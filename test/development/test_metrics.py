@@ -0,0 +1,41 @@
+from test.base import LDPTest, CONTINENTS, GN, PUT
+
+
+class TestMetricsView(LDPTest):
+    DATASET_DESCRIPTORS = {'continents': {'source': 'test/continents.rdf',
+                                          'publicID': CONTINENTS}}
+
+    def setUp(self):
+        @self.app.route('/x/<c>')
+        @self.app.bind('c', CONTINENTS['<c>#<c>'])
+        def population(c):
+            return c.value(GN.population)
+        self.app.metrics_view()
+
+    def metrics(self):
+        response = self.client.get('/metrics')
+        self.assertTrue(response.content_type.startswith('text/plain'))
+        return response.data.decode().splitlines()
+
+    def test_counters(self):
+        turtle = {'Accept': 'text/turtle'}
+        self.client.get('/x/AF', headers=turtle)
+        self.client.get('/x/AF', headers=turtle)
+        self.client.put('/x/AF', data=PUT.format('AF'),
+                        headers={'Content-Type': 'text/turtle',
+                                 'If-Match': '"outdated"'})
+        lines = self.metrics()
+
+        self.assertIn('ldp_resources_resolved_total{source="moved"} 1', lines)
+        self.assertIn('ldp_resources_resolved_total{source="pool"} 2', lines)
+        self.assertIn('ldp_responses_total{code="412"} 1', lines)
+        self.assertIn('ldp_serialization_seconds_count'
+                      '{mimetype="text/turtle"} 1', lines)
+        self.assertIn('ldp_representation_cache_evictions_total 0', lines)
+        self.assertIn('# TYPE ldp_phase_seconds histogram', lines)
+        for name in ('ldp_serialization_bytes_total{mimetype="text/turtle"}',
+                     'ldp_representation_cache_hits_total',
+                     'ldp_pool_graphs',
+                     'ldp_pool_triples'):
+            self.assertTrue(any(line.startswith(name + ' ')
+                                for line in lines), name)
@@ -0,0 +1,50 @@
+from unittest import TestCase
+
+from rdflib import URIRef, Literal, Namespace
+
+from ldp.dataset import NamedContextDataset, PoolDataset
+
+EX = Namespace('http://example.com/ns/')
+R1 = URIRef('http://example.com/r1')
+R2 = URIRef('http://example.com/r2')
+
+
+class TestSharedNamespaceManager(TestCase):
+    def setUp(self):
+        self.ds = NamedContextDataset()
+        self.ds.bind('ex', EX)
+        self.pool = PoolDataset()
+
+    def test_pool_graphs_share_manager(self):
+        manager = self.pool.namespace_manager
+        self.assertIs(self.pool.graph(R1).namespace_manager, manager)
+        self.assertIs(self.pool.graph(R2).namespace_manager, manager)
+        self.pool.graph(R1).bind('ex', EX)
+        self.assertIn(('ex', URIRef(EX)), list(self.pool.graph(R2)
+                                               .namespaces()))
+
+    def test_merge_once_per_version(self):
+        manager = self.pool.namespace_manager
+        manager.merge(self.ds)
+        self.assertEqual(manager.table['ex'], URIRef(EX))
+        version = manager.version
+        manager.merge(self.ds)
+        manager.merge(self.ds.namespace_manager)
+        self.assertEqual(manager.version, version)
+
+        self.ds.bind('other', URIRef('http://example.com/other/'))
+        manager.merge(self.ds)
+        self.assertIn('other', manager.table)
+
+    def test_rebinding_known_prefix_keeps_table(self):
+        manager = self.pool.namespace_manager
+        table = manager.table
+        manager.bind('rdf', URIRef('http://www.w3.org/1999/02/'
+                                   '22-rdf-syntax-ns#'))
+        self.assertIs(manager.table, table)
+
+    def test_snapshot_serialized_with_prefixes(self):
+        self.pool.namespace_manager.merge(self.ds)
+        self.pool.commit(R1, [(R1, EX.title, Literal('one'))])
+        turtle = self.pool.snapshot(R1).graph().serialize(format='turtle')
+        self.assertIn(b'ex:title', turtle)
@@ -0,0 +1,74 @@
+from unittest import TestCase
+
+from rdflib import Graph, Literal, URIRef
+
+from ldp.offload import Offloader
+
+from test.base import LDPTest, CONTINENTS, GN, PUT, AF
+
+
+class TestOffloader(TestCase):
+    def setUp(self):
+        self.offloader = Offloader(1, triples=2, size=64)
+
+    def tearDown(self):
+        self.offloader.shutdown()
+
+    def test_small_payloads_kept(self):
+        self.assertIsNone(self.offloader.serialize(AF, [(AF, GN.population,
+                                                         Literal(1))]))
+        self.assertIsNone(self.offloader.parse(data=b'', format='turtle'))
+        self.assertIsNone(self.offloader._executor)
+
+    def test_workers_spawned(self):
+        self.offloader.parse(data=PUT.format('AF').encode(),
+                             format='turtle')
+        self.assertEqual(
+            self.offloader._executor._mp_context.get_start_method(), 'spawn')
+
+    def test_round_trip(self):
+        data = PUT.format('AF').encode()
+        triples, namespaces = self.offloader.parse(data=data,
+                                                   format='turtle')
+        expected = Graph().parse(data=data, format='turtle')
+        self.assertEqual(set(triples), set(expected))
+        self.assertIn(('gn', URIRef(GN)), namespaces)
+
+        turtle = self.offloader.serialize(AF, triples, namespaces,
+                                          format='turtle')
+        self.assertIn(b'gn:population', turtle)
+        self.assertEqual(set(Graph().parse(data=turtle, format='turtle')),
+                         set(triples))
+
+
+class TestOffloadedRequests(LDPTest):
+    DATASET_DESCRIPTORS = {'continents': {'source': 'test/continents.rdf',
+                                          'publicID': CONTINENTS}}
+
+    def setUp(self):
+        self.app.config.update(OFFLOAD_WORKERS=1, OFFLOAD_TRIPLES=1,
+                               OFFLOAD_BYTES=1)
+
+        @self.app.route('/x/<c>')
+        @self.app.bind('c', CONTINENTS['<c>#<c>'])
+        def population(c):
+            return c.value(GN.population)
+
+    def tearDown(self):
+        if self.app.offloader is not None:
+            self.app.offloader.shutdown()
+        super(TestOffloadedRequests, self).tearDown()
+
+    def test_put_and_get(self):
+        self.client.get('/x/AF')
+        self.assertIsNotNone(self.app.offloader._executor)
+        response = self.client.put('/x/AF', data=PUT.format('AF'),
+                                   content_type='text/turtle')
+        self.assertEqual(response.status_code, 204)
+        self.assertIsNotNone(self.app.offloader._executor)
+        self.assertEqual(self.client.get('/x/AF').data, b'922011001')
+
+        response = self.client.get('/x/AF',
+                                   headers={'Accept': 'text/turtle'})
+        g = Graph().parse(data=response.data, format='turtle')
+        self.assertEqual(g.value(AF, GN.population), Literal('922011001'))
@@ -0,0 +1,106 @@
+import threading
+from unittest import TestCase
+
+from rdflib import URIRef, Literal
+
+from ldp.dataset import PoolDataset
+
+from test.base import LDPTest, CONTINENTS, GN, AF, PUT
+
+R1 = URIRef('http://example.com/r1')
+R2 = URIRef('http://example.com/r2')
+TITLE = URIRef('http://purl.org/dc/terms/title')
+
+
+class TestPoolSnapshots(TestCase):
+    def setUp(self):
+        self.pool = PoolDataset()
+        self.pool.commit(R1, [(R1, TITLE, Literal('first'))], bump=False)
+
+    def test_commit_publishes_version(self):
+        first = self.pool.snapshot(R1)
+        self.assertEqual(first.version, 0)
+        self.pool.commit(R1, [(R1, TITLE, Literal('second'))],
+                         [(R1, TITLE, Literal('first'))])
+        second = self.pool.snapshot(R1)
+        self.assertEqual(second.version, 1)
+        self.assertEqual(set(first.triples),
+                         set([(R1, TITLE, Literal('first'))]))
+        self.assertEqual(set(second.triples),
+                         set([(R1, TITLE, Literal('second'))]))
+        self.assertEqual(set(self.pool.graph(R1)[::]), set(second.triples))
+        self.assertEqual(len(second.graph()), 1)
+
+    def test_readers_do_not_wait_for_writer(self):
+        first = self.pool.snapshot(R1)
+        read = []
+        with self.pool.lock:
+            self.pool.graph(R1).remove((R1, None, None))
+            reader = threading.Thread(
+                target=lambda: read.append(self.pool.snapshot(R1)))
+            reader.start()
+            reader.join(5)
+            self.assertEqual(read, [first])
+
+    def test_direct_changes_rebuild_snapshot(self):
+        self.pool.graph(R1).add((R1, TITLE, Literal('direct')))
+        self.pool.versions.bump(R1)
+        self.assertEqual(len(self.pool.snapshot(R1)), 2)
+
+    def test_move_publishes_once(self):
+        published = []
+        publish = self.pool.publish
+        self.pool.publish = lambda snapshot: published.append(snapshot) \
+            or publish(snapshot)
+        self.pool.commit(R2, [(R2, TITLE, Literal('moved'))], bump=False)
+        self.assertEqual([len(s) for s in published], [1])
+
+    def test_commit_drops_representations(self):
+        self.pool.representations.get((R1, 0, 'turtle'), lambda: b'\n')
+        self.pool.commit(R1, [(R1, TITLE, Literal('more'))], bump=False)
+        self.assertEqual(len(self.pool.representations.entries), 0)
+
+    def test_snapshot_limit(self):
+        pool = PoolDataset(snapshot_limit=1)
+        pool.commit(R1, [(R1, TITLE, Literal('first'))])
+        pool.commit(R2, [(R2, TITLE, Literal('second'))])
+        self.assertEqual(list(pool.snapshots), [R2])
+        self.assertEqual(len(pool.snapshot(R1)), 1)
+        self.assertEqual(list(pool.snapshots), [R1])
+
+
+class TestSnapshotResources(LDPTest):
+    DATASET_DESCRIPTORS = {'continents': {'source': 'test/continents.rdf',
+                                          'publicID': CONTINENTS}}
+
+    def test_put_publishes_snapshot(self):
+        @self.app.route('/x/<c>')
+        @self.app.bind('c', CONTINENTS['<c>#<c>'])
+        def population(c):
+            return c.value(GN.population)
+
+        headers = {'Accept': 'text/turtle'}
+        etag = self.client.get('/x/AF', headers=headers).headers['ETag']
+        pool = self.app.config['DATASET'].g['pool']
+        snapshot = pool.snapshot(AF)
+        self.client.put('/x/AF', data=PUT.format('AF'),
+                        headers={'Content-Type': 'text/turtle'})
+        self.assertEqual(pool.snapshot(AF).version, snapshot.version + 1)
+        self.assertIn((AF, GN.population, Literal('922011000')),
+                      snapshot.triples)
+        response = self.client.get('/x/AF', headers=headers)
+        self.assertNotEqual(response.headers['ETag'], etag)
+        self.assertIn(b'922011001', response.data)
+
+    def test_missing_resource_not_registered(self):
+        @self.app.route('/x/<c>')
+        @self.app.bind('c', CONTINENTS['<c>#<c>'])
+        def population(c):
+            return c.value(GN.population)
+
+        for i in range(2):
+            response = self.client.get('/x/XX',
+                                       headers={'Accept': 'text/turtle'})
+            self.assertEqual(response.status_code, 404)
+        pool = self.app.config['DATASET'].g['pool']
+        self.assertNotIn(CONTINENTS['XX#XX'], pool.identifiers)
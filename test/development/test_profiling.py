@@ -0,0 +1,66 @@
+import os
+import pstats
+import shutil
+from tempfile import mkdtemp
+from unittest import TestCase
+
+from ldp.profiling import RequestProfiler
+
+from test.base import LDPTest, CONTINENTS, GN
+
+
+class TestRequestProfiler(TestCase):
+    def setUp(self):
+        self.tmp = mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp)
+
+    def test_sampling(self):
+        profiler = RequestProfiler(self.tmp, fraction=0.5,
+                                   endpoints='*.ldp.put',
+                                   sample=iter([0.9, 0.1]).__next__)
+        self.assertTrue(profiler.wants('population.ldp.put'))
+        self.assertFalse(profiler.wants('population.ldp.get'))
+        self.assertTrue(profiler.wants('population.ldp.get'))
+        self.assertIsNone(RequestProfiler.from_config({}))
+
+    def test_batches_rotated(self):
+        profiler = RequestProfiler(self.tmp, batch=2, keep=2)
+        for i in range(6):
+            profiler.stop(profiler.start(), 'population.ldp.get')
+        files = profiler.files()
+        self.assertEqual(len(files), 2)
+        self.assertTrue(os.path.basename(files[0])
+                        .startswith('population.ldp.get-'))
+        profiler.stop(profiler.start(), 'population')
+        self.assertEqual(len(profiler.flush()), 1)
+
+
+class TestProfiledRequests(LDPTest):
+    DATASET_DESCRIPTORS = {'continents': {'source': 'test/continents.rdf',
+                                          'publicID': CONTINENTS}}
+
+    def setUp(self):
+        self.tmp = mkdtemp()
+        self.app.config.update(PROFILE_DIR=self.tmp,
+                               PROFILE_ENDPOINTS=['*.ldp.get'])
+
+        @self.app.route('/x/<c>')
+        @self.app.bind('c', CONTINENTS['<c>#<c>'])
+        def population(c):
+            return c.value(GN.population)
+
+    def tearDown(self):
+        super(TestProfiledRequests, self).tearDown()
+        shutil.rmtree(self.tmp)
+
+    def test_generated_endpoint_profiled(self):
+        self.client.get('/x/AF')
+        self.assertEqual(os.listdir(self.tmp), [])
+        self.client.get('/x/AF', headers={'Accept': 'text/turtle'})
+        path, = os.listdir(self.tmp)
+        self.assertTrue(path.startswith('population.ldp.get-'))
+        stats = pstats.Stats(os.path.join(self.tmp, path))
+        self.assertTrue(any(name == 'ldp_get'
+                            for (_, _, name) in stats.stats))
@@ -0,0 +1,120 @@
+import os
+import shutil
+import threading
+from tempfile import mkdtemp
+
+from rdflib import Literal, URIRef
+
+from test.base import LDPTest, CONTINENTS, GN, AF, AS
+
+NOTE = URIRef('http://example.com/note')
+
+
+class TestSourceReload(LDPTest):
+    def setUp(self):
+        self.tmp = mkdtemp()
+        self.source = os.path.join(self.tmp, 'continents.rdf')
+        shutil.copy('test/continents.rdf', self.source)
+        self.DATASET_DESCRIPTORS = {'continents': {'source': self.source,
+                                                   'publicID': CONTINENTS}}
+
+        @self.app.route('/x/<c>')
+        @self.app.bind('c', CONTINENTS['<c>#<c>'])
+        def population(c):
+            return c.value(GN.population)
+
+    def tearDown(self):
+        super(TestSourceReload, self).tearDown()
+        shutil.rmtree(self.tmp)
+
+    def update_source(self, old, new):
+        with open(self.source) as f:
+            data = f.read()
+        with open(self.source, 'w') as f:
+            f.write(data.replace(old, new))
+        os.utime(self.source, (0, 0))
+
+    def test_changed_resources_reloaded(self):
+        self.app.config['DATASET_RELOAD_INTERVAL'] = 3600
+        headers = {'Accept': 'text/turtle'}
+        etag = self.client.get('/x/AF', headers=headers).headers['ETag']
+        self.client.get('/x/AS', headers=headers)
+        ds = self.app.config['DATASET']
+        watcher = self.app.config['DATASET_WATCHER']
+        watcher.stop()
+
+        self.update_source('922011000', '922011001')
+        self.update_source('528720588', '528720589')
+        self.assertEqual(watcher.check(),
+                         set([AF, CONTINENTS['NA#NA']]))
+
+        pool = ds.g['pool']
+        self.assertEqual(pool.versions[AF], 1)
+        self.assertEqual(pool.versions[AS], 0)
+        self.assertEqual(pool.graph(AF).value(AF, GN.population),
+                         Literal('922011001'))
+        self.assertEqual(ds.g['continents'].value(CONTINENTS['NA#NA'],
+                                                   GN.population),
+                         Literal('528720589'))
+
+        response = self.client.get('/x/AF', headers=headers)
+        self.assertNotEqual(response.headers['ETag'], etag)
+        self.assertIn(b'922011001', response.data)
+        self.assertEqual(self.client.get('/x/AF').data, b'922011001')
+
+    def test_unchanged_source_ignored(self):
+        self.app.config['DATASET_RELOAD_INTERVAL'] = 3600
+        self.client.get('/x/AF')
+        watcher = self.app.config['DATASET_WATCHER']
+        watcher.stop()
+        os.utime(self.source, (0, 0))
+        self.assertEqual(watcher.check(), set())
+
+    def test_applied_under_write_lock(self):
+        self.app.config['DATASET_RELOAD_INTERVAL'] = 3600
+        self.client.get('/x/AF')
+        watcher = self.app.config['DATASET_WATCHER']
+        watcher.stop()
+        self.update_source('922011000', '922011001')
+
+        held = self.app.locks.acquire([AF])
+        checked = []
+        thread = threading.Thread(target=lambda: checked.append(
+            watcher.check()))
+        thread.start()
+        thread.join(0.2)
+        self.assertEqual(checked, [])
+        self.assertEqual(self.app.config['DATASET'].g['pool'].versions[AF],
+                         0)
+        held.release()
+        thread.join()
+        self.assertEqual(checked, [set([AF])])
+        self.assertEqual(self.app.locks.metrics()['write']['count'], 1)
+
+    def test_client_triples_kept(self):
+        self.app.config['DATASET_RELOAD_INTERVAL'] = 3600
+        self.client.get('/x/AF')
+        pool = self.app.config['DATASET'].g['pool']
+        pool.commit(AF, [(AF, NOTE, Literal('client edit'))])
+        watcher = self.app.config['DATASET_WATCHER']
+        watcher.stop()
+
+        self.update_source('922011000', '922011001')
+        self.assertEqual(watcher.check(), set([AF]))
+        g = pool.graph(AF)
+        self.assertEqual(g.value(AF, NOTE), Literal('client edit'))
+        self.assertEqual(list(g.objects(AF, GN.population)),
+                         [Literal('922011001')])
+
+    def test_deleted_resource_dropped(self):
+        self.app.config['DATASET_RELOAD_INTERVAL'] = 3600
+        self.client.get('/x/AF')
+        pool = self.app.config['DATASET'].g['pool']
+        watcher = self.app.config['DATASET_WATCHER']
+        watcher.stop()
+
+        self.update_source('continents/AF#AF"', 'continents/XX#XX"')
+        self.assertIn(AF, watcher.check())
+        self.assertNotIn(AF, pool.identifiers)
+        self.assertEqual(self.client.get('/x/AF').status_code, 404)
+        self.assertEqual(self.client.get('/x/XX').status_code, 200)
@@ -3,6 +3,7 @@ from base64 import b64encode
 from werkzeug.http import parse_set_header
 
 from ldp import NS as LDP
+from ldp.rule import match_headers
 from test.base import LDPTest, CONTINENTS, GN, PUT
 
 
@@ -23,6 +24,24 @@ class TestRouting(LDPTest):
 
         self.assertEqual(self.client.get('/222').status_code, 200)
 
+    def test_interleaved_header_matching(self):
+        @self.app.route(match_headers(
+            '/', Accept='<any("application/json"):mimetype>'))
+        def json(mimetype):
+            return 'JSON'
+
+        @self.app.route('/')
+        def view():
+            return 'DEFAULT'
+
+        with self.app.test_request_context(
+                '/', headers={'Accept': 'application/json'}) as first:
+            adapter = self.app.create_url_adapter(first.request)
+            with self.app.test_request_context('/') as second:
+                other = self.app.create_url_adapter(second.request)
+                self.assertEqual(other.match()[0], 'view')
+            self.assertEqual(adapter.match()[0], 'json')
+
     def test_singletone_binding(self):
         @self.app.route('/')
         @self.app.bind('root', CONTINENTS['AF#AF'])
@@ -0,0 +1,138 @@
+import os
+import shutil
+import sqlite3
+import threading
+from tempfile import mkdtemp
+from unittest import TestCase
+
+from rdflib import URIRef, Literal, BNode, RDF
+
+from ldp.dataset import PoolDataset
+from ldp.store.sqlite import SQLiteStore
+
+from test.base import LDPTest, CONTINENTS, GN, AF, PUT
+
+R1 = URIRef('http://example.com/r1')
+R2 = URIRef('http://example.com/r2')
+TITLE = URIRef('http://purl.org/dc/terms/title')
+
+
+class TestSQLiteStore(TestCase):
+    def setUp(self):
+        self.tmp = mkdtemp()
+        self.path = os.path.join(self.tmp, 'pool.db')
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp)
+
+    def pool(self):
+        return PoolDataset(store=SQLiteStore(self.path))
+
+    def test_persistence(self):
+        pool = self.pool()
+        g = pool.graph(R1)
+        g.add((R1, TITLE, Literal('one', lang='en')))
+        g.add((R1, RDF.type, URIRef('http://example.com/Type')))
+        b = BNode()
+        pool.graph(R2).add((R2, TITLE, b))
+        pool.bind('dc', URIRef('http://purl.org/dc/terms/'))
+        pool.store.close()
+
+        pool = self.pool()
+        self.assertIn(R1, pool.identifiers)
+        self.assertEqual(len(pool.graph(R1)), 2)
+        self.assertEqual(pool.graph(R1).value(R1, TITLE),
+                         Literal('one', lang='en'))
+        self.assertEqual(pool.graph(R2).value(R2, TITLE), b)
+        self.assertEqual(pool.store.namespace('dc'),
+                         URIRef('http://purl.org/dc/terms/'))
+        self.assertEqual(set(q[3] for q in pool.quads((None, TITLE, None))),
+                         set([R1, R2]))
+
+    def test_remove(self):
+        pool = self.pool()
+        g = pool.graph(R1)
+        pool.addN([(R1, TITLE, Literal(str(i)), g) for i in range(10)])
+        g.remove((R1, TITLE, Literal('3')))
+        self.assertEqual(len(g), 9)
+        pool.remove_graph(g)
+        self.assertNotIn(R1, pool.identifiers)
+
+    def test_triple_counts(self):
+        pool = self.pool()
+        pool.commit(R1, [(R1, TITLE, Literal(str(i))) for i in range(3)])
+        pool.commit(R2, [(R2, TITLE, Literal('x'))])
+        other = self.pool()
+        other.commit(R1, removed=[(R1, TITLE, Literal('0'))])
+        self.assertEqual(pool.totals(), (2, 3))
+        self.assertEqual(len(pool.graph(R1)), 2)
+
+    def test_counts_added_to_old_database(self):
+        self.pool().commit(R1, [(R1, TITLE, Literal(str(i)))
+                                for i in range(3)])
+        connection = sqlite3.connect(self.path)
+        connection.executescript('DROP TRIGGER quads_added;'
+                                 'DROP TRIGGER quads_removed;'
+                                 'ALTER TABLE graphs DROP COLUMN triples;')
+        connection.close()
+        pool = self.pool()
+        self.assertEqual(pool.totals(), (1, 3))
+        pool.commit(R1, [(R1, TITLE, Literal('3'))])
+        self.assertEqual(pool.totals(), (1, 4))
+
+    def test_shared_between_stores(self):
+        first, second = self.pool(), self.pool()
+        first.graph(R1).add((R1, TITLE, Literal('one')))
+        self.assertIn(R1, second.identifiers)
+        first.versions.bump(R1)
+        self.assertEqual(second.versions[R1], 1)
+
+    def test_threads(self):
+        pool = self.pool()
+
+        def write(i):
+            identifier = URIRef('http://example.com/t%s' % i)
+            pool.graph(identifier).add((identifier, TITLE, Literal(i)))
+
+        threads = [threading.Thread(target=write, args=(i,))
+                   for i in range(8)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        self.assertEqual(len(pool.store.connections), 9)
+        self.assertEqual(len(list(pool.quads((None, TITLE, None)))), 8)
+
+
+class TestSQLitePool(LDPTest):
+    def setUp(self):
+        self.tmp = mkdtemp()
+        self.DATASET_DESCRIPTORS = {
+            'continents': {'source': 'test/continents.rdf',
+                           'publicID': CONTINENTS},
+            'pool': {'store': 'sqlite',
+                     'path': os.path.join(self.tmp, 'pool.db')}}
+        self.routes()
+
+    def routes(self):
+        @self.app.route('/x/<c>')
+        @self.app.bind('c', CONTINENTS['<c>#<c>'])
+        def population(c):
+            return c.value(GN.population)
+
+    def tearDown(self):
+        super(TestSQLitePool, self).tearDown()
+        shutil.rmtree(self.tmp)
+
+    def test_put_survives_restart(self):
+        self.assertEqual(self.client.get('/x/AF').data, b'922011000')
+        self.assertEqual(self.client.put('/x/AF',
+                                         data=PUT.format('AF'),
+                                         headers={'Content-Type':
+                                                  'text/turtle'}).status_code,
+                         204)
+        self.app.config['DATASET'].g['pool'].store.close()
+        del self.__dict__['app']
+        self.routes()
+        self.assertEqual(self.client.get('/x/AF').data, b'922011001')
+        self.assertIn(AF, self.app.config['DATASET'].g['pool'].identifiers)
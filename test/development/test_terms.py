@@ -0,0 +1,79 @@
+from unittest import TestCase
+
+from rdflib import URIRef, Literal, BNode, ConjunctiveGraph, XSD
+
+from ldp.dataset import parse_descriptor
+from ldp.terms import TermInterner, interner
+from ldp.snapshot import encode, decode
+from ldp.store.compact import CompactStore
+
+from test.base import LDPTest, CONTINENTS, AF
+
+R1 = 'http://example.com/r1'
+
+
+class TestTermInterner(TestCase):
+    def test_canonical_objects(self):
+        terms = TermInterner()
+        first = terms.uriref(R1)
+        self.assertIs(terms.uriref(R1), first)
+        self.assertIs(terms.intern(URIRef(R1)), first)
+        literal = terms.intern(Literal('1'))
+        self.assertIs(terms.intern(Literal('1')), literal)
+        self.assertIsNot(terms.intern(Literal(R1)), first)
+        self.assertIsNot(terms.intern(BNode(R1)), first)
+
+    def test_literals_kept_as_written(self):
+        terms = TermInterner()
+        upper = terms.intern(Literal('x', lang='EN'))
+        lower = terms.intern(Literal('x', lang='en'))
+        self.assertEqual(lower.language, 'en')
+        self.assertIs(terms.intern(Literal('x', lang='EN')), upper)
+        padded = terms.intern(Literal('01', datatype=XSD.integer))
+        self.assertEqual(str(terms.intern(Literal('1', datatype=XSD.integer))),
+                         '1')
+        self.assertIs(terms.intern(Literal('01', datatype=XSD.integer)),
+                      padded)
+
+    def test_unused_terms_dropped(self):
+        terms = TermInterner(maxsize=2)
+        first = terms.uriref(R1)
+        for i in range(4):
+            terms.uriref('http://example.com/%s' % i)
+        self.assertEqual(len(terms), 3)
+        self.assertIsNot(terms.uriref(R1), first)
+
+    def test_shared_by_snapshot_and_store(self):
+        identifier = interner.uriref(R1)
+        graphs, namespaces, meta = decode(encode(
+            {URIRef(R1): [(URIRef(R1), URIRef(R1), Literal('x'))]}))
+        (decoded, triples), = graphs.items()
+        self.assertIs(decoded, identifier)
+        self.assertIs(triples[0][0], identifier)
+
+        store = CompactStore()
+        store.intern(URIRef(R1))
+        self.assertIs(store.terms[0], identifier)
+
+    def test_parsed_terms_interned(self):
+        ds = ConjunctiveGraph()
+        graphs = [parse_descriptor(ds, data='<%s> <%s> "x"@en .' % (R1, R1),
+                                   format='nt', publicID=URIRef(R1 + name))
+                  for name in ('first', 'second')]
+        (s, p, o), = graphs[0]
+        self.assertIs(s, interner.uriref(R1))
+        self.assertIs(o, next(graphs[1].objects()))
+
+
+class TestBindingTerms(LDPTest):
+    DATASET_DESCRIPTORS = {'continents': {'source': 'test/continents.rdf',
+                                          'publicID': CONTINENTS}}
+
+    def test_binding_uriref_interned(self):
+        @self.app.route('/x/<c>')
+        @self.app.bind('c', CONTINENTS['<c>#<c>'])
+        def population(c):
+            return '%s' % (c.identifier is interner.uriref(AF))
+
+        self.assertEqual(self.client.get('/x/AF').data, b'True')
+        self.assertEqual(self.client.get('/x/AF').data, b'True')
@@ -0,0 +1,54 @@
+from unittest import TestCase
+
+from ldp.timing import PhaseHistogram, phase_timed
+
+from test.base import LDPTest, CONTINENTS, GN
+
+
+class TestPhaseHistogram(TestCase):
+    def test_quantiles(self):
+        histogram = PhaseHistogram(buckets=(0.001, 0.01, 0.1))
+        for duration in (0.0005,) * 98 + (0.05, 0.5):
+            histogram.observe('view', duration)
+        metrics = histogram.metrics()['view']
+        self.assertEqual(metrics['count'], 100)
+        self.assertEqual(metrics['buckets'], [98, 0, 1, 1])
+        self.assertEqual(metrics['p50'], 0.001)
+        self.assertEqual(metrics['p99'], 0.1)
+        self.assertEqual(histogram.quantile('view', 1), 0.5)
+        self.assertIsNone(histogram.quantile('unknown', 0.5))
+
+
+class TestRequestPhases(LDPTest):
+    DATASET_DESCRIPTORS = {'continents': {'source': 'test/continents.rdf',
+                                          'publicID': CONTINENTS}}
+
+    def setUp(self):
+        @self.app.route('/x/<c>')
+        @self.app.bind('c', CONTINENTS['<c>#<c>'])
+        def population(c):
+            return c.value(GN.population)
+
+    def test_phases_timed(self):
+        timed = []
+
+        def receiver(sender, name, duration):
+            timed.append(name)
+
+        with phase_timed.connected_to(receiver, sender=self.app):
+            self.client.get('/x/AF', headers={'Accept': 'text/turtle'})
+        for phase in ('match', 'adapters', 'locks', 'resources',
+                      'move_to_pool', 'view', 'serialize', 'set_etag'):
+            self.assertIn(phase, timed)
+        metrics = self.app.phase_histogram.metrics()
+        self.assertEqual(metrics['view']['count'], 1)
+        self.assertIn('resource_link_type', metrics)
+
+    def test_server_timing_header(self):
+        response = self.client.get('/x/AF')
+        self.assertNotIn('Server-Timing', response.headers)
+        self.app.config['SERVER_TIMING'] = True
+        response = self.client.get('/x/AF')
+        header = response.headers['Server-Timing']
+        self.assertIn('match;dur=', header)
+        self.assertIn('set-etag;dur=', header)